@@ -0,0 +1,51 @@
+"""
+Conversor de Vídeos para iPhone (MOV) - motor de conversão sem interface.
+
+Uso como biblioteca:
+
+    from conversor import ConversionEngine, ConversionSettings
+    engine = ConversionEngine(ConversionSettings(quality="high"), log=print)
+    engine.convert("video.mkv", "video.mov")
+
+Uso pela linha de comando:
+
+    python -m conversor video.mkv pasta/ "*.avi" -o saida/ --jobs 4
+"""
+
+from .engine import (
+    CRF_VALUES,
+    PRESETS,
+    VIDEO_EXTENSIONS,
+    ConversionEngine,
+    ConversionSettings,
+    format_duration,
+    format_file_size,
+    is_video_file,
+)
+from .compat import StreamPlan, plan_streams
+from .estimate import BitrateStats, audio_bitrate, estimate_output_size, parse_bitrate
+from .autocrf import CRF_CANDIDATES, CrfSearch, sample_windows
+from .twopass import TwoPassEncoder, parse_bitrates, rendition_path
+from .diskspace import InsufficientSpaceError, SpaceReservations
+from .probe import (BackgroundProber, ProbeService, default_cache_dir, get_duration,
+                    run_ffprobe)
+from .progress import ProgressBoard, ProgressEvent, ProgressParser
+from .scheduler import (POLICIES, BatchJob, MovingAverages, SpeedStats, estimate_makespan,
+                        order_jobs, register_policy)
+from .atomic import cleanup_stale_temp, commit_output, temp_output_path
+from .processes import (BACKGROUND_PROCESSES, PROCESSES, ConversionCancelled, ProcessRegistry,
+                        wait_with_usage)
+from .metrics import JobMetrics
+from .logqueue import LogQueue
+from .thumbnails import THUMB_COUNT, THUMB_WIDTH, ThumbnailCache, extract_thumbnails
+from .output_cache import ConversionCache, cache_key, place_file
+from .history import (HISTORY_DB, HISTORY_PAGE_SIZE, METRIC_COLUMNS, STATUS_CANCELLED, STATUS_FAILED, STATUS_SUCCESS,
+                      HistoryStore)
+from .journal import JOURNAL_NAME, BatchJournal
+from .batch import BatchConverter, default_max_jobs, output_path_for, plan_workers
+from .watch import FolderWatcher, WatchDaemon, open_for_writing
+from .scan import VIDEO_SUFFIXES, iter_video_files
+from .jobtable import (JOB_CANCELLED, JOB_DONE, JOB_FAILED, JOB_QUEUED, JOB_RUNNING,
+                       JOB_STATUS_LABELS, JOB_WAITING, JobTable)
+
+__version__ = "3.0"
@@ -0,0 +1,8 @@
+"""Permite executar: python -m conversor"""
+
+import sys
+
+from .cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+Gravação atômica dos arquivos de saída.
+
+O FFmpeg escreve num arquivo temporário oculto na mesma pasta do destino;
+só depois de um fsync ele é renomeado (os.replace) para o nome final. Um
+.mov com o nome final está sempre completo. Temporários deixados por um
+processo que morreu são removidos por cleanup_stale_temp.
+"""
+
+import os
+import shutil
+import sys
+import time
+import uuid
+from pathlib import Path
+
+TEMP_PREFIX = ".conversor-tmp-"
+SEGMENT_DIR_PREFIX = ".conversor-seg-"
+STALE_AGE = 24 * 3600  # segundos sem modificação para um temporário ser órfão
+
+
+def temp_output_path(output_path):
+    """Temporário ao lado de output_path, mantendo a extensão (o FFmpeg escolhe o formato por ela)"""
+    output_path = Path(output_path)
+    token = uuid.uuid4().hex[:8]
+    return output_path.with_name(f"{TEMP_PREFIX}{os.getpid()}-{token}-{output_path.name}")
+
+
+def fsync_path(path):
+    """Força os dados do arquivo para o disco"""
+    with open(path, 'rb') as f:
+        os.fsync(f.fileno())
+
+
+def fsync_directory(directory):
+    """Grava a entrada de diretório (o rename) no disco; sem efeito no Windows"""
+    if sys.platform == "win32":
+        return
+    fd = os.open(str(directory), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def commit_output(temp_path, output_path):
+    """fsync do temporário e renomeação atômica para o destino final"""
+    fsync_path(temp_path)
+    os.replace(temp_path, output_path)
+    try:
+        fsync_directory(Path(output_path).parent)
+    except OSError:
+        pass
+
+
+def discard(path):
+    """Remove um temporário, se existir"""
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def _owner_pid(name, prefix):
+    """PID gravado no nome do temporário, ou None"""
+    pid, _, _ = name[len(prefix):].partition('-')
+    try:
+        return int(pid)
+    except ValueError:
+        return None
+
+
+def _pid_alive(pid):
+    if pid is None or sys.platform == "win32":
+        return None  # Desconhecido: decide pela idade
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # Existe, mas pertence a outro usuário
+    return True
+
+
+def _is_stale(entry, prefix, now):
+    """Órfão se o processo dono morreu; a idade só decide quando não há como saber
+
+    Um temporário de um processo vivo nunca é órfão, por mais longa que
+    seja a conversão. Sem PID no nome (ou no Windows), vale o tempo sem
+    modificação: um FFmpeg ativo atualiza o mtime continuamente.
+    """
+    alive = _pid_alive(_owner_pid(entry.name, prefix))
+    if alive is not None:
+        return not alive
+    try:
+        return now - entry.stat(follow_symlinks=False).st_mtime > STALE_AGE
+    except OSError:
+        return False
+
+
+def cleanup_stale_temp(directory):
+    """Remove temporários e pastas de segmentos órfãos; retorna quantos foram removidos
+
+    Temporários de processos ainda vivos (inclusive este) são mantidos.
+    """
+    removed = 0
+    now = time.time()
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return 0
+
+    for entry in entries:
+        try:
+            if entry.name.startswith(TEMP_PREFIX) and entry.is_file(follow_symlinks=False):
+                if _is_stale(entry, TEMP_PREFIX, now):
+                    os.unlink(entry.path)
+                    removed += 1
+            elif entry.name.startswith(SEGMENT_DIR_PREFIX) and entry.is_dir(follow_symlinks=False):
+                if _is_stale(entry, SEGMENT_DIR_PREFIX, now):
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                    removed += 1
+        except OSError:
+            continue
+    return removed
@@ -0,0 +1,198 @@
+"""
+CRF automático por arquivo.
+
+Em vez de um CRF fixo por qualidade, alguns trechos curtos do vídeo são
+codificados em CRFs candidatos; o tamanho (e, se pedido, o SSIM) desses
+trechos indica o CRF que cumpre a meta de MB por minuto ou de SSIM mínimo.
+A conversão completa roda uma única vez, já com o CRF escolhido.
+"""
+
+import os
+import re
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+from .atomic import SEGMENT_DIR_PREFIX
+from .estimate import MUXING_OVERHEAD, audio_bitrate
+from .probe import get_duration
+
+CRF_CANDIDATES = tuple(range(16, 35))  # em ordem crescente: tamanho e SSIM caem
+SAMPLE_COUNT = 3
+SAMPLE_LENGTH = 4.0  # segundos por trecho
+
+_SSIM_PATTERN = re.compile(r"SSIM .*All:([\d.]+)")
+
+
+def sample_windows(duration, count=SAMPLE_COUNT, length=SAMPLE_LENGTH):
+    """Trechos (início, duração) espalhados pelo vídeo, longe do início e do fim"""
+    if duration <= 0:
+        return []
+    # Vídeos curtos: um trecho só, do começo
+    if duration <= count * length * 2:
+        return [(0.0, min(duration, count * length))]
+    return [(duration * (k + 1) / (count + 1) - length / 2, length) for k in range(count)]
+
+
+def _first_index(candidates, predicate):
+    """Índice do primeiro candidato em que predicate vale (supondo monotonia)"""
+    low, high = 0, len(candidates)
+    while low < high:
+        middle = (low + high) // 2
+        if predicate(candidates[middle]):
+            high = middle
+        else:
+            low = middle + 1
+    return low
+
+
+@dataclass
+class CrfSample:
+    """Resultado dos trechos codificados num CRF"""
+    crf: int
+    mb_per_minute: float
+    ssim: float = None
+
+
+class CrfSearch:
+    """Escolhe o CRF de um vídeo a partir de trechos codificados (busca binária)"""
+
+    def __init__(self, engine, input_path, info, plan, threads=None):
+        self.engine = engine
+        self.settings = engine.settings
+        self.input_path = input_path
+        self.info = info
+        self.plan = plan
+        self.threads = threads
+        self.windows = sample_windows(get_duration(info))
+        self.samples = {}  # crf -> CrfSample
+        self.work_dir = None
+
+    def choose(self, work_parent=None):
+        """CRF escolhido, ou None se não for possível medir (usa a qualidade fixa)"""
+        settings = self.settings
+        if not self.windows:
+            self.engine.log_message("⚠️ CRF automático: duração desconhecida; usando a qualidade fixa")
+            return None
+
+        self.work_dir = Path(tempfile.mkdtemp(prefix=f'{SEGMENT_DIR_PREFIX}{os.getpid()}-',
+                                              dir=work_parent))
+        try:
+            self.engine.log_message(
+                f"🎯 CRF automático: {len(self.windows)} trechos de até "
+                f"{self.windows[0][1]:.0f}s por candidato")
+            size_crf = ssim_crf = None
+
+            if settings.target_mb_per_min > 0:
+                # Menor CRF (melhor qualidade) que cabe no orçamento
+                index = _first_index(CRF_CANDIDATES, lambda crf: self.fits(crf))
+                if index == len(CRF_CANDIDATES):
+                    size_crf = CRF_CANDIDATES[-1]
+                    self.engine.log_message(
+                        f"⚠️ Nem o CRF {size_crf} cabe em {settings.target_mb_per_min:g} MB/min")
+                else:
+                    size_crf = CRF_CANDIDATES[index]
+
+            if settings.target_ssim > 0:
+                # Maior CRF (menor arquivo) que mantém o SSIM mínimo
+                index = _first_index(CRF_CANDIDATES, lambda crf: not self.keeps_quality(crf))
+                if index == 0:
+                    ssim_crf = CRF_CANDIDATES[0]
+                    self.engine.log_message(
+                        f"⚠️ Nem o CRF {ssim_crf} atinge SSIM {settings.target_ssim:g}")
+                else:
+                    ssim_crf = CRF_CANDIDATES[index - 1]
+
+            if size_crf is None:
+                crf = ssim_crf
+            elif ssim_crf is None or ssim_crf < size_crf:
+                crf = size_crf
+                if ssim_crf is not None:
+                    self.engine.log_message("⚠️ O SSIM mínimo não cabe no orçamento; "
+                                            "priorizando o tamanho")
+            else:
+                crf = ssim_crf
+
+            sample = self.samples.get(crf)
+            summary = f"{sample.mb_per_minute:.1f} MB/min" if sample else ""
+            if sample and sample.ssim is not None:
+                summary += f", SSIM {sample.ssim:.4f}"
+            self.engine.log_message(f"🎯 CRF escolhido: {crf}" + (f" ({summary})" if summary else ""))
+            return crf
+        except _SampleFailed:
+            self.engine.log_message("⚠️ CRF automático: falha ao medir os trechos; "
+                                    "usando a qualidade fixa")
+            return None
+        finally:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def fits(self, crf):
+        """True se o CRF cabe no orçamento de MB por minuto"""
+        return self.measure(crf).mb_per_minute <= self.settings.target_mb_per_min
+
+    def keeps_quality(self, crf):
+        """True se o CRF mantém o SSIM mínimo"""
+        return self.measure(crf, with_ssim=True).ssim >= self.settings.target_ssim
+
+    def measure(self, crf, with_ssim=False):
+        """Codifica os trechos no CRF (uma vez por CRF) e mede tamanho e SSIM"""
+        sample = self.samples.get(crf)
+        if sample is not None and (sample.ssim is not None or not with_ssim):
+            return sample
+
+        total_bytes = 0
+        total_length = 0.0
+        weighted_ssim = 0.0
+        for i, (start, length) in enumerate(self.windows):
+            sample_file = self.work_dir / f"crf{crf}_{i}.mkv"
+            if not sample_file.exists():
+                self.encode_sample(sample_file, crf, start, length)
+            total_bytes += sample_file.stat().st_size
+            total_length += length
+            if with_ssim:
+                weighted_ssim += self.sample_ssim(sample_file, start, length) * length
+
+        video_rate = total_bytes / total_length  # bytes/s
+        audio_rate = audio_bitrate(self.info, self.settings, self.plan) / 8
+        mb_per_minute = (video_rate + audio_rate) * MUXING_OVERHEAD * 60 / 1024 ** 2
+        sample = CrfSample(crf, mb_per_minute, weighted_ssim / total_length if with_ssim else None)
+        self.samples[crf] = sample
+
+        message = f"   CRF {crf}: {mb_per_minute:.1f} MB/min"
+        if sample.ssim is not None:
+            message += f", SSIM {sample.ssim:.4f}"
+        self.engine.log_message(message)
+        return sample
+
+    def encode_sample(self, sample_file, crf, start, length):
+        """Codifica um trecho só de vídeo com os mesmos parâmetros da conversão"""
+        cmd = ['ffmpeg', '-v', 'error', '-nostdin',
+               '-ss', f"{start:.3f}", '-i', str(self.input_path), '-t', f"{length:.3f}",
+               '-y', '-map', f'0:{self.plan.video_index}', '-an', '-sn']
+        cmd.extend(self.engine.video_encode_args(str(crf)))
+        if self.threads:
+            cmd.extend(['-threads', str(self.threads)])
+        cmd.append(str(sample_file))
+        result = self.engine.processes.run(cmd, text=True)
+        if result.returncode != 0 or not sample_file.exists():
+            raise _SampleFailed()
+
+    def sample_ssim(self, sample_file, start, length):
+        """SSIM do trecho codificado em relação ao mesmo trecho do original"""
+        graph = (f"[0:v]setpts=PTS-STARTPTS[coded];"
+                 f"[1:{self.plan.video_index}]format=yuv420p,setpts=PTS-STARTPTS[source];"
+                 f"[coded][source]ssim")
+        cmd = ['ffmpeg', '-hide_banner', '-nostats', '-nostdin',
+               '-i', str(sample_file),
+               '-ss', f"{start:.3f}", '-t', f"{length:.3f}", '-i', str(self.input_path),
+               '-lavfi', graph, '-f', 'null', '-']
+        result = self.engine.processes.run(cmd, text=True)
+        match = _SSIM_PATTERN.search(result.stderr or '') if result.returncode == 0 else None
+        if not match:
+            raise _SampleFailed()
+        return float(match.group(1))
+
+
+class _SampleFailed(Exception):
+    """Um trecho não pôde ser codificado ou medido"""
@@ -0,0 +1,246 @@
+"""
+Conversão em lote com um pool limitado de processos FFmpeg simultâneos.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from .compat import plan_streams
+from .engine import format_duration
+from .journal import DONE, FAILED, PENDING, RUNNING
+from .probe import get_duration
+from .progress import ProgressBoard, ProgressEvent
+from .scheduler import BatchJob, SpeedStats, estimate_makespan, order_jobs
+
+PROBE_WORKERS = 8
+
+
+def default_max_jobs(cpu_count=None):
+    """Número padrão de conversões simultâneas no modo lote"""
+    cpu_count = cpu_count or os.cpu_count() or 1
+    # x264 escala bem até ~8 threads por processo
+    return max(1, cpu_count // 8)
+
+
+def plan_workers(total_files, max_jobs=None, cpu_count=None):
+    """Retorna (processos simultâneos, threads por processo) para o lote"""
+    cpu_count = cpu_count or os.cpu_count() or 1
+    jobs = max_jobs or default_max_jobs(cpu_count)
+    jobs = max(1, min(jobs, total_files, cpu_count))
+    threads = max(1, cpu_count // jobs)
+    return jobs, threads
+
+
+def output_path_for(input_path, output_directory):
+    """Caminho .mov de saída para um arquivo de entrada"""
+    input_file = Path(input_path)
+    directory = Path(output_directory) if output_directory else input_file.parent
+    return directory / f"{input_file.stem}.mov"
+
+
+class BatchConverter:
+    """Converte uma lista de arquivos com N processos FFmpeg simultâneos
+
+    Os arquivos são iniciados na ordem da política (ver scheduler.POLICIES);
+    o job_id de cada arquivo continua sendo sua posição na lista original.
+    Com um journal (BatchJournal), saídas já concluídas são puladas e cada
+    mudança de estado é registrada para retomar o lote depois.
+
+    Callbacks opcionais (chamados a partir das threads de trabalho):
+      on_progress(job_id, ProgressEvent)
+      on_job_done(job_id, input_path, output_path, success)
+
+    progress (ProgressBoard) guarda o último evento de cada arquivo e o
+    percentual geral ponderado pela duração; a interface lê só ele.
+    """
+
+    def __init__(self, engine, max_jobs=None, on_progress=None, on_job_done=None,
+                 policy='longest_first', journal=None, progress=None):
+        self.engine = engine
+        self.max_jobs = max_jobs
+        self.on_progress = on_progress
+        self.on_job_done = on_job_done
+        self.policy = policy
+        self.journal = journal
+        self.progress = progress or ProgressBoard()
+        self.speed_stats = engine.speed_stats or SpeedStats()
+        self.cancel_event = threading.Event()
+        self.state_lock = threading.Lock()
+        self.jobs = {}
+        self.pending = []
+        self.running = {}
+        self.workers = 1
+
+    def cancel(self):
+        """Impede que novos arquivos do lote sejam iniciados e encerra os atuais"""
+        self.cancel_event.set()
+        self.engine.cancel()
+
+    def prepare_jobs(self, indexed_files):
+        """Cria os BatchJob de (job_id, caminho) com duração e tamanho
+
+        O ffprobe roda em paralelo e passa pelo cache do engine.
+        """
+        settings = self.engine.settings
+
+        def describe(item):
+            job_id, input_path = item
+            info = self.engine.probe(input_path)
+            plan = plan_streams(info, settings) if settings.stream_copy else None
+            try:
+                size = os.path.getsize(input_path)
+            except OSError:
+                size = 0
+            return BatchJob(job_id, input_path, get_duration(info), size,
+                            remux=bool(plan and plan.copy_video and not settings.two_pass),
+                            output_size=self.engine.space_needed(input_path, info))
+
+        with ThreadPoolExecutor(max_workers=PROBE_WORKERS) as executor:
+            return list(executor.map(describe, indexed_files))
+
+    def eta(self):
+        """Segundos estimados até o fim do lote, pela velocidade observada"""
+        preset = self.engine.settings.preset
+        with self.state_lock:
+            busy = [self.speed_stats.job_seconds(self.jobs[job_id], preset) * (1 - percent / 100)
+                    for job_id, percent in self.running.items()]
+            pending = [self.speed_stats.job_seconds(self.jobs[job_id], preset)
+                       for job_id in self.pending]
+        return estimate_makespan(pending, self.workers, busy)
+
+    def run(self, input_files, output_directory=None):
+        """Converte todos os arquivos e retorna (sucessos, falhas)
+
+        Levanta InsufficientSpaceError antes de começar se o total estimado
+        das saídas não couber no disco de destino.
+        """
+        input_files = list(input_files)
+        total_files = len(input_files)
+        if not total_files:
+            return 0, 0
+
+        results = {'successful': 0, 'failed': 0}
+        results_lock = threading.Lock()
+        fingerprint = self.engine.settings_fingerprint()
+        self.progress.reset({i: 0.0 for i in range(total_files)})
+
+        log = self.engine.log_message
+
+        # Temporários órfãos de uma execução anterior que foi interrompida
+        output_dirs = {output_path_for(path, output_directory).parent for path in input_files}
+        for directory in output_dirs:
+            self.engine.cleanup_stale_outputs(directory)
+
+        # Retomar: pular saídas concluídas e ainda íntegras
+        to_convert = []
+        skipped = []
+        for i, input_path in enumerate(input_files):
+            output_file = output_path_for(input_path, output_directory)
+            if self.journal and self.journal.is_complete(input_path, output_file, fingerprint):
+                skipped.append((i, input_path, str(output_file)))
+            else:
+                to_convert.append((i, input_path))
+
+        if skipped:
+            log(f"⏭️ {len(skipped)} arquivos já convertidos anteriormente foram pulados")
+            results['successful'] += len(skipped)
+            for i, input_path, output_file in skipped:
+                self.progress.update(i, ProgressEvent(finished=True))
+                if self.on_progress:
+                    self.on_progress(i, ProgressEvent(finished=True))
+                if self.on_job_done:
+                    self.on_job_done(i, input_path, output_file, True)
+
+        if not to_convert:
+            return results['successful'], results['failed']
+
+        jobs, threads = plan_workers(len(to_convert), self.max_jobs)
+        if self.journal:
+            for i, input_path in to_convert:
+                self.journal.mark(input_path, PENDING)
+
+        prepared = self.prepare_jobs(to_convert)
+
+        # Falhar já no início se as saídas estimadas não couberem no disco
+        self.engine.space.check_batch(
+            [(output_path_for(job.input_path, output_directory), job.output_size)
+             for job in prepared])
+
+        self.jobs = {job.job_id: job for job in prepared}
+        self.progress.set_durations({job.job_id: job.duration for job in prepared})
+        ordered = order_jobs(prepared, self.policy)
+        with self.state_lock:
+            self.pending = [job.job_id for job in ordered]
+            self.running = {}
+            self.workers = jobs
+
+        log("=" * 50)
+        log(f"🎬 Iniciando conversão em lote: {total_files} arquivos")
+        log(f"   ⚙️ {jobs} conversões simultâneas, {threads} threads cada")
+        log(f"   📊 Ordem: {self.policy}, tempo estimado: {format_duration(self.eta())}")
+        log("=" * 50)
+
+        def track_progress(job_id, event):
+            with self.state_lock:
+                if job_id in self.running:
+                    self.running[job_id] = event.percent
+            self.progress.update(job_id, event)
+            if self.on_progress:
+                self.on_progress(job_id, event)
+
+        def convert_one(job):
+            i, input_path = job.job_id, job.input_path
+            with self.state_lock:
+                self.pending.remove(i)
+                if self.cancel_event.is_set():  # Verificar se foi cancelado
+                    return
+                self.running[i] = 0.0
+
+            output_file = output_path_for(input_path, output_directory)
+            name = Path(input_path).name
+
+            log(f"📁 [{i+1}/{total_files}] Convertendo: {name}")
+            if self.journal:
+                self.journal.mark(input_path, RUNNING, output_file)
+
+            success = self.engine.convert(input_path, output_file, threads=threads,
+                                          on_progress=lambda event: track_progress(i, event))
+
+            if self.journal:
+                if success:
+                    state = DONE
+                else:
+                    # Cancelado volta para a fila ao retomar
+                    state = PENDING if self.cancel_event.is_set() else FAILED
+                self.journal.mark(input_path, state, output_file, fingerprint)
+            with self.state_lock:
+                self.running.pop(i, None)
+            with results_lock:
+                results['successful' if success else 'failed'] += 1
+
+            if success:
+                log(f"✅ [{i+1}/{total_files}] Sucesso: {name}")
+            elif self.cancel_event.is_set():
+                log(f"⏹️ [{i+1}/{total_files}] Cancelado: {name}")
+            else:
+                log(f"❌ [{i+1}/{total_files}] Falha: {name}")
+
+            # Arquivo finalizado conta como 100% no progresso agregado
+            self.progress.update(i, ProgressEvent(finished=True))
+            if self.on_progress:
+                self.on_progress(i, ProgressEvent(finished=True))
+            if self.on_job_done:
+                self.on_job_done(i, input_path, str(output_file), success)
+
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            futures = [executor.submit(convert_one, job) for job in ordered]
+            try:
+                for future in futures:
+                    future.result()
+            except KeyboardInterrupt:
+                self.cancel()
+                raise
+
+        return results['successful'], results['failed']
@@ -0,0 +1,312 @@
+"""
+Benchmark de presets e qualidades em vídeos sintéticos.
+
+Gera clipes determinísticos com as fontes lavfi do FFmpeg (testsrc2 e
+sine) em cada contêiner suportado, converte cada um com o motor numa
+matriz preset × qualidade (CRF) × threads e grava fps, velocidade,
+tamanho e, opcionalmente, SSIM/PSNR/VMAF em JSON e CSV.
+
+Uso:
+    python -m conversor.benchmark --presets veryfast,medium --threads 2,8 -o bench.json
+    python -m conversor.benchmark --metrics ssim,psnr --csv bench.csv
+    python -m conversor.benchmark --compare bench_anterior.json
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import re
+import sys
+import tempfile
+from datetime import datetime
+from itertools import product
+from pathlib import Path
+
+from .engine import CRF_VALUES, PRESETS, ConversionEngine, ConversionSettings
+from .metrics import JobMetrics
+from .processes import PROCESSES, ConversionCancelled
+
+# Codecs de vídeo e áudio típicos de cada contêiner de entrada
+CONTAINER_CODECS = {
+    'mpg': ('mpeg2video', 'mp2'),
+    'avi': ('mpeg4', 'pcm_s16le'),
+    'mkv': ('libx264', 'aac'),
+    'wmv': ('wmv2', 'wmav2'),
+    'flv': ('flv', 'aac'),
+    'webm': ('libvpx', 'libopus'),
+}
+
+QUALITY_METRICS = ('ssim', 'psnr', 'vmaf')
+REGRESSION_TOLERANCE = 0.10  # queda de fps aceitável ao comparar com uma execução anterior
+
+_METRIC_PATTERNS = {
+    'ssim': re.compile(r"SSIM .*All:([\d.]+)"),
+    'psnr': re.compile(r"PSNR .*average:([\d.]+|inf)"),
+    'vmaf': re.compile(r"VMAF score[:=]\s*([\d.]+)"),
+}
+
+
+def generate_clip(path, container, duration=10, size='1280x720', rate=30):
+    """Gera (se ainda não existir) um clipe testsrc2 + sine; True se o arquivo existe"""
+    path = Path(path)
+    if path.exists() and path.stat().st_size > 0:
+        return True
+
+    video_codec, audio_codec = CONTAINER_CODECS[container]
+    cmd = [
+        'ffmpeg', '-v', 'error', '-y',
+        '-f', 'lavfi', '-i', f"testsrc2=size={size}:rate={rate}:duration={duration}",
+        '-f', 'lavfi', '-i', f"sine=frequency=440:sample_rate=48000:duration={duration}",
+        '-c:v', video_codec, '-b:v', '8M', '-pix_fmt', 'yuv420p',
+        '-c:a', audio_codec,
+        '-map_metadata', '-1', '-fflags', '+bitexact', '-flags', '+bitexact',
+        str(path)
+    ]
+    try:
+        result = PROCESSES.run(cmd, text=True)
+    except (FileNotFoundError, ConversionCancelled):
+        return False
+    if result.returncode != 0:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+        return False
+    return True
+
+
+def measure_quality(distorted, reference, metric):
+    """SSIM, PSNR ou VMAF da saída em relação ao clipe original (None se indisponível)"""
+    filters = {
+        'ssim': "[0:v][1:v]ssim",
+        'psnr': "[0:v][1:v]psnr",
+        'vmaf': "[0:v][1:v]libvmaf",
+    }
+    cmd = ['ffmpeg', '-hide_banner', '-nostats',
+           '-i', str(distorted), '-i', str(reference),
+           '-lavfi', filters[metric], '-f', 'null', '-']
+    try:
+        result = PROCESSES.run(cmd, text=True)
+    except (FileNotFoundError, ConversionCancelled):
+        return None
+    if result.returncode != 0:
+        return None
+    match = _METRIC_PATTERNS[metric].search(result.stderr or '')
+    if not match:
+        return None
+    return float('inf') if match.group(1) == 'inf' else float(match.group(1))
+
+
+def run_matrix(clips, presets, qualities, thread_counts, output_dir, metrics=(),
+               repeat=1, log=None):
+    """Converte cada clipe em cada combinação; retorna a lista de resultados"""
+    log = log or (lambda message: None)
+    engine = ConversionEngine(log=None)
+    results = []
+
+    for (container, clip), preset, quality, threads in product(
+            clips.items(), presets, qualities, thread_counts):
+        engine.settings = ConversionSettings(quality=quality, preset=preset, stream_copy=False)
+        output_path = Path(output_dir) / f"{container}_{preset}_{quality}_t{threads}.mov"
+
+        best = None
+        for _ in range(max(1, repeat)):
+            job = JobMetrics()
+            success = engine.convert(clip, output_path, threads=threads, metrics=job)
+            if not success:
+                best = None
+                break
+            # Com repetições, vale a execução mais rápida (menos ruído do sistema)
+            if best is None or job.wall_time < best.wall_time:
+                best = job
+
+        result = {
+            'container': container,
+            'preset': preset,
+            'quality': quality,
+            'crf': CRF_VALUES.get(quality, ''),
+            'threads': threads,
+            'success': best is not None,
+        }
+        if best is not None:
+            data = best.to_dict()
+            for key in ('input_bytes', 'output_bytes', 'duration', 'wall_time',
+                        'cpu_user', 'cpu_sys', 'frames', 'avg_fps', 'speed'):
+                result[key] = data[key]
+            for metric in metrics:
+                result[metric] = measure_quality(output_path, clip, metric)
+
+        log(f"{'✅' if result['success'] else '❌'} {container} {preset} {quality} "
+            f"t{threads}: {result.get('avg_fps', 0):.1f} fps, {result.get('speed', 0):.2f}x, "
+            f"{result.get('output_bytes', 0)} bytes")
+        results.append(result)
+    return results
+
+
+def ffmpeg_version():
+    """Primeira linha de 'ffmpeg -version'"""
+    try:
+        result = PROCESSES.run(['ffmpeg', '-version'], text=True)
+    except (FileNotFoundError, ConversionCancelled):
+        return None
+    return (result.stdout or '').splitlines()[0] if result.stdout else None
+
+
+def write_csv(results, csv_file):
+    """Grava os resultados em CSV (uma linha por combinação)"""
+    columns = []
+    for result in results:
+        for key in result:
+            if key not in columns:
+                columns.append(key)
+    with open(csv_file, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def compare(results, baseline_results, tolerance=REGRESSION_TOLERANCE):
+    """Combinações cujo fps caiu mais que tolerance em relação à execução anterior"""
+    def key(result):
+        return (result['container'], result['preset'], result['quality'], result['threads'])
+
+    baseline = {key(result): result for result in baseline_results if result.get('success')}
+    regressions = []
+    for result in results:
+        previous = baseline.get(key(result))
+        if not previous:
+            continue
+        if not result.get('success'):
+            regressions.append((key(result), previous.get('avg_fps', 0), 0.0))
+            continue
+        before, after = previous.get('avg_fps', 0), result.get('avg_fps', 0)
+        if before > 0 and after < before * (1 - tolerance):
+            regressions.append((key(result), before, after))
+    return regressions
+
+
+def _csv_list(value):
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m conversor.benchmark',
+        description="Benchmark de presets, qualidades e threads em vídeos sintéticos.")
+    parser.add_argument('--containers', type=_csv_list, default=list(CONTAINER_CODECS),
+                        help="contêineres de entrada (padrão: todos)")
+    parser.add_argument('--presets', type=_csv_list, default=['veryfast', 'medium', 'slow'],
+                        help="presets do libx264 (padrão: veryfast,medium,slow)")
+    parser.add_argument('--qualities', type=_csv_list, default=list(CRF_VALUES),
+                        help="qualidades (high=CRF 18, medium=23, low=28)")
+    parser.add_argument('--threads', type=_csv_list, default=[str(os.cpu_count() or 1)],
+                        help="números de threads por conversão (padrão: todos os núcleos)")
+    parser.add_argument('--duration', type=int, default=10, help="duração dos clipes em segundos")
+    parser.add_argument('--size', default='1280x720', help="resolução dos clipes")
+    parser.add_argument('--rate', type=int, default=30, help="quadros por segundo dos clipes")
+    parser.add_argument('--metrics', type=_csv_list, default=[],
+                        help="métricas de qualidade: ssim, psnr, vmaf (vmaf exige libvmaf)")
+    parser.add_argument('--repeat', type=int, default=1,
+                        help="repetições por combinação (vale a mais rápida)")
+    parser.add_argument('--work-dir', default=None,
+                        help="pasta dos clipes gerados e das saídas (padrão: temporária)")
+    parser.add_argument('-o', '--output', default='benchmark_results.json',
+                        help="arquivo JSON de resultados")
+    parser.add_argument('--csv', default=None, help="também gravar os resultados em CSV")
+    parser.add_argument('--compare', default=None, metavar='JSON',
+                        help="comparar com um resultado anterior e sair com código 1 se o fps cair")
+    parser.add_argument('--tolerance', type=float, default=REGRESSION_TOLERANCE,
+                        help="queda de fps tolerada na comparação (padrão: 0.10)")
+    return parser
+
+
+def main(argv=None):
+    """Ponto de entrada do benchmark; retorna o código de saída"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    def log(message):
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        print(f"[{timestamp}] {message}", file=sys.stderr, flush=True)
+
+    for preset in args.presets:
+        if preset not in PRESETS:
+            parser.error(f"preset desconhecido: {preset}")
+    for quality in args.qualities:
+        if quality not in CRF_VALUES:
+            parser.error(f"qualidade desconhecida: {quality}")
+    for container in args.containers:
+        if container not in CONTAINER_CODECS:
+            parser.error(f"contêiner desconhecido: {container}")
+    for metric in args.metrics:
+        if metric not in QUALITY_METRICS:
+            parser.error(f"métrica desconhecida: {metric}")
+    try:
+        thread_counts = [int(threads) for threads in args.threads]
+    except ValueError:
+        parser.error("--threads deve ser uma lista de inteiros")
+
+    version = ffmpeg_version()
+    if not version:
+        log("❌ FFmpeg não encontrado!")
+        return 2
+
+    work_dir = Path(args.work_dir or tempfile.mkdtemp(prefix='conversor-bench-'))
+    clips_dir = work_dir / 'clips'
+    outputs_dir = work_dir / 'outputs'
+    clips_dir.mkdir(parents=True, exist_ok=True)
+    outputs_dir.mkdir(parents=True, exist_ok=True)
+
+    clips = {}
+    for container in args.containers:
+        clip = clips_dir / f"testsrc2_{args.size}_{args.rate}fps_{args.duration}s.{container}"
+        if generate_clip(clip, container, args.duration, args.size, args.rate):
+            clips[container] = clip
+        else:
+            log(f"⚠️ Não foi possível gerar o clipe {container} (codec indisponível?)")
+    if not clips:
+        log("❌ Nenhum clipe de teste gerado")
+        return 2
+
+    log(f"📁 Clipes e saídas em {work_dir}")
+    log(f"🏁 {len(clips)} clipes × {len(args.presets)} presets × {len(args.qualities)} "
+        f"qualidades × {len(thread_counts)} threads")
+    try:
+        results = run_matrix(clips, args.presets, args.qualities, thread_counts, outputs_dir,
+                             args.metrics, args.repeat, log)
+    except KeyboardInterrupt:
+        PROCESSES.cancel(wait=True)
+        log("⏹️ Benchmark cancelado")
+        return 130
+
+    report = {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'ffmpeg': version,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'clip': {'duration': args.duration, 'size': args.size, 'rate': args.rate},
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    log(f"💾 Resultados em {args.output}")
+    if args.csv:
+        write_csv(results, args.csv)
+        log(f"💾 CSV em {args.csv}")
+
+    failed = sum(1 for result in results if not result['success'])
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline.get('results', []), args.tolerance)
+        for (container, preset, quality, threads), before, after in regressions:
+            log(f"📉 {container} {preset} {quality} t{threads}: {before:.1f} → {after:.1f} fps")
+        if regressions:
+            return 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+"""
+Interface de linha de comando: python -m conversor
+
+Entradas aceitas: arquivos, pastas, padrões glob ("*.mkv") e "-" para ler
+uma lista de caminhos (um por linha) da entrada padrão. Com --watch, a
+pasta é observada e os vídeos que chegam são convertidos continuamente.
+"""
+
+import argparse
+import glob
+import os
+import signal
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from .batch import BatchConverter, default_max_jobs
+from .engine import (CRF_VALUES, PRESETS, ConversionEngine, ConversionSettings,
+                     format_duration, is_video_file)
+from .diskspace import InsufficientSpaceError
+from .estimate import BitrateStats
+from .history import HISTORY_DB, HistoryStore
+from .journal import JOURNAL_NAME, BatchJournal
+from .output_cache import ConversionCache
+from .probe import ProbeService, default_cache_dir
+from .scan import iter_video_files
+from .scheduler import POLICIES, SpeedStats
+from .twopass import parse_bitrates
+from .watch import STABLE_SECONDS, WatchDaemon
+
+
+def iter_input_paths(entries, stdin=None):
+    """Expande arquivos, pastas, globs e '-' em caminhos de vídeo"""
+    for entry in entries:
+        if entry == '-':
+            stdin = stdin or sys.stdin
+            for line in stdin:
+                line = line.strip()
+                if line:
+                    yield line
+        elif os.path.isdir(entry):
+            yield from sorted(iter_video_files(entry, recursive=False))
+        elif glob.has_magic(entry):
+            for match in sorted(glob.glob(entry, recursive=True)):
+                if os.path.isfile(match) and is_video_file(match):
+                    yield match
+        else:
+            yield entry
+
+
+def collect_inputs(entries, stdin=None):
+    """Lista de entradas sem duplicatas, preservando a ordem"""
+    seen = {}
+    for path in iter_input_paths(entries, stdin):
+        seen.setdefault(os.path.abspath(path), path)
+    return list(seen.values())
+
+
+def build_parser():
+    """Cria o parser de argumentos"""
+    defaults = ConversionSettings()
+    parser = argparse.ArgumentParser(
+        prog="python -m conversor",
+        description="Converte vídeos para MOV compatível com iPhone (sem interface gráfica).")
+    parser.add_argument('inputs', nargs='*',
+                        help="arquivos, pastas, padrões glob ou '-' para ler caminhos da entrada padrão")
+    parser.add_argument('-o', '--output',
+                        help="pasta de saída (ou arquivo .mov quando há uma única entrada); "
+                             "padrão: ao lado do original")
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help=f"conversões simultâneas (padrão: {default_max_jobs()})")
+    parser.add_argument('--settings', default=None,
+                        help="arquivo de configurações JSON (ex.: converter_settings.json)")
+    parser.add_argument('-q', '--quality', choices=sorted(CRF_VALUES), default=None)
+    parser.add_argument('--preset', choices=PRESETS, default=None)
+    parser.add_argument('--maxrate', default=None, help=f"padrão: {defaults.maxrate}")
+    parser.add_argument('--bufsize', default=None, help=f"padrão: {defaults.bufsize}")
+    parser.add_argument('--audio-codec', choices=["aac", "mp3", "ac3", "copy"], default=None)
+    parser.add_argument('--audio-bitrate', default=None, help=f"padrão: {defaults.audio_bitrate}")
+    parser.add_argument('--no-audio', action='store_true', help="remove o áudio")
+    parser.add_argument('--no-stream-copy', action='store_true',
+                        help="sempre recodificar, mesmo streams já compatíveis com o iPhone")
+    parser.add_argument('--target-mb-min', type=float, default=None, metavar='MB',
+                        help="CRF automático por arquivo: no máximo MB por minuto de vídeo")
+    parser.add_argument('--target-ssim', type=float, default=None, metavar='SSIM',
+                        help="CRF automático por arquivo: SSIM mínimo (ex.: 0.97)")
+    parser.add_argument('-b', '--video-bitrate', default=None, metavar='TAXA[,TAXA...]',
+                        help="ABR em duas passagens com taxa média exata (ex.: 4M); várias taxas "
+                             "geram uma saída cada (nome_2M.mov) com uma única primeira passagem")
+    parser.add_argument('--order', choices=sorted(POLICIES), default='longest_first',
+                        help="ordem de início dos arquivos do lote (padrão: longest_first)")
+    parser.add_argument('--journal', default=None,
+                        help="diário do lote para retomar após interrupção "
+                             f"(padrão: {JOURNAL_NAME} na pasta de saída)")
+    parser.add_argument('--no-resume', action='store_true',
+                        help="reconverter tudo, ignorando o diário do lote")
+    parser.add_argument('--segments', type=int, default=None,
+                        help="divide cada vídeo longo em N segmentos codificados em paralelo")
+    parser.add_argument('--log-dir', default=None,
+                        help="pasta onde gravar o log completo do FFmpeg de cada conversão")
+    parser.add_argument('--probe-cache', default=str(default_cache_dir() / 'probe_cache.json'),
+                        help="índice do cache do ffprobe (vazio para desativar)")
+    parser.add_argument('--output-cache', nargs='?', const=str(default_cache_dir() / 'outputs'),
+                        default=None, metavar='DIR',
+                        help="reaproveitar saídas de entradas idênticas (cache de conversões)")
+    parser.add_argument('--output-cache-gb', type=float, default=20.0,
+                        help="tamanho máximo do cache de conversões em GB (padrão: 20)")
+    parser.add_argument('--history', default=None, metavar='DB',
+                        help=f"acrescentar os resultados ao histórico (ex.: {HISTORY_DB}, "
+                             "o mesmo da interface)")
+    parser.add_argument('--export-history', metavar='ARQUIVO',
+                        help="exportar o histórico (--history ou o padrão) para .csv ou .jsonl e sair")
+    parser.add_argument('--watch', metavar='PASTA',
+                        help="observar a pasta e converter os vídeos que chegarem (até Ctrl+C); "
+                             "saídas em -o ou PASTA/converted")
+    parser.add_argument('--done-dir', default=None,
+                        help="para onde mover os originais convertidos (padrão: PASTA/done)")
+    parser.add_argument('--failed-dir', default=None,
+                        help="para onde mover os originais com falha (padrão: PASTA/failed)")
+    parser.add_argument('--poll', action='store_true',
+                        help="observar por varredura periódica em vez de inotify")
+    parser.add_argument('--stable-seconds', type=float, default=STABLE_SECONDS,
+                        help="segundos sem mudanças para considerar um arquivo completo "
+                             f"(padrão: {STABLE_SECONDS:g})")
+    parser.add_argument('--quiet', action='store_true', help="mostra apenas erros")
+    return parser
+
+
+def settings_from_args(args):
+    """Combina o arquivo de configurações com as opções da linha de comando"""
+    settings = ConversionSettings.load(args.settings) if args.settings else ConversionSettings()
+    overrides = {
+        'quality': args.quality,
+        'preset': args.preset,
+        'maxrate': args.maxrate,
+        'bufsize': args.bufsize,
+        'audio_codec': args.audio_codec,
+        'audio_bitrate': args.audio_bitrate,
+        'video_bitrate': args.video_bitrate,
+    }
+    for key, value in overrides.items():
+        if value is not None:
+            setattr(settings, key, value)
+    if args.no_audio:
+        settings.preserve_audio = False
+    if args.segments is not None:
+        settings.segments = args.segments
+    if args.no_stream_copy:
+        settings.stream_copy = False
+    if args.target_mb_min is not None:
+        settings.target_mb_per_min = args.target_mb_min
+    if args.target_ssim is not None:
+        settings.target_ssim = args.target_ssim
+    parse_bitrates(settings.video_bitrate)  # ValueError para taxas inválidas
+    if settings.target_mb_per_min < 0 or not 0 <= settings.target_ssim <= 1:
+        raise ValueError("metas do CRF automático: MB/min >= 0 e SSIM entre 0 e 1")
+    return settings
+
+
+def _interrupt_on_sigterm(signum, frame):
+    """SIGTERM segue o mesmo caminho do Ctrl+C (encerra os processos FFmpeg)"""
+    raise KeyboardInterrupt()
+
+
+def main(argv=None, stdin=None):
+    """Ponto de entrada da linha de comando; retorna o código de saída"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    def log(message):
+        if not args.quiet or message.startswith("❌"):
+            timestamp = datetime.now().strftime("%H:%M:%S")
+            print(f"[{timestamp}] {message}", file=sys.stderr, flush=True)
+
+    if args.export_history:
+        count = HistoryStore(args.history or HISTORY_DB).export(args.export_history)
+        log(f"📤 {count} entradas do histórico exportadas para {args.export_history}")
+        return 0
+    if not args.inputs and not args.watch:
+        parser.error("informe ao menos um arquivo, pasta ou padrão de entrada")
+    if args.watch and not os.path.isdir(args.watch):
+        parser.error(f"pasta a observar não encontrada: {args.watch}")
+
+    try:
+        settings = settings_from_args(args)
+    except (OSError, ValueError) as e:
+        parser.error(f"configurações inválidas: {e}")
+
+    inputs = collect_inputs(args.inputs, stdin) if not args.watch else []
+    if not inputs and not args.watch:
+        log("❌ Nenhum arquivo de vídeo encontrado")
+        return 2
+
+    prober = ProbeService(args.probe_cache or None)
+    speed_stats = SpeedStats(default_cache_dir() / 'speed_stats.json')
+    output_cache = None
+    if args.output_cache:
+        output_cache = ConversionCache(args.output_cache, int(args.output_cache_gb * 1024 ** 3))
+    engine = ConversionEngine(settings, log=log, log_dir=args.log_dir, prober=prober,
+                              speed_stats=speed_stats, output_cache=output_cache,
+                              bitrate_stats=BitrateStats(default_cache_dir() / 'bitrate_stats.json'),
+                              history=HistoryStore(args.history) if args.history else None)
+    if not engine.check_ffmpeg():
+        log("❌ FFmpeg não encontrado!")
+        return 2
+
+    started = time.monotonic()
+    try:
+        signal.signal(signal.SIGTERM, _interrupt_on_sigterm)
+    except ValueError:
+        pass  # main() chamado fora da thread principal
+
+    try:
+        if args.watch:
+            daemon = WatchDaemon(engine, args.watch, args.output, args.done_dir, args.failed_dir,
+                                 max_jobs=args.jobs, policy=args.order,
+                                 use_inotify=not args.poll, stable_seconds=args.stable_seconds)
+            daemon.run()
+            return 0
+        # Entrada única com saída .mov explícita
+        if len(inputs) == 1 and args.output and args.output.lower().endswith('.mov'):
+            Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+            engine.cleanup_stale_outputs(Path(args.output).parent)
+            success = engine.convert(inputs[0], args.output, threads=os.cpu_count())
+            successful, failed = (1, 0) if success else (0, 1)
+        else:
+            if args.output:
+                Path(args.output).mkdir(parents=True, exist_ok=True)
+            journal = None
+            journal_path = args.journal or (Path(args.output) / JOURNAL_NAME if args.output else None)
+            if journal_path and not args.no_resume:
+                journal = BatchJournal(journal_path)
+            batch = BatchConverter(engine, max_jobs=args.jobs, policy=args.order, journal=journal)
+            successful, failed = batch.run(inputs, args.output)
+    except InsufficientSpaceError as e:
+        log(f"❌ {e}")
+        return 1
+    except KeyboardInterrupt:
+        engine.processes.cancel(wait=True)
+        log("⏹️ Conversão cancelada pelo usuário")
+        return 130
+
+    elapsed = time.monotonic() - started
+    log(f"🏁 {successful} sucessos, {failed} falhas em {format_duration(elapsed)}")
+    return 0 if failed == 0 else 1
@@ -0,0 +1,79 @@
+"""
+Decisão de remux: quais streams podem ir para o MOV com -c copy.
+
+O iPhone reproduz H.264 (Baseline/Main/High até o level 4.1, yuv420p,
+progressivo) e áudio AAC. Streams assim são copiados; os demais são
+recodificados.
+"""
+
+from dataclasses import dataclass
+
+COPY_VIDEO_PROFILES = {'baseline', 'constrained baseline', 'main', 'high'}
+MAX_VIDEO_LEVEL = 41
+COPY_AUDIO_CODECS = {'aac'}
+
+
+def video_stream_copyable(stream):
+    """True se o stream de vídeo já é compatível com o iPhone"""
+    if stream.get('codec_name') != 'h264':
+        return False
+    if str(stream.get('profile', '')).lower() not in COPY_VIDEO_PROFILES:
+        return False
+    try:
+        level = int(stream.get('level', -99))
+    except (TypeError, ValueError):
+        return False
+    if not 0 < level <= MAX_VIDEO_LEVEL:
+        return False
+    if stream.get('pix_fmt') != 'yuv420p':
+        return False
+    return stream.get('field_order', 'progressive') in ('progressive', 'unknown')
+
+
+def audio_stream_copyable(stream, settings):
+    """True se o áudio pode ser copiado sem violar as configurações"""
+    if settings.audio_codec not in ('aac', 'copy'):
+        return False
+    return stream.get('codec_name') in COPY_AUDIO_CODECS
+
+
+@dataclass
+class StreamPlan:
+    """Streams escolhidos e se cada um é copiado ou recodificado"""
+    video_index: int
+    audio_index: int = None
+    copy_video: bool = False
+    copy_audio: bool = False
+    crf: str = None  # CRF escolhido pelo modo automático (None: o da qualidade)
+
+    @property
+    def is_remux(self):
+        """Nenhum stream precisa ser recodificado"""
+        return self.copy_video and (self.audio_index is None or self.copy_audio)
+
+    def describe(self):
+        """Resumo legível para o log"""
+        parts = ["vídeo copiado" if self.copy_video else "vídeo recodificado"]
+        if self.audio_index is not None:
+            parts.append("áudio copiado" if self.copy_audio else "áudio recodificado")
+        return ", ".join(parts)
+
+
+def plan_streams(info, settings):
+    """Monta o StreamPlan a partir do ffprobe; None se não houver vídeo"""
+    streams = (info or {}).get('streams', [])
+    video = next((s for s in streams if s.get('codec_type') == 'video'
+                  and not s.get('disposition', {}).get('attached_pic')), None)
+    if video is None:
+        return None
+
+    plan = StreamPlan(video_index=video['index'],
+                      copy_video=video_stream_copyable(video))
+
+    if settings.preserve_audio:
+        audio = next((s for s in streams if s.get('codec_type') == 'audio'), None)
+        if audio is not None:
+            plan.audio_index = audio['index']
+            plan.copy_audio = audio_stream_copyable(audio, settings)
+
+    return plan
@@ -0,0 +1,110 @@
+"""
+Reserva de espaço em disco para as saídas.
+
+O espaço livre é consultado no sistema de arquivos real de destino (o
+diretório existente mais próximo do arquivo de saída). Cada conversão
+reserva o tamanho estimado da sua saída, de modo que jobs simultâneos não
+contem o mesmo espaço livre duas vezes; o lote inteiro é verificado antes
+de começar. O que uma conversão em andamento já gravou nos temporários
+sai do espaço livre real, então só a parte ainda não gravada da reserva é
+descontada.
+"""
+
+import os
+import shutil
+import threading
+from pathlib import Path
+
+SAFETY_MARGIN = 1.2  # folga sobre o tamanho estimado
+
+
+class InsufficientSpaceError(Exception):
+    """Não há espaço livre para as saídas estimadas"""
+
+
+def existing_directory(path):
+    """Diretório existente mais próximo de path (a pasta pode ainda não existir)"""
+    directory = Path(os.path.abspath(path)).parent
+    while not directory.exists() and directory != directory.parent:
+        directory = directory.parent
+    return directory
+
+
+def filesystem_of(path):
+    """(st_dev, diretório) do sistema de arquivos onde path será gravado"""
+    directory = existing_directory(path)
+    return os.stat(directory).st_dev, directory
+
+
+class SpaceReservations:
+    """Espaço reservado por sistema de arquivos, compartilhado entre threads"""
+
+    def __init__(self, margin=SAFETY_MARGIN):
+        self.margin = margin
+        self.lock = threading.Lock()
+        self.reserved = {}  # st_dev -> {saída: (bytes reservados, temporários)}
+
+    def required(self, estimated_size):
+        """Bytes a reservar para uma saída estimada"""
+        return int(estimated_size * self.margin)
+
+    def outstanding(self, device):
+        """Bytes reservados no sistema de arquivos que ainda não foram gravados"""
+        total = 0
+        for needed, written_paths in self.reserved.get(device, {}).values():
+            written = 0
+            for path in written_paths:
+                try:
+                    written += os.path.getsize(path)
+                except OSError:
+                    pass
+            total += max(needed - written, 0)
+        return total
+
+    def free_space(self, device, directory):
+        """Espaço livre descontando as reservas (chamar com self.lock)"""
+        return shutil.disk_usage(directory).free - self.outstanding(device)
+
+    def reserve(self, output_path, estimated_size, written_paths=()):
+        """Reserva espaço para a saída; retorna (ok, livre, necessário)
+
+        written_paths são os temporários em que a conversão grava: o tamanho
+        atual deles já saiu do espaço livre e deixa de contar na reserva.
+        """
+        needed = self.required(estimated_size)
+        device, directory = filesystem_of(output_path)
+        with self.lock:
+            free = self.free_space(device, directory)
+            if free < needed:
+                return False, free, needed
+            self.reserved.setdefault(device, {})[str(output_path)] = (needed, tuple(written_paths))
+        return True, free, needed
+
+    def release(self, output_path, estimated_size):
+        """Devolve a reserva feita por reserve()"""
+        device, _ = filesystem_of(output_path)
+        with self.lock:
+            reservations = self.reserved.get(device, {})
+            reservations.pop(str(output_path), None)
+            if not reservations:
+                self.reserved.pop(device, None)
+
+    def check_batch(self, outputs):
+        """Verifica de uma vez o espaço para [(caminho de saída, tamanho estimado)]
+
+        Levanta InsufficientSpaceError com o primeiro sistema de arquivos
+        em que o total não cabe.
+        """
+        totals = {}
+        for output_path, estimated_size in outputs:
+            device, directory = filesystem_of(output_path)
+            total, _ = totals.get(device, (0, directory))
+            totals[device] = (total + self.required(estimated_size), directory)
+
+        with self.lock:
+            for device, (needed, directory) in totals.items():
+                free = self.free_space(device, directory)
+                if free < needed:
+                    raise InsufficientSpaceError(
+                        f"Espaço insuficiente em {directory}: o lote precisa de cerca de "
+                        f"{needed / 1024 ** 3:.1f} GB e há {max(free, 0) / 1024 ** 3:.1f} GB livres")
@@ -0,0 +1,652 @@
+"""
+Motor de conversão com FFmpeg, independente da interface gráfica.
+
+Este módulo não importa tkinter, tkinterdnd2 nem PIL: pode ser usado em
+scripts, na linha de comando (python -m conversor) e em máquinas sem
+servidor gráfico.
+"""
+
+import hashlib
+import io
+import itertools
+import json
+import subprocess
+import time
+from dataclasses import dataclass, asdict, fields, replace
+from pathlib import Path
+
+from .atomic import cleanup_stale_temp, commit_output, discard, temp_output_path
+from .autocrf import CrfSearch
+from .compat import plan_streams
+from .diskspace import SpaceReservations
+from .estimate import estimate_output_size, parse_bitrate
+from .history import STATUS_CANCELLED, STATUS_FAILED, STATUS_SUCCESS
+from .hashing import content_digest
+from .output_cache import cache_key
+from .probe import ProbeService, get_duration
+from .metrics import JobMetrics
+from .processes import CREATION_FLAGS, PROCESSES, ConversionCancelled, wait_with_usage
+from .progress import ProgressParser
+from .segments import MIN_SEGMENTED_DURATION, SegmentedEncoder
+from .stderr_tail import DEFAULT_TAIL_BYTES, StderrTail, job_log_path, prune_job_logs
+from .twopass import TwoPassEncoder, rendition_path
+
+VIDEO_EXTENSIONS = ('.mpg', '.mpeg', '.avi', '.mkv', '.wmv', '.flv', '.webm')
+
+PRESETS = ("ultrafast", "superfast", "veryfast", "faster",
+           "fast", "medium", "slow", "slower", "veryslow")
+
+# Parâmetros do FFmpeg baseados na qualidade
+CRF_VALUES = {'high': '18', 'medium': '23', 'low': '28'}
+
+JOB_LOG_PRUNE_INTERVAL = 50  # logs de conversão criados entre duas podas de log_dir
+
+
+def format_file_size(size_bytes):
+    """Formata tamanho de arquivo em bytes para formato legível"""
+    if size_bytes == 0:
+        return "0 B"
+
+    size_names = ["B", "KB", "MB", "GB", "TB"]
+    i = 0
+    while size_bytes >= 1024 and i < len(size_names) - 1:
+        size_bytes /= 1024.0
+        i += 1
+
+    return f"{size_bytes:.1f} {size_names[i]}"
+
+
+def format_duration(seconds):
+    """Formata duração em segundos para formato legível"""
+    if seconds == 0:
+        return "00:00:00"
+
+    hours = int(seconds // 3600)
+    minutes = int((seconds % 3600) // 60)
+    secs = int(seconds % 60)
+
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}"
+
+
+def is_video_file(file_path):
+    """Verifica pela extensão se o arquivo é um vídeo suportado"""
+    return Path(file_path).suffix.lower() in VIDEO_EXTENSIONS
+
+
+@dataclass
+class ConversionSettings:
+    """Parâmetros de conversão (mesmas chaves do converter_settings.json)"""
+    quality: str = "medium"
+    preset: str = "medium"
+    maxrate: str = "10M"
+    bufsize: str = "16M"
+    audio_codec: str = "aac"
+    audio_bitrate: str = "128k"
+    preserve_audio: bool = True
+    stream_copy: bool = True  # Copiar (remux) streams já compatíveis com o iPhone
+    segments: int = 0  # >1: divide vídeos longos em segmentos codificados em paralelo
+    target_mb_per_min: float = 0.0  # >0: CRF automático para caber em MB por minuto
+    target_ssim: float = 0.0  # >0: CRF automático com SSIM mínimo (ex.: 0.97)
+    video_bitrate: str = ""  # ex.: '4M' ou '4M,2M': ABR em duas passagens, uma saída por taxa
+
+    @property
+    def auto_crf(self):
+        """True se o CRF é escolhido por arquivo a partir de trechos de amostra"""
+        return not self.two_pass and (self.target_mb_per_min > 0 or self.target_ssim > 0)
+
+    @property
+    def abr_bitrates(self):
+        """Taxas do ABR em duas passagens (a primeira é a da saída principal)"""
+        return [bitrate.strip() for bitrate in self.video_bitrate.split(',') if bitrate.strip()]
+
+    @property
+    def two_pass(self):
+        """True se o vídeo é codificado numa taxa média exata, em duas passagens"""
+        return bool(self.abr_bitrates)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Cria as configurações ignorando chaves desconhecidas"""
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in names})
+
+    @classmethod
+    def load(cls, settings_file="converter_settings.json"):
+        """Carrega as configurações salvas pela interface, se existirem"""
+        path = Path(settings_file)
+        if not path.exists():
+            return cls()
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+    def to_dict(self):
+        """Retorna as configurações como dicionário"""
+        return asdict(self)
+
+
+class ConversionEngine:
+    """Executa conversões com FFmpeg usando um ConversionSettings
+
+    log_dir, se informado, recebe o stderr completo de cada conversão (os
+    logs antigos são podados a cada JOB_LOG_PRUNE_INTERVAL arquivos); em
+    memória ficam apenas os últimos tail_bytes para o relatório de erro.
+    prober é o ProbeService compartilhado (cache do ffprobe) e speed_stats
+    (SpeedStats) acumula a velocidade observada por preset para o ETA.
+    Os processos FFmpeg passam pelo ProcessRegistry: cancel() encerra os
+    que estão rodando e impede novos até reset_cancel(). output_cache
+    (ConversionCache), se informado, reaproveita saídas de entradas idênticas.
+    bitrate_stats (BitrateStats) guarda a taxa observada por qualidade, usada
+    para estimar o tamanho das saídas e reservar espaço (SpaceReservations).
+    history (HistoryStore) recebe uma entrada por conversão.
+    """
+
+    def __init__(self, settings=None, log=None, log_dir=None, tail_bytes=DEFAULT_TAIL_BYTES,
+                 prober=None, speed_stats=None, output_cache=None, bitrate_stats=None,
+                 space=None, history=None):
+        self.settings = settings or ConversionSettings()
+        self.log = log
+        self.prober = prober or ProbeService()
+        self.speed_stats = speed_stats
+        self.log_dir = log_dir
+        self.job_logs = itertools.count()
+        self.tail_bytes = tail_bytes
+        self.processes = PROCESSES
+        self.output_cache = output_cache
+        self.bitrate_stats = bitrate_stats
+        self.space = space or SpaceReservations()
+        self.history = history
+
+    @property
+    def cancelled(self):
+        """True se cancel() foi chamado e ainda não houve reset_cancel()"""
+        return self.processes.cancelled.is_set()
+
+    def cancel(self):
+        """Encerra os processos em execução (SIGINT, depois SIGKILL)"""
+        self.processes.cancel()
+
+    def reset_cancel(self):
+        """Permite novas conversões após um cancelamento"""
+        self.processes.reset()
+
+    def job_log_path(self, input_path):
+        """Arquivo para o stderr completo da conversão (None sem log_dir)
+
+        O primeiro log e depois um a cada JOB_LOG_PRUNE_INTERVAL podam a pasta.
+        """
+        if not self.log_dir:
+            return None
+        if next(self.job_logs) % JOB_LOG_PRUNE_INTERVAL == 0:
+            prune_job_logs(self.log_dir)
+        return job_log_path(self.log_dir, input_path)
+
+    def log_message(self, message):
+        """Encaminha a mensagem para o callback de log, se houver"""
+        if self.log:
+            self.log(message)
+
+    def check_ffmpeg(self):
+        """Retorna True se o FFmpeg estiver instalado"""
+        try:
+            subprocess.run(['ffmpeg', '-version'],
+                         stdout=subprocess.DEVNULL,
+                         stderr=subprocess.DEVNULL,
+                         check=True,
+                         creationflags=CREATION_FLAGS)
+            return True
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            return False
+
+    def probe(self, file_path):
+        """Retorna as informações do FFprobe (formato e streams) ou None
+
+        O ffprobe roda no registro do engine: cancel() também o encerra.
+        """
+        return self.prober.probe(file_path, self.processes)
+
+    def video_encode_args(self, crf=None):
+        """Parâmetros do libx264 (os mesmos para arquivo inteiro ou segmentos)
+
+        crf substitui o CRF da qualidade (escolhido pelo modo automático).
+        """
+        settings = self.settings
+        return [
+            '-c:v', 'libx264',
+            '-preset', settings.preset,
+            '-crf', crf or CRF_VALUES[settings.quality],
+            '-pix_fmt', 'yuv420p',
+            '-profile:v', 'high',
+            '-level', '4.1',
+            '-maxrate', settings.maxrate,
+            '-bufsize', settings.bufsize,
+        ]
+
+    def abr_video_args(self, bitrate, pass_number, passlog_file):
+        """Parâmetros do libx264 numa passagem do ABR (taxa média com VBV)"""
+        settings = self.settings
+        # maxrate abaixo da média faria o x264 cair para CBR na própria maxrate
+        maxrate = settings.maxrate
+        if parse_bitrate(maxrate) < parse_bitrate(bitrate):
+            maxrate = bitrate
+        return [
+            '-c:v', 'libx264',
+            '-preset', settings.preset,
+            '-b:v', bitrate,
+            '-pass', str(pass_number),
+            '-passlogfile', str(passlog_file),
+            '-pix_fmt', 'yuv420p',
+            '-profile:v', 'high',
+            '-level', '4.1',
+            '-maxrate', maxrate,
+            '-bufsize', settings.bufsize,
+        ]
+
+    def audio_args(self, plan=None):
+        """Parâmetros de áudio conforme as configurações e o StreamPlan"""
+        settings = self.settings
+        if not settings.preserve_audio:
+            return ['-an']
+        if (plan and plan.copy_audio) or settings.audio_codec == 'copy':
+            return ['-c:a', 'copy']
+        return ['-c:a', settings.audio_codec, '-b:a', settings.audio_bitrate]
+
+    def build_command(self, input_path, output_path, threads=None, plan=None, video_args=None):
+        """Monta a linha de comando do FFmpeg
+
+        plan (StreamPlan) define os streams mapeados e quais são copiados;
+        sem plan, o FFmpeg escolhe os streams e tudo é recodificado.
+        video_args substitui os parâmetros do libx264 (ex.: passagem do ABR).
+        """
+        cmd = [
+            'ffmpeg',
+            '-nostats',
+            '-progress', 'pipe:1',  # Progresso estruturado (chave=valor) no stdout
+            '-i', str(input_path),
+            '-y',  # Sobrescrever arquivo existente
+        ]
+
+        if plan:
+            cmd.extend(['-map', f'0:{plan.video_index}'])
+            if plan.audio_index is not None:
+                cmd.extend(['-map', f'0:{plan.audio_index}'])
+
+        copy_video = plan is not None and plan.copy_video
+        if copy_video:
+            cmd.extend(['-c:v', 'copy'])
+        else:
+            cmd.extend(video_args or self.video_encode_args(plan.crf if plan else None))
+
+        cmd.extend(self.audio_args(plan))
+        cmd.extend(['-movflags', '+faststart'])
+
+        if threads and not copy_video:
+            cmd.extend(['-threads', str(threads)])
+
+        cmd.append(str(output_path))
+        return cmd
+
+    def convert(self, input_path, output_path, threads=None, on_progress=None, metrics=None):
+        """Executa a conversão com FFmpeg
+
+        on_progress, se informado, recebe um ProgressEvent a cada atualização
+        do FFmpeg. Retorna True em caso de sucesso.
+
+        O FFmpeg grava num temporário na pasta de destino, renomeado para
+        output_path só no fim; uma falha nunca deixa um .mov incompleto.
+        Com history (HistoryStore), o resultado é acrescentado ao histórico;
+        metrics (JobMetrics), se informado, recebe as medições da conversão.
+        """
+        settings = self.settings
+        metrics = metrics or JobMetrics()
+        metrics.preset = settings.preset
+        metrics.crf = '' if settings.two_pass else CRF_VALUES.get(settings.quality, '')
+        success = self._convert(input_path, output_path, threads, on_progress, metrics)
+        if self.history:
+            self.record_history(input_path, output_path, success, metrics)
+        return success
+
+    def record_history(self, input_path, output_path, success, metrics=None):
+        """Acrescenta o resultado da conversão (e suas métricas) ao histórico"""
+        if success:
+            status = STATUS_SUCCESS
+        else:
+            status = STATUS_CANCELLED if self.cancelled else STATUS_FAILED
+        try:
+            size = metrics.output_bytes if (success and metrics) else None
+            self.history.add(input_path, output_path, status, size,
+                             metrics=metrics.to_dict() if metrics else None)
+        except Exception as e:
+            self.log_message(f"⚠️ Erro ao salvar histórico: {e}")
+
+    def _convert(self, input_path, output_path, threads=None, on_progress=None, metrics=None):
+        metrics = metrics or JobMetrics()
+        temp_path = temp_output_path(output_path)
+        renditions = self.extra_renditions(output_path)
+        reserved = 0
+        started = time.monotonic()
+        try:
+            # Validar arquivo de entrada
+            if not self.validate_input_file(input_path):
+                return False
+            metrics.input_bytes = Path(input_path).stat().st_size
+
+            # Duração total vem do ffprobe, não do stderr do FFmpeg
+            info = self.probe(input_path)
+            metrics.duration = get_duration(info)
+
+            plan = plan_streams(info, self.settings)
+            if plan and not self.settings.stream_copy:
+                plan.copy_video = plan.copy_audio = False
+            # A taxa média só é garantida recodificando o vídeo
+            if plan and self.settings.two_pass:
+                plan.copy_video = False
+            if plan and (plan.copy_video or plan.copy_audio):
+                self.log_message(f"⚡ Remux: {plan.describe()}")
+
+            # Reservar espaço em disco para a saída estimada
+            has_space, reserved = self.check_disk_space(
+                input_path, output_path, self.space_needed(input_path, info),
+                [temp_path] + [temp for _, _, temp in renditions])
+            if not has_space:
+                return False
+
+            if not self.produce(input_path, temp_path, info, plan, threads, on_progress, metrics,
+                                [(bitrate, temp) for bitrate, _, temp in renditions]):
+                return False
+
+            # Verificar se o arquivo de saída foi criado
+            if not temp_path.exists():
+                self.log_message("❌ Arquivo de saída não foi criado")
+                return False
+
+            # Verificar tamanho do arquivo de saída
+            output_size = temp_path.stat().st_size
+            if output_size == 0:
+                self.log_message("❌ Arquivo de saída está vazio")
+                return False
+
+            # Taxas adicionais do ABR: todas precisam existir antes de publicar qualquer uma
+            for bitrate, _, temp in renditions:
+                if not temp.exists() or temp.stat().st_size == 0:
+                    self.log_message(f"❌ Saída de {bitrate} não foi criada")
+                    return False
+            for bitrate, path, temp in renditions:
+                size = temp.stat().st_size
+                commit_output(temp, path)
+                self.log_message(f"   📦 {path.name}: {format_file_size(size)}")
+
+            commit_output(temp_path, output_path)
+            metrics.output_bytes = output_size
+            metrics.wall_time = time.monotonic() - started
+            self.log_message(f"✅ Conversão concluída. Tamanho: {format_file_size(output_size)} "
+                             f"em {format_duration(metrics.wall_time)} ({metrics.speed:.2f}x)")
+            return True
+
+        except ConversionCancelled:
+            self.log_message(f"⏹️ Conversão cancelada: {Path(input_path).name}")
+            return False
+
+        except Exception as e:
+            self.log_message(f"❌ Erro na conversão: {e}")
+            return False
+
+        finally:
+            metrics.wall_time = metrics.wall_time or time.monotonic() - started
+            discard(temp_path)
+            for _, _, temp in renditions:
+                discard(temp)
+            if reserved:
+                self.space.release(output_path, reserved)
+
+    def extra_renditions(self, output_path):
+        """Taxas do ABR além da primeira: [(taxa, saída, temporário)]"""
+        renditions = []
+        for bitrate in self.settings.abr_bitrates[1:]:
+            path = rendition_path(output_path, bitrate)
+            renditions.append((bitrate, path, temp_output_path(path)))
+        return renditions
+
+    def settings_fingerprint(self):
+        """Resumo das configurações que determinam a saída (diário do lote)"""
+        args = self.cache_args() + [f'<stream-copy={self.settings.stream_copy}>']
+        return hashlib.blake2b(json.dumps(args).encode(), digest_size=16).hexdigest()
+
+    def cache_args(self, plan=None):
+        """Argumentos do FFmpeg que determinam a saída (sem caminhos nem threads)"""
+        args = self.build_command('<input>', '<output>', plan=plan)
+        if self.settings.segments > 1:
+            args.append(f'<segments={self.settings.segments}>')
+        # O CRF automático depende só da entrada e das metas
+        if self.settings.auto_crf:
+            args.append(f'<auto-crf={self.settings.target_mb_per_min:g}MB/min,'
+                        f'ssim={self.settings.target_ssim:g}>')
+        if self.settings.two_pass:
+            args.append(f'<abr={self.settings.abr_bitrates[0]},maxrate={self.settings.maxrate},'
+                        f'bufsize={self.settings.bufsize}>')
+        return args
+
+    def produce(self, input_path, output_path, info, plan=None, threads=None, on_progress=None,
+                metrics=None, extra_outputs=()):
+        """Gera a saída a partir do cache de conversões ou codificando
+
+        extra_outputs [(taxa, caminho)] são as taxas adicionais do ABR; o
+        cache guarda uma saída só, então elas sempre são codificadas.
+        """
+        if not self.output_cache or extra_outputs:
+            return self.encode(input_path, output_path, info, plan, threads, on_progress, metrics,
+                               extra_outputs)
+
+        key = cache_key(content_digest(input_path), self.cache_args(plan))
+        if self.output_cache.fetch(key, output_path):
+            self.log_message("♻️ Conversão idêntica encontrada no cache; saída reaproveitada")
+            return True
+
+        produced = None
+        try:
+            success = self.encode(input_path, output_path, info, plan, threads, on_progress,
+                                  metrics)
+            if success and Path(output_path).is_file() and Path(output_path).stat().st_size > 0:
+                produced = output_path
+            return success
+        finally:
+            self.output_cache.finish(key, produced)
+
+    def encode(self, input_path, output_path, info, plan=None, threads=None, on_progress=None,
+               metrics=None, extra_outputs=()):
+        """Gera o arquivo de saída, em um processo, em segmentos paralelos ou em duas passagens"""
+        duration = get_duration(info)
+
+        # ABR: taxa média exata; não usa CRF automático nem segmentos
+        if self.settings.two_pass and plan is not None and not plan.copy_video:
+            outputs = [(self.settings.abr_bitrates[0], output_path)] + list(extra_outputs)
+            return TwoPassEncoder(self, threads).encode(input_path, outputs, info, plan,
+                                                        on_progress, metrics)
+
+        if self.settings.auto_crf and plan is not None and not plan.copy_video:
+            crf = CrfSearch(self, input_path, info, plan, threads).choose(Path(output_path).parent)
+            if crf is not None:
+                plan.crf = str(crf)
+                if metrics:
+                    metrics.crf = plan.crf
+
+        if (self.settings.segments > 1 and plan is not None and not plan.copy_video
+                and duration >= MIN_SEGMENTED_DURATION):
+            encoder = SegmentedEncoder(self, self.settings.segments, threads)
+            return encoder.encode(input_path, output_path, info, plan, on_progress, metrics)
+
+        started = time.monotonic()
+        cmd = self.build_command(input_path, output_path, threads, plan)
+        success = self.run_ffmpeg(cmd, input_path, duration, on_progress, metrics)
+
+        # Só conversões com vídeo recodificado entram nas médias de velocidade e taxa
+        if success and not (plan and plan.copy_video):
+            if self.speed_stats:
+                self.speed_stats.record(self.settings.preset, duration, time.monotonic() - started)
+            # A média por qualidade não vale para um CRF escolhido por arquivo
+            if self.bitrate_stats and not (plan and plan.crf):
+                self.record_bitrate(output_path, duration, plan)
+        return success
+
+    def record_bitrate(self, output_path, duration, plan=None):
+        """Registra a taxa de vídeo obtida, para estimativas futuras de tamanho"""
+        settings = self.settings
+        audio_bitrate = 0
+        if settings.preserve_audio and not (plan and plan.audio_index is None):
+            audio_bitrate = parse_bitrate(settings.audio_bitrate)
+        try:
+            output_size = Path(output_path).stat().st_size
+        except OSError:
+            return
+        self.bitrate_stats.record(settings.quality, output_size, duration, audio_bitrate)
+
+    def run_ffmpeg(self, cmd, input_path, duration=0.0, on_progress=None, metrics=None):
+        """Executa um comando do FFmpeg com -progress pipe:1; True se sair com código 0
+
+        metrics (JobMetrics), se informado, recebe o tempo de CPU e os quadros.
+        """
+        self.log_message(f"🔧 Comando FFmpeg: {' '.join(cmd)}")
+
+        # Executar FFmpeg (registrado para poder ser cancelado)
+        process = self.processes.popen(
+            cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+
+        try:
+            # Esvaziar o stderr em paralelo para o pipe nunca encher
+            log_path = self.job_log_path(input_path)
+            stderr_tail = StderrTail(process.stderr, self.tail_bytes, log_path).start()
+
+            # Monitorar progresso
+            last_event = self.monitor_ffmpeg_progress(process, duration, on_progress)
+
+            cpu_user, cpu_sys = wait_with_usage(process)
+            stderr_tail.join()
+        finally:
+            self.processes.release(process)
+
+        if metrics:
+            metrics.add_process(cpu_user, cpu_sys, last_event.frame if last_event else 0)
+
+        if process.returncode != 0:
+            if self.cancelled:
+                raise ConversionCancelled()
+            self.log_message(f"❌ Erro no FFmpeg (código {process.returncode}):")
+            for line in stderr_tail.last_lines():
+                self.log_message(f"   {line}")
+            if stderr_tail.log_path:
+                self.log_message(f"   📄 Log completo: {stderr_tail.log_path}")
+            return False
+        return True
+
+    def cleanup_stale_outputs(self, directory):
+        """Remove temporários deixados na pasta por conversões interrompidas"""
+        removed = cleanup_stale_temp(directory)
+        if removed:
+            self.log_message(f"🧹 {removed} arquivos temporários de conversões interrompidas removidos")
+        return removed
+
+    def validate_input_file(self, file_path):
+        """Valida o arquivo de entrada"""
+        try:
+            path = Path(file_path)
+
+            # Verificar se o arquivo existe
+            if not path.exists():
+                self.log_message(f"❌ Arquivo não encontrado: {path.name}")
+                return False
+
+            # Verificar se é um arquivo (não pasta)
+            if not path.is_file():
+                self.log_message(f"❌ Não é um arquivo válido: {path.name}")
+                return False
+
+            # Verificar se o arquivo não está vazio
+            if path.stat().st_size == 0:
+                self.log_message(f"❌ Arquivo está vazio: {path.name}")
+                return False
+
+            # Verificar se é um formato de vídeo suportado
+            if not is_video_file(path):
+                self.log_message(f"❌ Formato não suportado: {path.suffix}")
+                return False
+
+            # Verificar se o arquivo pode ser lido
+            try:
+                with open(path, 'rb') as f:
+                    f.read(1024)  # Tentar ler os primeiros bytes
+            except PermissionError:
+                self.log_message(f"❌ Sem permissão para ler: {path.name}")
+                return False
+            except Exception as e:
+                self.log_message(f"❌ Erro ao ler arquivo: {e}")
+                return False
+
+            return True
+
+        except Exception as e:
+            self.log_message(f"❌ Erro na validação: {e}")
+            return False
+
+    def estimate_size(self, info, settings=None):
+        """Tamanho estimado da saída (bytes), usando a taxa observada em conversões anteriores"""
+        settings = settings or self.settings
+        crf_bitrate = self.bitrate_stats.bitrate(settings.quality) if self.bitrate_stats else None
+        return estimate_output_size(info, settings, crf_bitrate)
+
+    def space_needed(self, input_path, info):
+        """Bytes que a conversão deve ocupar no destino"""
+        estimated_size = self.estimate_size(info)
+        # Sem duração conhecida, a entrada serve de estimativa conservadora
+        if not estimated_size:
+            try:
+                estimated_size = Path(input_path).stat().st_size
+            except OSError:
+                estimated_size = 0
+        # Segmentos intermediários ocupam espaço junto com a saída final
+        if self.settings.segments > 1 and not self.settings.two_pass:
+            estimated_size *= 2
+        # Uma saída por taxa adicional do ABR
+        for bitrate in self.settings.abr_bitrates[1:]:
+            estimated_size += estimate_output_size(info, replace(self.settings, video_bitrate=bitrate))
+        return estimated_size
+
+    def check_disk_space(self, input_path, output_path, estimated_size, written_paths=()):
+        """Reserva espaço para a saída no sistema de arquivos de destino
+
+        written_paths são os temporários da conversão (ver SpaceReservations.reserve).
+        Retorna (ok, bytes reservados); a reserva é devolvida com
+        self.space.release(output_path, bytes reservados).
+        """
+        try:
+            ok, free_space, required_space = self.space.reserve(output_path, estimated_size,
+                                                                written_paths)
+            if not ok:
+                self.log_message(f"❌ Espaço insuficiente em disco")
+                self.log_message(f"   Espaço livre: {format_file_size(max(free_space, 0))}")
+                self.log_message(f"   Espaço necessário: {format_file_size(required_space)}")
+                return False, 0
+            return True, estimated_size
+
+        except Exception as e:
+            self.log_message(f"⚠️ Erro ao verificar espaço em disco: {e}")
+            return True, 0  # Continuar mesmo com erro na verificação
+
+    def monitor_ffmpeg_progress(self, process, duration=0.0, on_progress=None):
+        """Lê o progresso do FFmpeg (-progress pipe:1) até o fim do stdout
+
+        Retorna o último ProgressEvent (ou None).
+        """
+        parser = ProgressParser(duration)
+        stdout = io.TextIOWrapper(process.stdout, encoding='utf-8', errors='replace')
+
+        last_event = None
+        for line in stdout:
+            event = parser.feed(line)
+            if event is not None:
+                last_event = event
+                if on_progress:
+                    on_progress(event)
+        return last_event
@@ -0,0 +1,103 @@
+"""
+Estimativa do tamanho de saída a partir dos dados do ffprobe.
+"""
+
+from .compat import plan_streams
+from .scheduler import MovingAverages
+
+MUXING_OVERHEAD = 1.02  # ~2% de overhead do contêiner MOV
+
+# Taxa típica do libx264 em 1080p para cada qualidade (CRF 18/23/28), em bits/s
+TYPICAL_QUALITY_BITRATE = {'high': 8_000_000, 'medium': 4_500_000, 'low': 2_500_000}
+
+
+def parse_bitrate(value):
+    """Converte '10M', '128k' ou '2500000' em bits/s (0 se inválido)"""
+    value = str(value or '').strip().lower()
+    multipliers = {'k': 1_000, 'm': 1_000_000, 'g': 1_000_000_000}
+    factor = multipliers.get(value[-1:], 1)
+    if factor != 1:
+        value = value[:-1]
+    try:
+        return int(float(value) * factor)
+    except ValueError:
+        return 0
+
+
+def _stream_bitrate(info, index):
+    """Taxa de bits de um stream, se o ffprobe informar"""
+    for stream in info.get('streams', []):
+        if stream.get('index') == index:
+            return parse_bitrate(stream.get('bit_rate'))
+    return 0
+
+
+def audio_bitrate(info, settings, plan=None):
+    """Taxa de áudio (bits/s) da saída conforme as configurações e o StreamPlan"""
+    if not settings.preserve_audio:
+        return 0
+    if plan and plan.audio_index is not None and (plan.copy_audio or settings.audio_codec == 'copy'):
+        return _stream_bitrate(info, plan.audio_index) or 192_000
+    return parse_bitrate(settings.audio_bitrate)
+
+
+def estimate_output_size(info, settings, crf_bitrate=None):
+    """Tamanho estimado (bytes) do MOV gerado; 0 se não for possível estimar
+
+    crf_bitrate substitui a taxa típica da qualidade (ex.: média observada
+    em conversões anteriores).
+    """
+    if not info:
+        return 0
+    format_info = info.get('format', {})
+    try:
+        duration = float(format_info.get('duration', 0))
+    except (TypeError, ValueError):
+        duration = 0.0
+    if duration <= 0:
+        return 0
+
+    plan = plan_streams(info, settings) if settings.stream_copy else None
+    if plan and settings.two_pass:
+        plan.copy_video = False
+    source_bitrate = parse_bitrate(format_info.get('bit_rate'))
+
+    # Vídeo
+    video_bitrate = _stream_bitrate(info, plan.video_index) if plan else 0
+    if plan and plan.copy_video:
+        if not video_bitrate:
+            video_bitrate = source_bitrate
+    elif settings.two_pass:
+        # ABR: a saída principal tem exatamente a primeira taxa pedida
+        video_bitrate = parse_bitrate(settings.abr_bitrates[0])
+    else:
+        target = crf_bitrate or TYPICAL_QUALITY_BITRATE.get(settings.quality, 0)
+        if settings.target_mb_per_min > 0:
+            # CRF automático: o orçamento inclui o áudio e o contêiner (como em autocrf)
+            budget = settings.target_mb_per_min * 1024 ** 2 * 8 / 60 / MUXING_OVERHEAD
+            target = max(budget - audio_bitrate(info, settings, plan), 1)
+        maxrate = parse_bitrate(settings.maxrate)
+        if maxrate:
+            target = min(target, maxrate) if target else maxrate
+        # Recodificar raramente produz mais bits do que a fonte tinha
+        if video_bitrate or source_bitrate:
+            target = min(target, video_bitrate or source_bitrate)
+        video_bitrate = target
+
+    return int(duration * (video_bitrate + audio_bitrate(info, settings, plan)) / 8 * MUXING_OVERHEAD)
+
+
+class BitrateStats(MovingAverages):
+    """Taxa de vídeo observada (bits/s) por qualidade (CRF), persistida em JSON"""
+
+    def bitrate(self, quality):
+        """Média observada para a qualidade, ou None antes da primeira conversão"""
+        return self.get(quality)
+
+    def record(self, quality, output_bytes, duration, audio_bitrate=0):
+        """Registra o tamanho de uma saída recodificada"""
+        if output_bytes <= 0 or duration <= 0:
+            return
+        video_bitrate = output_bytes * 8 / MUXING_OVERHEAD / duration - audio_bitrate
+        if video_bitrate > 0:
+            self.update(quality, video_bitrate)
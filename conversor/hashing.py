@@ -0,0 +1,41 @@
+"""
+Hashes de arquivos: por amostragem de blocos (rápido, para conferir uma
+saída já conhecida) ou do conteúdo inteiro (para identificar entradas).
+"""
+
+import hashlib
+import os
+
+SAMPLE_BLOCK_SIZE = 64 * 1024
+READ_BLOCK_SIZE = 1024 * 1024
+
+
+def sampled_digest(file_path, blocks=3, block_size=SAMPLE_BLOCK_SIZE):
+    """Hash BLAKE2b do tamanho mais `blocks` blocos espaçados pelo arquivo
+
+    Lê no máximo blocks * block_size bytes, independente do tamanho do
+    arquivo; arquivos pequenos são lidos por inteiro.
+    """
+    size = os.path.getsize(file_path)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(size).encode())
+
+    with open(file_path, 'rb') as f:
+        if size <= blocks * block_size:
+            digest.update(f.read())
+        else:
+            last = size - block_size
+            for i in range(blocks):
+                f.seek(last * i // (blocks - 1) if blocks > 1 else 0)
+                digest.update(f.read(block_size))
+
+    return digest.hexdigest()
+
+
+def content_digest(file_path, block_size=READ_BLOCK_SIZE):
+    """Hash BLAKE2b do conteúdo inteiro do arquivo, lido em blocos"""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
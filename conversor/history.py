@@ -0,0 +1,192 @@
+"""
+Histórico de conversões em SQLite (modo WAL).
+
+Cada conversão é uma linha acrescentada; nada é reescrito. Várias threads
+e processos (interface, CLI, lotes paralelos) podem gravar ao mesmo tempo,
+e as consultas por data e status usam índices, com paginação por id.
+"""
+
+import csv
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+HISTORY_DB = "conversion_history.db"
+LEGACY_HISTORY_FILE = "conversion_history.json"
+BUSY_TIMEOUT = 30.0  # segundos esperando outro processo liberar a escrita
+HISTORY_PAGE_SIZE = 200
+
+STATUS_SUCCESS = "Sucesso"
+STATUS_FAILED = "Falha"
+STATUS_CANCELLED = "Cancelado"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    input_file TEXT NOT NULL,
+    output_file TEXT NOT NULL,
+    status TEXT NOT NULL,
+    size INTEGER
+);
+CREATE INDEX IF NOT EXISTS conversions_date ON conversions (date);
+CREATE INDEX IF NOT EXISTS conversions_status ON conversions (status, id);
+"""
+
+# Métricas por conversão (ver metrics.JobMetrics); 'size' guarda os bytes de saída
+METRIC_COLUMNS = (
+    ('input_bytes', 'INTEGER'),
+    ('duration', 'REAL'),
+    ('wall_time', 'REAL'),
+    ('cpu_user', 'REAL'),
+    ('cpu_sys', 'REAL'),
+    ('frames', 'INTEGER'),
+    ('avg_fps', 'REAL'),
+    ('speed', 'REAL'),
+    ('preset', 'TEXT'),
+    ('crf', 'TEXT'),
+)
+
+
+class HistoryStore:
+    """Histórico de conversões só de acréscimo, seguro entre threads e processos"""
+
+    def __init__(self, db_path=HISTORY_DB):
+        self.db_path = Path(db_path)
+        self.local = threading.local()
+        with self.connection() as conn:
+            conn.executescript(SCHEMA)
+            self._add_metric_columns(conn)
+
+    def _add_metric_columns(self, conn):
+        """Acrescenta as colunas de métricas em bancos criados antes delas"""
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(conversions)")}
+        for name, column_type in METRIC_COLUMNS:
+            if name not in existing:
+                conn.execute(f"ALTER TABLE conversions ADD COLUMN {name} {column_type}")
+
+    def connection(self):
+        """Conexão da thread atual (sqlite3 não compartilha conexões entre threads)"""
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), timeout=BUSY_TIMEOUT)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    def add(self, input_file, output_file, status, size=None, date=None, metrics=None):
+        """Acrescenta uma conversão; retorna o id da entrada
+
+        metrics é um dicionário com as chaves de METRIC_COLUMNS (as demais
+        são ignoradas), como JobMetrics.to_dict().
+        """
+        date = date or datetime.now().isoformat(timespec='seconds')
+        metrics = metrics or {}
+        columns = ['date', 'input_file', 'output_file', 'status', 'size']
+        values = [date, str(input_file), str(output_file), status, size]
+        for name, _ in METRIC_COLUMNS:
+            if metrics.get(name) is not None:
+                columns.append(name)
+                values.append(metrics[name])
+
+        with self.connection() as conn:
+            cursor = conn.execute(
+                f"INSERT INTO conversions ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' * len(values))})", values)
+        return cursor.lastrowid
+
+    def query(self, limit=HISTORY_PAGE_SIZE, before_id=None, after_id=None, status=None,
+              since=None, until=None):
+        """Entradas mais recentes primeiro, como dicionários
+
+        before_id pagina para trás (próxima página); after_id traz só o que
+        foi gravado depois da entrada mais nova já exibida. since/until são
+        datas ISO (inclusive/exclusive).
+        """
+        conditions = []
+        params = []
+        for clause, value in (("id < ?", before_id), ("id > ?", after_id),
+                              ("status = ?", status), ("date >= ?", since),
+                              ("date < ?", until)):
+            if value is not None:
+                conditions.append(clause)
+                params.append(value)
+
+        sql = "SELECT * FROM conversions"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        return [dict(row) for row in self.connection().execute(sql, params)]
+
+    def count(self, status=None):
+        """Número de entradas (opcionalmente só de um status)"""
+        if status is None:
+            row = self.connection().execute("SELECT COUNT(*) FROM conversions").fetchone()
+        else:
+            row = self.connection().execute(
+                "SELECT COUNT(*) FROM conversions WHERE status = ?", (status,)).fetchone()
+        return row[0]
+
+    def export(self, export_file, status=None, since=None, until=None):
+        """Exporta o histórico (mais antigos primeiro) em CSV ou JSON Lines
+
+        O formato vem da extensão (.csv ou .jsonl); retorna o número de linhas.
+        """
+        export_file = Path(export_file)
+        conditions = []
+        params = []
+        for clause, value in (("status = ?", status), ("date >= ?", since), ("date < ?", until)):
+            if value is not None:
+                conditions.append(clause)
+                params.append(value)
+        sql = "SELECT * FROM conversions"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY id"
+
+        cursor = self.connection().execute(sql, params)
+        names = [description[0] for description in cursor.description]
+        count = 0
+        with open(export_file, 'w', encoding='utf-8', newline='') as f:
+            if export_file.suffix.lower() == '.csv':
+                writer = csv.writer(f)
+                writer.writerow(names)
+                for row in cursor:
+                    writer.writerow(row)
+                    count += 1
+            else:
+                for row in cursor:
+                    f.write(json.dumps(dict(zip(names, row)), ensure_ascii=False) + "\n")
+                    count += 1
+        return count
+
+    def clear(self):
+        """Apaga todo o histórico"""
+        with self.connection() as conn:
+            conn.execute("DELETE FROM conversions")
+
+    def import_legacy(self, json_file=LEGACY_HISTORY_FILE):
+        """Migra o conversion_history.json antigo (uma vez); retorna quantas entradas"""
+        json_file = Path(json_file)
+        try:
+            with open(json_file, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return 0
+
+        rows = [(entry.get('date', ''), entry.get('input_file', ''),
+                 entry.get('output_file', ''), entry.get('status', ''), None)
+                for entry in entries if isinstance(entry, dict)]
+        with self.connection() as conn:
+            conn.executemany(
+                "INSERT INTO conversions (date, input_file, output_file, status, size) "
+                "VALUES (?, ?, ?, ?, ?)", rows)
+        os.replace(json_file, json_file.with_name(json_file.name + ".migrated"))
+        return len(rows)
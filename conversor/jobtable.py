@@ -0,0 +1,159 @@
+"""
+Tabela compacta dos arquivos de um lote.
+
+Cada arquivo é uma linha; os campos ficam em colunas (arrays tipados e
+listas), sem um objeto por arquivo, para que filas de centenas de milhares
+de entradas caibam em poucos MB. Filtros e ordenações devolvem só a lista
+de linhas a exibir.
+"""
+
+import os
+from array import array
+
+JOB_WAITING = 0  # na lista, lote ainda não iniciado
+JOB_QUEUED = 1
+JOB_RUNNING = 2
+JOB_DONE = 3
+JOB_FAILED = 4
+JOB_CANCELLED = 5
+
+JOB_STATUS_LABELS = {
+    JOB_WAITING: "Aguardando",
+    JOB_QUEUED: "⏳ Na fila",
+    JOB_RUNNING: "▶️ Convertendo",
+    JOB_DONE: "✅ Concluído",
+    JOB_FAILED: "❌ Falha",
+    JOB_CANCELLED: "⏹️ Cancelado",
+}
+
+UNKNOWN = -1  # duração/tamanho ainda não conhecidos (ou indisponíveis)
+
+
+class JobTable:
+    """Arquivos do lote em colunas: caminho, status, duração, progresso e tamanhos
+
+    index (caminho -> linha) evita duplicatas em O(1); codecs são guardados
+    como índices numa lista de nomes.
+    """
+
+    SORT_KEYS = ('name', 'status', 'duration', 'codec', 'progress', 'size')
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        """Remove todas as linhas"""
+        self.paths = []
+        self.index = {}
+        self.status = array('b')
+        self.duration = array('d')
+        self.progress = array('f')
+        self.speed = array('f')
+        self.estimated_size = array('q')
+        self.output_size = array('q')
+        self.codec = array('h')
+        self.probed = array('b')
+        self.codec_names = ['']
+        self.codec_ids = {'': 0}
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __contains__(self, path):
+        return path in self.index
+
+    def add(self, path):
+        """Acrescenta um arquivo; retorna a linha, ou None se já estava na tabela"""
+        if path in self.index:
+            return None
+        row = len(self.paths)
+        self.index[path] = row
+        self.paths.append(path)
+        self.status.append(JOB_WAITING)
+        self.duration.append(UNKNOWN)
+        self.progress.append(0.0)
+        self.speed.append(0.0)
+        self.estimated_size.append(UNKNOWN)
+        self.output_size.append(UNKNOWN)
+        self.codec.append(0)
+        self.probed.append(0)
+        return row
+
+    def row(self, path):
+        """Linha do arquivo, ou None"""
+        return self.index.get(path)
+
+    def name(self, row):
+        """Nome do arquivo (sem a pasta)"""
+        return os.path.basename(self.paths[row])
+
+    def codec_name(self, row):
+        """Codec de vídeo informado pelo ffprobe ('' se desconhecido)"""
+        return self.codec_names[self.codec[row]]
+
+    def set_probe(self, row, duration, codec, estimated_size):
+        """Grava os dados do ffprobe (None para indisponível)"""
+        self.probed[row] = 1
+        self.duration[row] = duration if duration else UNKNOWN
+        codec = codec or ''
+        codec_id = self.codec_ids.get(codec)
+        if codec_id is None:
+            codec_id = self.codec_ids[codec] = len(self.codec_names)
+            self.codec_names.append(codec)
+        self.codec[row] = codec_id
+        self.estimated_size[row] = estimated_size if estimated_size else UNKNOWN
+
+    def set_status(self, row, status, progress=None, speed=None):
+        """Atualiza o status (e, opcionalmente, o progresso em % e a velocidade)"""
+        self.status[row] = status
+        if progress is not None:
+            self.progress[row] = progress
+        if speed is not None:
+            self.speed[row] = speed
+
+    def set_output(self, row, status, output_size=None):
+        """Resultado final de um arquivo"""
+        self.status[row] = status
+        if status == JOB_DONE:
+            self.progress[row] = 100.0
+        if output_size is not None:
+            self.output_size[row] = output_size
+
+    def reset_status(self, status=JOB_QUEUED):
+        """Todas as linhas com o mesmo status e progresso zerado (início do lote)"""
+        count = len(self.paths)
+        self.status = array('b', [status]) * count
+        self.progress = array('f', [0.0]) * count
+        self.speed = array('f', [0.0]) * count
+        self.output_size = array('q', [UNKNOWN]) * count
+
+    def size(self, row):
+        """Tamanho de saída, ou o estimado enquanto não houver saída"""
+        output_size = self.output_size[row]
+        return output_size if output_size >= 0 else self.estimated_size[row]
+
+    def view(self, text='', status=None, sort=None, reverse=False):
+        """Linhas a exibir, filtradas por nome e status e ordenadas
+
+        Sem filtro nem ordenação retorna um range (nada é copiado).
+        """
+        rows = range(len(self.paths))
+        if text:
+            needle = text.lower()
+            rows = [row for row in rows if needle in self.name(row).lower()]
+        if status is not None:
+            column = self.status
+            rows = [row for row in rows if column[row] == status]
+        if sort:
+            keys = {
+                'name': lambda row: self.name(row).lower(),
+                'status': self.status.__getitem__,
+                'duration': self.duration.__getitem__,
+                'codec': self.codec_name,
+                'progress': self.progress.__getitem__,
+                'size': self.size,
+            }
+            rows = sorted(rows, key=keys[sort], reverse=reverse)
+        elif reverse:
+            rows = rows[::-1]
+        return rows
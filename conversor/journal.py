@@ -0,0 +1,130 @@
+"""
+Diário (journal) persistente do lote, para retomar após uma interrupção.
+
+Cada mudança de estado de um arquivo (pending, running, done, failed) é
+acrescentada como uma linha JSON. Ao reabrir, o último registro de cada
+entrada vale; saídas "done" são puladas só se o tamanho e o hash da saída
+ainda conferem e se a entrada (tamanho e mtime) e as configurações de
+conversão são as mesmas da conversão registrada.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from .hashing import sampled_digest
+from .probe import file_identity
+
+JOURNAL_NAME = ".conversor-journal.jsonl"
+COMPACT_RATIO = 4  # compactar quando houver 4x mais linhas do que entradas
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+def _key(input_path):
+    return os.path.abspath(input_path)
+
+
+class BatchJournal:
+    """Estado de cada entrada do lote, gravado em JSON Lines"""
+
+    def __init__(self, journal_path):
+        self.path = Path(journal_path)
+        self.lock = threading.Lock()
+        self.records = {}
+        self.lines = 0
+        self.load()
+
+    def load(self):
+        """Relê o diário; linhas corrompidas (ex.: gravação interrompida) são ignoradas"""
+        self.records = {}
+        self.lines = 0
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        self.records[record['input']] = record
+                        self.lines += 1
+                    except (ValueError, KeyError, TypeError):
+                        continue
+        except OSError:
+            return
+
+        if self.lines > COMPACT_RATIO * max(1, len(self.records)):
+            self.compact()
+
+    def compact(self):
+        """Reescreve o diário só com o último registro de cada entrada"""
+        with self.lock:
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for record in self.records.values():
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self.lines = len(self.records)
+
+    def _append(self, record, sync=False):
+        with self.lock:
+            self.records[record['input']] = record
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                if sync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            self.lines += 1
+
+    def mark(self, input_path, state, output_path=None, settings=None):
+        """Registra uma mudança de estado
+
+        'done' guarda tamanho e hash da saída, a identidade da entrada e
+        settings (resumo das configurações, ConversionEngine.settings_fingerprint).
+        """
+        record = {
+            'input': _key(input_path),
+            'state': state,
+            'output': os.path.abspath(output_path) if output_path else None,
+            'time': datetime.now().isoformat(timespec='seconds'),
+        }
+        if state == DONE and output_path:
+            try:
+                record['size'] = os.path.getsize(output_path)
+                record['checksum'] = sampled_digest(output_path)
+                record['source'] = file_identity(input_path)
+                record['settings'] = settings
+            except OSError:
+                record['state'] = FAILED
+        self._append(record, sync=(record['state'] in (DONE, FAILED)))
+
+    def state(self, input_path):
+        """Último estado registrado para a entrada (ou None)"""
+        record = self.records.get(_key(input_path))
+        return record['state'] if record else None
+
+    def is_complete(self, input_path, output_path, settings=None):
+        """True se a saída foi concluída com as mesmas configurações e entrada e está íntegra"""
+        record = self.records.get(_key(input_path))
+        if not record or record['state'] != DONE:
+            return False
+        if record.get('output') != os.path.abspath(output_path):
+            return False
+        # Configurações diferentes ou entrada substituída: converter de novo
+        if record.get('settings') != settings:
+            return False
+        source = file_identity(input_path)
+        if source is None or record.get('source') != source:
+            return False
+        try:
+            if os.path.getsize(output_path) != record.get('size'):
+                return False
+            return sampled_digest(output_path) == record.get('checksum')
+        except OSError:
+            return False
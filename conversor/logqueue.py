@@ -0,0 +1,94 @@
+"""
+Fila de log segura entre threads.
+
+As threads de conversão só enfileiram mensagens (nunca esperam a interface
+desenhar); quem exibe o log retira as linhas em lotes. A fila da tela é
+limitada: se a interface não acompanhar, as linhas excedentes são
+descartadas e trocadas por um aviso com a contagem. O log completo vai
+para um arquivo rotativo, gravado por uma thread própria.
+"""
+
+import logging
+import queue
+import threading
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+
+DEFAULT_LOG_BYTES = 1024 * 1024  # por arquivo, antes de rotacionar
+LOG_BACKUPS = 3
+DRAIN_BATCH = 500  # linhas por lote entregue à interface
+MAX_PENDING_LINES = 5000  # linhas aguardando a interface antes de descartar
+
+
+class LogQueue:
+    """Mensagens com horário, de qualquer thread, retiradas em lotes por drain()"""
+
+    def __init__(self, log_file=None, max_bytes=DEFAULT_LOG_BYTES, backups=LOG_BACKUPS,
+                 max_pending=MAX_PENDING_LINES):
+        self.lines = queue.Queue(maxsize=max_pending)
+        self.dropped = 0
+        self.dropped_lock = threading.Lock()
+        self.logger = None
+        self.listener = None
+        if log_file:
+            self._start_file_log(Path(log_file), max_bytes, backups)
+
+    def _start_file_log(self, log_file, max_bytes, backups):
+        """Grava as mensagens no arquivo rotativo numa thread separada"""
+        try:
+            log_file.parent.mkdir(parents=True, exist_ok=True)
+            handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backups,
+                                          encoding='utf-8')
+        except OSError:
+            return
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s", "%Y-%m-%d %H:%M:%S"))
+        records = queue.SimpleQueue()
+        self.listener = QueueListener(records, handler)
+        self.listener.start()
+
+        self.logger = logging.getLogger(f"conversor.log.{id(self)}")
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        self.logger.addHandler(QueueHandler(records))
+
+    def put(self, message):
+        """Enfileira uma mensagem (nunca bloqueia; descarta se a fila estiver cheia)"""
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        try:
+            self.lines.put_nowait(f"[{timestamp}] {message}")
+        except queue.Full:
+            with self.dropped_lock:
+                self.dropped += 1
+        if self.logger:
+            self.logger.info(message)
+
+    def put_file(self, message):
+        """Grava só no arquivo de log (ex.: tracebacks), sem exibir na tela"""
+        if self.logger:
+            self.logger.info(message)
+
+    def drain(self, limit=DRAIN_BATCH):
+        """Retira até limit linhas já enfileiradas
+
+        Linhas descartadas desde o último drain() viram uma linha de aviso.
+        """
+        lines = []
+        try:
+            while len(lines) < limit:
+                lines.append(self.lines.get_nowait())
+        except queue.Empty:
+            pass
+        with self.dropped_lock:
+            dropped, self.dropped = self.dropped, 0
+        if dropped:
+            timestamp = datetime.now().strftime("%H:%M:%S")
+            lines.append(f"[{timestamp}] ⚠️ {dropped} linhas de log omitidas na tela "
+                         f"(ver o arquivo de log)")
+        return lines
+
+    def close(self):
+        """Grava o que falta no arquivo e encerra a thread do arquivo"""
+        if self.listener:
+            self.listener.stop()
+            self.listener = None
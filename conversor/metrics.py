@@ -0,0 +1,60 @@
+"""
+Métricas de cada conversão (bytes, tempos, CPU, velocidade), gravadas no
+histórico para comparar presets e CRFs pelo desempenho real.
+"""
+
+import threading
+from dataclasses import dataclass, fields
+
+
+@dataclass
+class JobMetrics:
+    """Medições de uma conversão; processos em paralelo (segmentos) somam CPU"""
+    input_bytes: int = 0
+    output_bytes: int = 0
+    duration: float = 0.0  # segundos de vídeo
+    wall_time: float = 0.0  # segundos de relógio
+    cpu_user: float = None  # None: CPU não medida (Windows ou sem processo)
+    cpu_sys: float = None
+    frames: int = 0
+    preset: str = ""
+    crf: str = ""
+
+    def __post_init__(self):
+        self.lock = threading.Lock()
+
+    @property
+    def avg_fps(self):
+        """Quadros por segundo de relógio"""
+        return self.frames / self.wall_time if self.wall_time > 0 else 0.0
+
+    @property
+    def speed(self):
+        """Segundos de vídeo por segundo de relógio (o 'speed' do FFmpeg)"""
+        return self.duration / self.wall_time if self.wall_time > 0 else 0.0
+
+    def add_process(self, cpu_user=None, cpu_sys=None, frames=0):
+        """Acumula um processo FFmpeg concluído
+
+        Os quadros ficam com a maior contagem informada: a união final dos
+        segmentos já informa o total.
+        """
+        with self.lock:
+            if cpu_user is not None:
+                self.cpu_user = (self.cpu_user or 0.0) + cpu_user
+            if cpu_sys is not None:
+                self.cpu_sys = (self.cpu_sys or 0.0) + cpu_sys
+            self.frames = max(self.frames, frames)
+
+    def to_dict(self):
+        """Campos e valores derivados, como gravados no histórico
+
+        CPU não medida continua None (fica vazia no histórico, não 0).
+        """
+        data = {f.name: getattr(self, f.name) for f in fields(self)}
+        for name in ('wall_time', 'cpu_user', 'cpu_sys'):
+            if data[name] is not None:
+                data[name] = round(data[name], 3)
+        data['avg_fps'] = round(self.avg_fps, 2)
+        data['speed'] = round(self.speed, 3)
+        return data
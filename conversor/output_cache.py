@@ -0,0 +1,173 @@
+"""
+Cache de conversões endereçado por conteúdo.
+
+A chave combina o hash do conteúdo inteiro da entrada
+(hashing.content_digest) com o hash dos argumentos efetivos do FFmpeg. O
+mesmo vídeo com outro nome, nas mesmas configurações, reaproveita a saída
+anterior por reflink ou cópia, sem recodificar. Hardlinks não são usados:
+editar uma saída entregue ao usuário alteraria também a cópia do cache. O
+tamanho total é limitado com descarte LRU.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_MAX_BYTES = 20 * 1024 ** 3
+FICLONE = 0x40049409  # ioctl de reflink do Linux (btrfs, XFS)
+
+
+def cache_key(input_digest, args):
+    """Chave do cache: hash do conteúdo da entrada + argumentos do FFmpeg"""
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(input_digest.encode())
+    digest.update(json.dumps(list(args)).encode())
+    return digest.hexdigest()
+
+
+def _reflink(source, destination):
+    """Cópia copy-on-write (só Linux, em sistemas de arquivos que suportam)"""
+    if not sys.platform.startswith('linux'):
+        return False
+    import fcntl
+    try:
+        with open(source, 'rb') as src, open(destination, 'wb') as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        return True
+    except OSError:
+        try:
+            os.unlink(destination)
+        except OSError:
+            pass
+        return False
+
+
+def place_file(source, destination):
+    """Cria destination com o conteúdo de source: reflink ou cópia
+
+    Nunca um hardlink, para que os dois arquivos continuem independentes.
+    Retorna o método usado.
+    """
+    if _reflink(source, destination):
+        return 'reflink'
+    shutil.copyfile(source, destination)
+    return 'copy'
+
+
+class ConversionCache:
+    """Saídas de conversões já feitas, indexadas por cache_key"""
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.index_file = self.cache_dir / 'index.json'
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = {}  # chave -> {'size': bytes, 'used': timestamp}
+        self.inflight = {}  # chave -> Event da conversão em andamento
+        self.load()
+
+    def object_path(self, key):
+        return self.cache_dir / key[:2] / f"{key}.mov"
+
+    def load(self):
+        """Lê o índice e descarta entradas cujo arquivo sumiu"""
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            entries = {}
+        self.entries = {key: entry for key, entry in entries.items()
+                        if self.object_path(key).is_file()}
+
+    def _save(self):
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.index_file.with_name(f"index.json.{os.getpid()}.tmp")
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_file, self.index_file)
+        except OSError:
+            pass
+
+    def fetch(self, key, destination):
+        """Coloca a saída em cache em destination; True se houve acerto
+
+        Se a mesma chave estiver sendo convertida por outra thread, espera
+        por ela. Em caso de falta, quem chamou fica responsável pela chave
+        e deve chamar finish(key, ...) ao terminar.
+        """
+        while True:
+            with self.lock:
+                event = self.inflight.get(key)
+                if event is None:
+                    entry = self.entries.get(key)
+                    if entry is None:
+                        self.inflight[key] = threading.Event()
+                        return False
+                    entry['used'] = time.time()
+                    break
+            event.wait()
+
+        source = self.object_path(key)
+        try:
+            if source.stat().st_size != entry['size']:
+                raise OSError("tamanho diferente do índice")
+            place_file(source, destination)
+        except OSError:
+            with self.lock:
+                self.entries.pop(key, None)
+                self.inflight[key] = threading.Event()
+            try:
+                os.unlink(source)
+            except OSError:
+                pass
+            return False
+
+        with self.lock:
+            self._save()
+        return True
+
+    def finish(self, key, output_path=None):
+        """Guarda output_path (se a conversão deu certo) e libera a chave"""
+        try:
+            if output_path:
+                self.store(key, output_path)
+        finally:
+            with self.lock:
+                event = self.inflight.pop(key, None)
+            if event:
+                event.set()
+
+    def store(self, key, output_path):
+        """Adiciona uma saída ao cache (reflink quando possível)"""
+        target = self.object_path(key)
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp_target = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+            place_file(output_path, tmp_target)
+            os.replace(tmp_target, target)
+            size = target.stat().st_size
+        except OSError:
+            return
+        with self.lock:
+            self.entries[key] = {'size': size, 'used': time.time()}
+            self._evict()
+            self._save()
+
+    def _evict(self):
+        total = sum(entry['size'] for entry in self.entries.values())
+        for key in sorted(self.entries, key=lambda k: self.entries[k]['used']):
+            if total <= self.max_bytes:
+                break
+            if key in self.inflight:
+                continue
+            total -= self.entries.pop(key)['size']
+            try:
+                os.unlink(self.object_path(key))
+            except OSError:
+                pass
@@ -0,0 +1,205 @@
+"""
+Serviço de ffprobe com cache em disco.
+
+As respostas do ffprobe são guardadas num índice JSON compacto, com
+chave (caminho, tamanho, mtime_ns) e descarte LRU. Reabrir uma pasta já
+analisada não executa o ffprobe de novo.
+"""
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from .processes import BACKGROUND_PROCESSES, PROCESSES, ConversionCancelled
+
+DEFAULT_MAX_ENTRIES = 20000
+SAVE_INTERVAL = 5.0  # segundos entre gravações automáticas do índice
+
+
+def default_cache_dir():
+    """Pasta de cache do usuário para o conversor"""
+    if sys.platform == "win32":
+        base = os.environ.get('LOCALAPPDATA') or Path.home() / 'AppData' / 'Local'
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(base) / 'conversor'
+
+
+def get_duration(info):
+    """Duração em segundos a partir do resultado do ffprobe (0 se desconhecida)"""
+    try:
+        return float((info or {}).get('format', {}).get('duration', 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def run_ffprobe(file_path, processes=PROCESSES):
+    """Executa o ffprobe e retorna formato e streams, ou None
+
+    processes é o ProcessRegistry do processo: PROCESSES para conversões e
+    lotes (cancelar a conversão o encerra), BACKGROUND_PROCESSES para a
+    análise da lista de arquivos na interface.
+    """
+    cmd = [
+        'ffprobe',
+        '-v', 'quiet',
+        '-print_format', 'json',
+        '-show_format',
+        '-show_streams',
+        str(file_path)
+    ]
+
+    try:
+        result = processes.run(cmd, text=True)
+    except (FileNotFoundError, ConversionCancelled):
+        return None
+
+    if result.returncode != 0:
+        return None
+    try:
+        return json.loads(result.stdout)
+    except ValueError:
+        return None
+
+
+def file_identity(file_path):
+    """Chave do cache: (caminho absoluto, tamanho, mtime_ns), ou None"""
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return f"{os.path.abspath(file_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+
+
+class ProbeService:
+    """ffprobe com cache LRU, opcionalmente persistido em cache_file"""
+
+    def __init__(self, cache_file=None, max_entries=DEFAULT_MAX_ENTRIES):
+        self.cache_file = Path(cache_file) if cache_file else None
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()
+        self.dirty = False
+        self.last_save = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+
+        if self.cache_file:
+            self.load()
+            atexit.register(self.save)
+
+    def load(self):
+        """Lê o índice do disco (ignora arquivos corrompidos)"""
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        with self.lock:
+            self.entries = OrderedDict(data.get('entries', []))
+            self._evict()
+
+    def save(self):
+        """Grava o índice no disco de forma atômica, se houver mudanças"""
+        if not self.cache_file:
+            return
+        # Um salvamento por vez: o temporário tem um nome só por processo
+        with self.save_lock:
+            with self.lock:
+                if not self.dirty:
+                    return
+                data = {'version': 1, 'entries': list(self.entries.items())}
+                self.dirty = False
+                self.last_save = time.monotonic()
+            try:
+                self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+                tmp_file = self.cache_file.with_name(f"{self.cache_file.name}.{os.getpid()}.tmp")
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+                os.replace(tmp_file, self.cache_file)
+            except OSError:
+                with self.lock:
+                    self.dirty = True
+
+    def _evict(self):
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def cached(self, file_path):
+        """Resultado em cache para o arquivo, sem executar o ffprobe"""
+        key = file_identity(file_path)
+        if key is None:
+            return None
+        with self.lock:
+            info = self.entries.get(key)
+            if info is not None:
+                self.entries.move_to_end(key)
+            return info
+
+    def probe(self, file_path, processes=PROCESSES):
+        """Informações do ffprobe, do cache quando possível
+
+        processes: registro em que o ffprobe roda (ver run_ffprobe).
+        """
+        key = file_identity(file_path)
+        if key is None:
+            return None
+
+        with self.lock:
+            info = self.entries.get(key)
+            if info is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return info
+            self.misses += 1
+
+        info = run_ffprobe(file_path, processes)
+        if info is None:
+            return None  # Falhas não vão para o cache (arquivo pode estar sendo copiado)
+
+        with self.lock:
+            self.entries[key] = info
+            self.entries.move_to_end(key)
+            self._evict()
+            self.dirty = True
+            save_due = time.monotonic() - self.last_save >= SAVE_INTERVAL
+
+        if save_due:
+            self.save()
+        return info
+
+
+class BackgroundProber:
+    """Executa ffprobe em paralelo num pool limitado de threads
+
+    Os processos ficam em BACKGROUND_PROCESSES: cancelar uma conversão não
+    interrompe a análise da lista de arquivos.
+    """
+
+    def __init__(self, service, max_workers=None, processes=BACKGROUND_PROCESSES):
+        self.service = service
+        self.processes = processes
+        max_workers = max_workers or min(8, (os.cpu_count() or 1) * 2)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix='ffprobe')
+
+    def submit(self, file_path, callback):
+        """Agenda o probe; callback(file_path, info) roda na thread do pool"""
+        def done(future):
+            info = None if future.cancelled() or future.exception() else future.result()
+            callback(file_path, info)
+
+        future = self.executor.submit(self.service.probe, file_path, self.processes)
+        future.add_done_callback(done)
+        return future
+
+    def shutdown(self):
+        """Encerra o pool sem esperar probes pendentes"""
+        self.executor.shutdown(wait=False)
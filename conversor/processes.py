@@ -0,0 +1,164 @@
+"""
+Registro dos processos FFmpeg/ffprobe em execução.
+
+Todo processo filho é iniciado por aqui, num grupo de processos próprio,
+para que cancelar uma conversão encerre de fato o que está rodando: primeiro
+um SIGINT (o FFmpeg finaliza e sai), depois SIGKILL para quem não saiu
+dentro do prazo. As conversões e lotes, inclusive o ffprobe que eles
+executam, ficam em PROCESSES; a análise da lista de arquivos e as
+miniaturas da interface ficam em BACKGROUND_PROCESSES, que o cancelamento
+da conversão não interrompe.
+"""
+
+import atexit
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+if sys.platform == "win32":
+    CREATION_FLAGS = subprocess.CREATE_NO_WINDOW
+    GROUP_FLAGS = subprocess.CREATE_NEW_PROCESS_GROUP
+else:
+    CREATION_FLAGS = 0
+    GROUP_FLAGS = 0
+
+KILL_GRACE = 5.0  # segundos entre o SIGINT e o SIGKILL
+
+
+class ConversionCancelled(Exception):
+    """A conversão foi cancelada; nenhum processo novo é iniciado"""
+
+
+def _interrupt(process):
+    """Pede ao processo (e ao seu grupo) que termine"""
+    try:
+        if sys.platform == "win32":
+            process.send_signal(signal.CTRL_BREAK_EVENT)
+        else:
+            os.killpg(process.pid, signal.SIGINT)
+    except (OSError, ValueError):
+        pass
+
+
+def _kill(process):
+    """Encerra o processo (e o seu grupo) imediatamente"""
+    try:
+        if sys.platform == "win32":
+            process.kill()
+        else:
+            os.killpg(process.pid, signal.SIGKILL)
+    except OSError:
+        pass
+
+
+def _exit_code(status):
+    """Código de saída no formato do Popen.returncode (negativo se morto por sinal)"""
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+def wait_with_usage(process):
+    """Espera o processo e retorna (cpu usuário, cpu sistema) em segundos
+
+    Usa os.wait4 onde existe (POSIX); no Windows, ou se o processo já foi
+    coletado por outra thread, retorna (None, None).
+    """
+    if hasattr(os, 'wait4'):
+        try:
+            _, status, usage = os.wait4(process.pid, 0)
+        except ChildProcessError:
+            process.wait()
+            return None, None
+        process.returncode = _exit_code(status)
+        return usage.ru_utime, usage.ru_stime
+    process.wait()
+    return None, None
+
+
+class ProcessRegistry:
+    """Processos filhos vivos, com cancelamento em duas etapas
+
+    Só quem iniciou o processo o espera (wait/communicate/wait_with_usage)
+    e chama release() depois; o cancelamento nunca faz waitpid, apenas
+    aguarda esse release() para decidir se precisa do SIGKILL. Duas threads
+    esperando o mesmo filho disputariam o código de saída (ECHILD) e o
+    Popen poderia registrar 0 para um processo morto.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.processes = {}  # Popen -> Event marcado em release()
+        self.cancelled = threading.Event()
+
+    def popen(self, cmd, **kwargs):
+        """subprocess.Popen registrado; ConversionCancelled se já foi cancelado"""
+        kwargs.setdefault('creationflags', CREATION_FLAGS | GROUP_FLAGS)
+        if sys.platform != "win32":
+            kwargs.setdefault('start_new_session', True)
+        with self.lock:
+            if self.cancelled.is_set():
+                raise ConversionCancelled()
+            process = subprocess.Popen(cmd, **kwargs)
+            self.processes[process] = threading.Event()
+        return process
+
+    def release(self, process):
+        """Remove um processo que já terminou (e foi esperado por quem o iniciou)"""
+        with self.lock:
+            released = self.processes.pop(process, None)
+        if released:
+            released.set()
+
+    def run(self, cmd, text=False):
+        """Equivalente a subprocess.run(capture_output=True) com processo registrado"""
+        process = self.popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                             stdin=subprocess.DEVNULL, text=text)
+        try:
+            stdout, stderr = process.communicate()
+        finally:
+            self.release(process)
+        return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
+
+    def cancel(self, grace=KILL_GRACE, wait=False):
+        """Bloqueia novos processos e encerra os atuais (SIGINT, depois SIGKILL)
+
+        Com wait=False a escalada para SIGKILL roda numa thread, para não
+        travar a interface.
+        """
+        with self.lock:
+            self.cancelled.set()
+            processes = list(self.processes.items())
+
+        for process, _ in processes:
+            _interrupt(process)
+
+        def escalate():
+            deadline = time.monotonic() + grace
+            for process, released in processes:
+                if not released.wait(max(0.0, deadline - time.monotonic())):
+                    _kill(process)
+
+        if not processes:
+            return
+        if wait:
+            escalate()
+        else:
+            threading.Thread(target=escalate, daemon=True).start()
+
+    def reset(self):
+        """Permite iniciar processos de novo após um cancelamento"""
+        self.cancelled.clear()
+
+    def shutdown(self):
+        """Encerra tudo ao sair do programa"""
+        self.cancel(wait=True)
+
+
+PROCESSES = ProcessRegistry()  # conversões
+BACKGROUND_PROCESSES = ProcessRegistry()  # ffprobe e miniaturas da lista na interface
+atexit.register(PROCESSES.shutdown)
+atexit.register(BACKGROUND_PROCESSES.shutdown)
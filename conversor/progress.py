@@ -0,0 +1,159 @@
+"""
+Leitura do progresso estruturado do FFmpeg (-progress pipe:1).
+
+O FFmpeg escreve blocos de linhas chave=valor terminados por
+"progress=continue" ou "progress=end". Cada bloco vira um ProgressEvent.
+ProgressBoard guarda o último evento de cada conversão para quem exibe o
+progresso.
+"""
+
+import threading
+from dataclasses import dataclass
+
+
+@dataclass
+class ProgressEvent:
+    """Estado de uma conversão em andamento"""
+    out_time: float = 0.0      # segundos já codificados
+    duration: float = 0.0      # duração total (do ffprobe), 0 se desconhecida
+    frame: int = 0
+    fps: float = 0.0
+    speed: float = 0.0         # múltiplo do tempo real (1.0 = 1x)
+    bitrate: float = 0.0       # kbit/s
+    total_size: int = 0        # bytes escritos até agora
+    finished: bool = False
+
+    @property
+    def percent(self):
+        """Porcentagem concluída (0-100)"""
+        if self.finished:
+            return 100.0
+        if self.duration <= 0:
+            return 0.0
+        return min(100.0, self.out_time / self.duration * 100)
+
+
+def _to_float(value, suffix=''):
+    """Converte valores como '1.5x' ou '812.3kbits/s'; 'N/A' vira 0"""
+    if suffix and value.endswith(suffix):
+        value = value[:-len(suffix)]
+    try:
+        return float(value)
+    except ValueError:
+        return 0.0
+
+
+def _parse_clock(value):
+    """Converte 'HH:MM:SS.micro' em segundos"""
+    try:
+        h, m, s = value.split(':')
+        return int(h) * 3600 + int(m) * 60 + float(s)
+    except ValueError:
+        return 0.0
+
+
+class ProgressParser:
+    """Converte o fluxo chave=valor do FFmpeg em ProgressEvent"""
+
+    def __init__(self, duration=0.0):
+        self.duration = duration
+        self.values = {}
+
+    def feed(self, line):
+        """Processa uma linha; retorna um ProgressEvent ao fim de cada bloco"""
+        key, sep, value = line.strip().partition('=')
+        if not sep:
+            return None
+        if key != 'progress':
+            self.values[key] = value.strip()
+            return None
+
+        values, self.values = self.values, {}
+        return self.build_event(values, finished=(value == 'end'))
+
+    def build_event(self, values, finished=False):
+        """Monta o evento a partir das chaves de um bloco"""
+        # out_time_ms também está em microssegundos (nome histórico do FFmpeg)
+        out_time = 0.0
+        for key in ('out_time_us', 'out_time_ms'):
+            if key in values:
+                out_time = _to_float(values[key]) / 1_000_000
+                break
+        else:
+            if 'out_time' in values:
+                out_time = _parse_clock(values['out_time'])
+
+        return ProgressEvent(
+            out_time=max(0.0, out_time),
+            duration=self.duration,
+            frame=int(_to_float(values.get('frame', '0'))),
+            fps=_to_float(values.get('fps', '0')),
+            speed=_to_float(values.get('speed', '0'), 'x'),
+            bitrate=_to_float(values.get('bitrate', '0'), 'kbits/s'),
+            total_size=int(_to_float(values.get('total_size', '0'))),
+            finished=finished,
+        )
+
+
+class ProgressBoard:
+    """Último ProgressEvent de cada job, compartilhado entre threads
+
+    As threads de conversão chamam update() a cada evento; quem exibe o
+    progresso chama changes() periodicamente e recebe só o estado mais
+    recente dos jobs alterados (eventos intermediários são descartados).
+    overall() pondera cada job pela duração do vídeo.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.events = {}
+        self.durations = {}
+        self.changed = set()
+
+    def reset(self, durations=None):
+        """Recomeça com os jobs informados ({job_id: duração em segundos, 0 se desconhecida})"""
+        with self.lock:
+            self.events = {}
+            self.durations = dict(durations or {})
+            self.changed = set()
+
+    def set_durations(self, durations):
+        """Informa a duração de jobs já registrados (após o ffprobe)"""
+        with self.lock:
+            self.durations.update(durations)
+
+    def update(self, job_id, event):
+        """Registra o estado atual de um job (substitui o anterior)"""
+        with self.lock:
+            self.events[job_id] = event
+            self.changed.add(job_id)
+            if self.durations.get(job_id, 0) <= 0 and event.duration > 0:
+                self.durations[job_id] = event.duration
+
+    def changes(self):
+        """{job_id: ProgressEvent} dos jobs alterados desde a última chamada"""
+        with self.lock:
+            changed, self.changed = self.changed, set()
+            return {job_id: self.events[job_id] for job_id in changed}
+
+    def overall(self):
+        """Porcentagem geral (0-100), ponderada pela duração de cada job
+
+        Jobs de duração desconhecida pesam a média das durações conhecidas.
+        """
+        with self.lock:
+            jobs = set(self.durations) | set(self.events)
+            if not jobs:
+                return 0.0
+            known = [d for d in self.durations.values() if d > 0]
+            default = sum(known) / len(known) if known else 1.0
+            total = done = 0.0
+            for job_id in jobs:
+                weight = self.durations.get(job_id, 0)
+                if weight <= 0:
+                    weight = default
+                total += weight
+                event = self.events.get(job_id)
+                if event:
+                    done += weight * event.percent / 100
+            return done / total * 100
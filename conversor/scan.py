@@ -0,0 +1,46 @@
+"""
+Busca recursiva de vídeos em pastas grandes.
+
+Uma única passada com os.scandir (sem um glob por extensão), comparando o
+sufixo em minúsculas com um conjunto. Os caminhos são produzidos conforme
+aparecem, para quem consome poder exibi-los aos poucos.
+"""
+
+import os
+
+from .atomic import SEGMENT_DIR_PREFIX, TEMP_PREFIX
+from .engine import VIDEO_EXTENSIONS
+
+VIDEO_SUFFIXES = frozenset(VIDEO_EXTENSIONS)
+
+
+def iter_video_files(root, recursive=True, follow_symlinks=False):
+    """Gera os caminhos dos vídeos sob root (subpastas em profundidade)
+
+    Pastas ilegíveis são ignoradas; links simbólicos para pastas só são
+    seguidos com follow_symlinks (evita ciclos).
+    """
+    stack = [os.fspath(root)]
+    while stack:
+        directory = stack.pop()
+        try:
+            it = os.scandir(directory)
+        except OSError:
+            continue
+        subdirs = []
+        with it:
+            for entry in it:
+                name = entry.name
+                # Temporários e segmentos de conversões em andamento
+                if name.startswith(TEMP_PREFIX) or name.startswith(SEGMENT_DIR_PREFIX):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=follow_symlinks):
+                        if recursive:
+                            subdirs.append(entry.path)
+                    elif os.path.splitext(name)[1].lower() in VIDEO_SUFFIXES and entry.is_file():
+                        yield entry.path
+                except OSError:
+                    continue
+        # Visitar as subpastas na ordem em que apareceram
+        stack.extend(reversed(subdirs))
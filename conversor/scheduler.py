@@ -0,0 +1,130 @@
+"""
+Ordenação dos arquivos do lote e estimativa do tempo restante.
+
+Com as durações do ffprobe, o lote pode começar pelos vídeos mais longos
+(LPT, longest processing time first), o que evita que um arquivo grande
+no fim da fila domine o tempo total. A velocidade observada por preset é
+guardada para estimar o término (ETA).
+"""
+
+import heapq
+import json
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+# Velocidade inicial (segundos de vídeo por segundo de relógio) de um
+# processo libx264 em 1080p, antes de existirem medições locais
+DEFAULT_PRESET_SPEED = {
+    "ultrafast": 6.0, "superfast": 4.5, "veryfast": 3.0, "faster": 2.0,
+    "fast": 1.6, "medium": 1.2, "slow": 0.7, "slower": 0.35, "veryslow": 0.15,
+}
+REMUX_SPEED = 60.0
+SPEED_SMOOTHING = 0.3  # peso da medição mais recente na média móvel
+
+
+@dataclass
+class BatchJob:
+    """Arquivo do lote com os dados usados pelo agendador"""
+    job_id: int
+    input_path: str
+    duration: float = 0.0
+    size: int = 0
+    remux: bool = False
+    output_size: int = 0  # estimativa, para a reserva de espaço do lote
+
+
+POLICIES = {
+    'fifo': lambda job: job.job_id,
+    'longest_first': lambda job: (-job.duration, -job.size, job.job_id),
+    'shortest_first': lambda job: (job.duration, job.size, job.job_id),
+}
+
+
+def register_policy(name, key):
+    """Registra uma política de prioridade (key recebe um BatchJob)"""
+    POLICIES[name] = key
+
+
+def order_jobs(jobs, policy='longest_first'):
+    """Lista de BatchJob ordenada pela política"""
+    try:
+        key = POLICIES[policy]
+    except KeyError:
+        raise ValueError(f"Política de ordenação desconhecida: {policy}")
+    return sorted(jobs, key=key)
+
+
+def estimate_makespan(job_seconds, workers, busy_until=()):
+    """Tempo total para executar os trabalhos, na ordem dada, em N processos
+
+    busy_until: segundos restantes dos trabalhos que já estão rodando.
+    """
+    workers = max(1, workers)
+    finish = sorted(busy_until)[:workers]
+    finish += [0.0] * (workers - len(finish))
+    heapq.heapify(finish)
+    for seconds in job_seconds:
+        heapq.heappush(finish, heapq.heappop(finish) + seconds)
+    return max(finish)
+
+
+class MovingAverages:
+    """Médias móveis exponenciais por chave, persistidas em JSON"""
+
+    def __init__(self, stats_file=None):
+        self.stats_file = Path(stats_file) if stats_file else None
+        self.values = {}
+        self.lock = threading.Lock()
+        if self.stats_file:
+            try:
+                with open(self.stats_file, 'r', encoding='utf-8') as f:
+                    self.values = json.load(f)
+            except (OSError, ValueError):
+                self.values = {}
+
+    def get(self, key):
+        """Média atual da chave (None se ainda não houver medições)"""
+        with self.lock:
+            return self.values.get(key)
+
+    def update(self, key, observed):
+        """Incorpora uma nova medição à média da chave"""
+        with self.lock:
+            previous = self.values.get(key)
+            if previous:
+                observed = previous + SPEED_SMOOTHING * (observed - previous)
+            self.values[key] = observed
+            data = dict(self.values)
+        self._save(data)
+
+    def _save(self, data):
+        if not self.stats_file:
+            return
+        try:
+            self.stats_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.stats_file.with_name(f"{self.stats_file.name}.{os.getpid()}.tmp")
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_file, self.stats_file)
+        except OSError:
+            pass
+
+
+class SpeedStats(MovingAverages):
+    """Média móvel da velocidade de codificação por preset, persistida em JSON"""
+
+    def speed(self, preset):
+        """Velocidade esperada de um processo com o preset"""
+        return self.get(preset) or DEFAULT_PRESET_SPEED.get(preset, 1.0)
+
+    def record(self, preset, media_seconds, wall_seconds):
+        """Registra uma conversão concluída"""
+        if media_seconds <= 0 or wall_seconds <= 0:
+            return
+        self.update(preset, media_seconds / wall_seconds)
+
+    def job_seconds(self, job, preset):
+        """Tempo de relógio esperado para um BatchJob"""
+        return job.duration / (REMUX_SPEED if job.remux else self.speed(preset))
@@ -0,0 +1,189 @@
+"""
+Codificação de um vídeo longo em segmentos paralelos.
+
+O vídeo é cortado em keyframes, cada trecho é codificado por um processo
+FFmpeg com os mesmos parâmetros, o áudio é codificado de uma vez (sem
+emendas) e tudo é unido com o demuxer concat, sem recodificar.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from .atomic import SEGMENT_DIR_PREFIX
+from .probe import get_duration
+from .processes import PROCESSES, ConversionCancelled
+from .progress import ProgressEvent
+
+MIN_SEGMENTED_DURATION = 120.0  # vídeos mais curtos não compensam a divisão
+MIN_SEGMENT_LENGTH = 30.0
+
+
+def keyframe_times(input_path, stream_index):
+    """Instantes (s) dos keyframes do stream, lidos dos pacotes sem decodificar"""
+    cmd = [
+        'ffprobe',
+        '-v', 'error',
+        '-select_streams', str(stream_index),
+        '-show_entries', 'packet=pts_time,flags',
+        '-of', 'csv=p=0',
+        str(input_path)
+    ]
+    try:
+        result = PROCESSES.run(cmd, text=True)
+    except (FileNotFoundError, ConversionCancelled):
+        return []
+    if result.returncode != 0:
+        return []
+
+    times = []
+    for line in result.stdout.splitlines():
+        pts_time, _, flags = line.partition(',')
+        if 'K' in flags:
+            try:
+                times.append(float(pts_time))
+            except ValueError:
+                continue
+    times.sort()
+    return times
+
+
+def choose_split_points(keyframes, duration, segments):
+    """Keyframes mais próximos de duration * k / segments (k = 1..segments-1)"""
+    points = []
+    for k in range(1, segments):
+        target = duration * k / segments
+        i = bisect_left(keyframes, target)
+        candidates = keyframes[max(0, i - 1):i + 1]
+        if not candidates:
+            continue
+        nearest = min(candidates, key=lambda t: abs(t - target))
+        if nearest < MIN_SEGMENT_LENGTH or nearest > duration - MIN_SEGMENT_LENGTH:
+            continue
+        if points and nearest - points[-1] < MIN_SEGMENT_LENGTH:
+            continue
+        points.append(nearest)
+    return points
+
+
+def _concat_line(path):
+    """Linha do arquivo de lista do demuxer concat (relativa à própria lista)"""
+    escaped = Path(path).name.replace("'", "'\\''")
+    return f"file '{escaped}'\n"
+
+
+class SegmentedEncoder:
+    """Divide, codifica em paralelo e une um único vídeo"""
+
+    def __init__(self, engine, segments, threads=None):
+        self.engine = engine
+        self.segments = segments
+        self.total_threads = threads or os.cpu_count() or 1
+
+    def encode(self, input_path, output_path, info, plan, on_progress=None, metrics=None):
+        """Gera output_path; True em caso de sucesso
+
+        metrics (JobMetrics), se informado, acumula a CPU de todos os processos.
+        """
+        engine = self.engine
+        duration = get_duration(info)
+
+        # -ss de entrada é relativo ao início do arquivo
+        try:
+            start_time = float(info.get('format', {}).get('start_time', 0))
+        except (TypeError, ValueError):
+            start_time = 0.0
+        keyframes = [t - start_time for t in keyframe_times(input_path, plan.video_index)]
+        points = choose_split_points(keyframes, duration, self.segments)
+
+        if not points:
+            engine.log_message("⚠️ Não foi possível dividir em segmentos; usando um único processo")
+            cmd = engine.build_command(input_path, output_path, self.total_threads, plan)
+            return engine.run_ffmpeg(cmd, input_path, duration, on_progress, metrics)
+
+        boundaries = [0.0] + points + [duration]
+        count = len(boundaries) - 1
+        threads = max(1, self.total_threads // count)
+        engine.log_message(f"✂️ Codificando em {count} segmentos paralelos ({threads} threads cada)")
+
+        work_dir = Path(tempfile.mkdtemp(prefix=f'{SEGMENT_DIR_PREFIX}{os.getpid()}-', dir=Path(output_path).parent))
+        try:
+            tasks = []
+            segment_files = []
+            for i in range(count):
+                start, end = boundaries[i], boundaries[i + 1]
+                segment_file = work_dir / f"seg{i:03d}.mkv"
+                segment_files.append(segment_file)
+                cmd = ['ffmpeg', '-nostats', '-progress', 'pipe:1',
+                       '-ss', f"{start:.6f}", '-i', str(input_path)]
+                if i < count - 1:
+                    cmd.extend(['-t', f"{end - start:.6f}"])
+                cmd.extend(['-y', '-map', f'0:{plan.video_index}', '-an', '-sn'])
+                cmd.extend(engine.video_encode_args(plan.crf))
+                cmd.extend(['-threads', str(threads), str(segment_file)])
+                tasks.append((cmd, end - start))
+
+            # Áudio em uma única passada, para não haver emendas
+            audio_file = None
+            if plan.audio_index is not None:
+                audio_file = work_dir / "audio.mka"
+                cmd = ['ffmpeg', '-nostats', '-progress', 'pipe:1', '-i', str(input_path),
+                       '-y', '-map', f'0:{plan.audio_index}', '-vn']
+                cmd.extend(engine.audio_args(plan))
+                cmd.append(str(audio_file))
+                tasks.append((cmd, 0.0))
+
+            if not self._run_parallel(tasks, input_path, duration, count, on_progress, metrics):
+                return False
+
+            list_file = work_dir / "segments.txt"
+            with open(list_file, 'w', encoding='utf-8') as f:
+                f.writelines(_concat_line(segment_file) for segment_file in segment_files)
+
+            cmd = ['ffmpeg', '-nostats', '-progress', 'pipe:1',
+                   '-f', 'concat', '-safe', '0', '-i', str(list_file)]
+            if audio_file:
+                cmd.extend(['-i', str(audio_file)])
+            cmd.extend(['-y', '-map', '0:v'])
+            if audio_file:
+                cmd.extend(['-map', '1:a'])
+            cmd.extend(['-c', 'copy', '-movflags', '+faststart', str(output_path)])
+
+            engine.log_message("🔗 Unindo segmentos")
+            return engine.run_ffmpeg(cmd, input_path, metrics=metrics)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _run_parallel(self, tasks, input_path, duration, video_tasks, on_progress, metrics=None):
+        """Executa os comandos ao mesmo tempo, agregando o progresso dos segmentos"""
+        events = [ProgressEvent() for _ in tasks]
+        lock = threading.Lock()
+
+        def report(index, event):
+            with lock:
+                events[index] = event
+                video = events[:video_tasks]
+                combined = ProgressEvent(
+                    out_time=sum(e.out_time for e in video),
+                    duration=duration,
+                    frame=sum(e.frame for e in video),
+                    fps=sum(e.fps for e in video),
+                    speed=sum(e.speed for e in video),
+                    total_size=sum(e.total_size for e in events),
+                )
+            if on_progress:
+                on_progress(combined)
+
+        def run(index, cmd, length):
+            return self.engine.run_ffmpeg(cmd, input_path, length,
+                                          lambda event: report(index, event), metrics)
+
+        with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+            futures = [executor.submit(run, i, cmd, length)
+                       for i, (cmd, length) in enumerate(tasks)]
+            results = [future.result() for future in futures]
+        return all(results)
@@ -0,0 +1,121 @@
+"""
+Consumo contínuo do stderr do FFmpeg com memória limitada.
+
+Apenas os últimos bytes ficam em memória (para a mensagem de erro); o log
+completo pode ser copiado para um arquivo por conversão. Esses arquivos
+são podados por prune_job_logs (quantidade e idade máximas).
+"""
+
+import itertools
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+DEFAULT_TAIL_BYTES = 64 * 1024
+MAX_JOB_LOGS = 500  # logs por conversão mantidos na pasta
+JOB_LOG_MAX_AGE = 30 * 24 * 3600  # segundos
+JOB_LOG_NAME = re.compile(r'-\d{8}-\d{6}-\d+\.log$')  # nomes gerados por job_log_path
+
+_job_counter = itertools.count(1)
+
+
+def job_log_path(log_dir, input_path):
+    """Nome único do arquivo de log de uma conversão"""
+    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    return Path(log_dir) / f"{Path(input_path).stem}-{timestamp}-{next(_job_counter)}.log"
+
+
+def prune_job_logs(log_dir, keep=MAX_JOB_LOGS, max_age=JOB_LOG_MAX_AGE):
+    """Remove os logs de conversão com mais de max_age segundos e os mais antigos além de keep
+
+    Só considera arquivos com o nome de job_log_path (o log rotativo da
+    interface fica). Retorna quantos arquivos foram removidos.
+    """
+    logs = []
+    try:
+        with os.scandir(log_dir) as it:
+            for entry in it:
+                if JOB_LOG_NAME.search(entry.name) and entry.is_file():
+                    try:
+                        logs.append((entry.stat().st_mtime, entry.path))
+                    except OSError:
+                        continue
+    except OSError:
+        return 0
+
+    logs.sort(reverse=True)
+    cutoff = time.time() - max_age
+    removed = 0
+    for position, (mtime, path) in enumerate(logs):
+        if position < keep and mtime >= cutoff:
+            continue
+        try:
+            os.unlink(path)
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+class StderrTail:
+    """Lê um stream binário numa thread, guardando só o final em memória"""
+
+    def __init__(self, stream, max_bytes=DEFAULT_TAIL_BYTES, log_path=None):
+        self.stream = stream
+        self.max_bytes = max_bytes
+        self.log_path = Path(log_path) if log_path else None
+        self.buffer = bytearray()
+        self.total_bytes = 0
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        """Inicia a leitura em segundo plano"""
+        self.thread.start()
+        return self
+
+    def join(self, timeout=None):
+        """Aguarda o fim do stream"""
+        self.thread.join(timeout)
+
+    def _run(self):
+        log_file = None
+        try:
+            if self.log_path:
+                try:
+                    self.log_path.parent.mkdir(parents=True, exist_ok=True)
+                    log_file = open(self.log_path, 'wb')
+                except OSError:
+                    self.log_path = None
+
+            read = getattr(self.stream, 'read1', self.stream.read)
+            while True:
+                chunk = read(65536)
+                if not chunk:
+                    break
+                self.total_bytes += len(chunk)
+                if log_file:
+                    log_file.write(chunk)
+                self.buffer += chunk
+                excess = len(self.buffer) - self.max_bytes
+                if excess > 0:
+                    del self.buffer[:excess]
+        finally:
+            if log_file:
+                log_file.close()
+            self.stream.close()
+
+    def text(self):
+        """Final do stderr como texto"""
+        text = bytes(self.buffer).decode('utf-8', errors='replace')
+        if self.total_bytes > len(self.buffer):
+            # Descartar a primeira linha, provavelmente cortada ao meio
+            text = text.partition('\n')[2]
+        return text
+
+    def last_lines(self, count=20):
+        """Últimas linhas não vazias do stderr"""
+        lines = [line for line in self.text().splitlines() if line.strip()]
+        return lines[-count:]
@@ -0,0 +1,232 @@
+"""
+Miniaturas de vídeo (tira de keyframes) para a prévia.
+
+Uma única execução do FFmpeg por arquivo decodifica só os keyframes
+(-skip_frame nokey), escolhe um a cada duração/N segundos com o filtro
+select e escreve os JPEGs em sequência no stdout (image2pipe). As tiras
+ficam num cache LRU limitado em bytes e, opcionalmente, em disco, com
+chave (caminho, tamanho, mtime_ns).
+
+Este módulo não importa PIL: quem exibe informa uma função decode que
+transforma os JPEGs no que for guardado em memória (ex.: imagens PIL).
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from .probe import file_identity
+from .processes import BACKGROUND_PROCESSES, ConversionCancelled
+
+THUMB_COUNT = 6
+THUMB_WIDTH = 160
+DEFAULT_MEMORY_BYTES = 32 * 1024 * 1024
+DEFAULT_DISK_FILES = 5000  # tiras mantidas no cache em disco
+
+JPEG_START = b'\xff\xd8'
+JPEG_END = b'\xff\xd9'
+
+
+def thumbnail_command(input_path, duration=0.0, count=THUMB_COUNT, width=THUMB_WIDTH):
+    """Comando do FFmpeg que escreve até count JPEGs espaçados no stdout"""
+    # Sem duração conhecida, ficam os primeiros keyframes
+    interval = duration / count if duration > 0 else 0.0
+    video_filter = (f"select=isnan(prev_selected_t)+gte(t-prev_selected_t\\,{interval:.3f}),"
+                    f"scale={width}:-2")
+    return [
+        'ffmpeg', '-v', 'error', '-nostdin',
+        '-skip_frame', 'nokey',  # decodifica só os keyframes
+        '-i', str(input_path),
+        '-map', '0:v:0', '-an', '-sn',
+        '-vf', video_filter,
+        '-vsync', 'vfr',
+        '-frames:v', str(count),
+        '-f', 'image2pipe', '-c:v', 'mjpeg', '-q:v', '5',
+        'pipe:1'
+    ]
+
+
+def split_jpeg_stream(data):
+    """Separa JPEGs concatenados (o marcador de fim não aparece dentro dos dados)"""
+    frames = []
+    start = data.find(JPEG_START)
+    while start >= 0:
+        end = data.find(JPEG_END, start + 2)
+        if end < 0:
+            break
+        frames.append(data[start:end + 2])
+        start = data.find(JPEG_START, end + 2)
+    return frames
+
+
+def extract_thumbnails(input_path, duration=0.0, count=THUMB_COUNT, width=THUMB_WIDTH):
+    """Lista de JPEGs (bytes) da tira do vídeo; vazia se falhar"""
+    try:
+        result = BACKGROUND_PROCESSES.run(thumbnail_command(input_path, duration, count, width))
+    except (FileNotFoundError, ConversionCancelled):
+        return []
+    if result.returncode != 0:
+        return []
+    return split_jpeg_stream(result.stdout)
+
+
+class ThumbnailCache:
+    """Tiras de miniaturas por arquivo, geradas em segundo plano
+
+    Em memória fica um LRU limitado a max_bytes; com cache_dir, os JPEGs
+    também são gravados em disco. decode(lista de JPEGs) converte a tira
+    (na thread do pool) e weigh(item) informa os bytes de cada item; sem
+    decode, os próprios JPEGs são guardados.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MEMORY_BYTES, cache_dir=None, decode=None, weigh=None,
+                 count=THUMB_COUNT, width=THUMB_WIDTH, max_workers=2,
+                 max_disk_files=DEFAULT_DISK_FILES):
+        self.max_bytes = max_bytes
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.decode = decode
+        self.weigh = weigh or len
+        self.count = count
+        self.width = width
+        self.max_disk_files = max_disk_files
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # chave -> (tira, bytes)
+        self.total_bytes = 0
+        self.pending = {}  # chave -> callbacks esperando a mesma tira
+        self.disk_writes = 0
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix='thumbnails')
+
+    def key(self, file_path):
+        """Chave da tira: identidade do arquivo e tamanho da tira, ou None"""
+        identity = file_identity(file_path)
+        if identity is None:
+            return None
+        text = f"{identity}|{self.count}|{self.width}"
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+    def cached(self, file_path):
+        """Tira já em memória, sem gerar nada"""
+        key = self.key(file_path)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            self.entries.move_to_end(key)
+            return entry[0]
+
+    def request(self, file_path, callback, duration=0.0):
+        """Entrega a tira por callback(file_path, tira ou None)
+
+        Da memória, o callback é chamado na hora; caso contrário, na thread
+        do pool, depois de ler o disco ou executar o FFmpeg.
+        """
+        key = self.key(file_path)
+        if key is None:
+            callback(file_path, None)
+            return
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None and key in self.pending:
+                self.pending[key].append(callback)
+                return
+            if entry is None:
+                self.pending[key] = [callback]
+            else:
+                self.entries.move_to_end(key)
+        if entry is not None:
+            callback(file_path, entry[0])
+            return
+        self.executor.submit(self._load, key, file_path, duration)
+
+    def _load(self, key, file_path, duration):
+        strip = None
+        try:
+            jpegs = self._read_disk(key)
+            if jpegs is None:
+                jpegs = extract_thumbnails(file_path, duration, self.count, self.width)
+                if jpegs:
+                    self._write_disk(key, jpegs)
+            if jpegs:
+                strip = self.decode(jpegs) if self.decode else jpegs
+        except Exception:
+            strip = None
+
+        with self.lock:
+            callbacks = self.pending.pop(key, [])
+            if strip:
+                self._store(key, strip)
+        for callback in callbacks:
+            callback(file_path, strip)
+
+    def _store(self, key, strip):
+        size = sum(self.weigh(item) for item in strip)
+        old = self.entries.pop(key, None)
+        if old:
+            self.total_bytes -= old[1]
+        self.entries[key] = (strip, size)
+        self.total_bytes += size
+        # A tira mais recente fica mesmo que sozinha passe do limite
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            _, (_, evicted) = self.entries.popitem(last=False)
+            self.total_bytes -= evicted
+
+    def _disk_path(self, key):
+        return self.cache_dir / f"{key}.mjpeg"
+
+    def _read_disk(self, key):
+        if not self.cache_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)  # mais recente para o descarte
+        except OSError:
+            return None
+        return split_jpeg_stream(data) or None
+
+    def _write_disk(self, key, jpegs):
+        if not self.cache_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(b''.join(jpegs))
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+            return
+        with self.lock:
+            self.disk_writes += 1
+            prune = self.disk_writes % 100 == 1
+        if prune:
+            self._prune_disk()
+
+    def _prune_disk(self):
+        """Remove as tiras menos usadas além de max_disk_files"""
+        try:
+            files = [(entry.stat().st_mtime, entry.path) for entry in os.scandir(self.cache_dir)
+                     if entry.name.endswith('.mjpeg')]
+        except OSError:
+            return
+        if len(files) <= self.max_disk_files:
+            return
+        files.sort()
+        for _, path in files[:len(files) - self.max_disk_files]:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    def shutdown(self):
+        """Encerra o pool sem esperar tiras pendentes"""
+        self.executor.shutdown(wait=False)
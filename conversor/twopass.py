@@ -0,0 +1,109 @@
+"""
+ABR em duas passagens: taxa média de vídeo exata.
+
+A primeira passagem analisa o vídeo e descarta a saída (-f null), com o
+mesmo preset da segunda: o x264 exige que as duas passagens tenham a mesma
+estrutura de quadros e o mesmo weightp, e o libx264 já acelera a primeira
+sozinho (fastfirstpass). As estatísticas do x264 (-passlogfile) ficam numa
+pasta temporária da conversão. A segunda passagem usa essas estatísticas
+para distribuir os bits e atingir a taxa pedida, dentro do VBV (-maxrate e
+-bufsize). Várias taxas (renditions) da mesma fonte compartilham uma única
+primeira passagem: as estatísticas descrevem cada quadro, não a taxa.
+"""
+
+import os
+import shutil
+import tempfile
+from dataclasses import replace
+from pathlib import Path
+
+from .atomic import SEGMENT_DIR_PREFIX
+from .estimate import parse_bitrate
+from .probe import get_duration
+
+FIRST_PASS_WEIGHT = 0.4  # custo da primeira passagem em relação a uma segunda, para o progresso
+
+
+def parse_bitrates(value):
+    """'4M, 2M' -> ['4M', '2M']; levanta ValueError para taxas inválidas"""
+    bitrates = [part.strip() for part in str(value or '').split(',') if part.strip()]
+    for bitrate in bitrates:
+        if parse_bitrate(bitrate) <= 0:
+            raise ValueError(f"taxa de vídeo inválida: {bitrate}")
+    return bitrates
+
+
+def rendition_path(output_path, bitrate):
+    """Saída de uma taxa adicional: <nome>_<taxa>.mov ao lado da saída principal"""
+    output_path = Path(output_path)
+    return output_path.with_name(f"{output_path.stem}_{bitrate}{output_path.suffix}")
+
+
+class TwoPassEncoder:
+    """Uma primeira passagem por fonte e uma segunda passagem por taxa"""
+
+    def __init__(self, engine, threads=None):
+        self.engine = engine
+        self.threads = threads
+
+    def encode(self, input_path, outputs, info, plan, on_progress=None, metrics=None):
+        """Gera cada (taxa, caminho) de outputs; True se todas forem geradas
+
+        metrics (JobMetrics), se informado, acumula a CPU de todas as passagens.
+        """
+        engine = self.engine
+        duration = get_duration(info)
+        weights = [FIRST_PASS_WEIGHT] + [1.0] * len(outputs)
+
+        work_dir = Path(tempfile.mkdtemp(prefix=f'{SEGMENT_DIR_PREFIX}{os.getpid()}-',
+                                         dir=Path(outputs[0][1]).parent))
+        passlog = work_dir / "x264"
+        try:
+            engine.log_message(f"📊 ABR em duas passagens: {', '.join(rate for rate, _ in outputs)}")
+            cmd = self.first_pass_command(input_path, outputs[0][0], passlog, plan)
+            if not engine.run_ffmpeg(cmd, input_path, duration,
+                                     self.scaled_progress(on_progress, weights, 0), metrics):
+                return False
+
+            for i, (bitrate, output_path) in enumerate(outputs, 1):
+                engine.log_message(f"📊 2ª passagem: {bitrate}")
+                cmd = self.second_pass_command(input_path, output_path, bitrate, passlog, plan)
+                if not engine.run_ffmpeg(cmd, input_path, duration,
+                                         self.scaled_progress(on_progress, weights, i), metrics):
+                    return False
+            return True
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def first_pass_command(self, input_path, bitrate, passlog, plan):
+        """Primeira passagem: só o vídeo, saída descartada"""
+        cmd = ['ffmpeg', '-nostats', '-progress', 'pipe:1', '-i', str(input_path),
+               '-y', '-map', f'0:{plan.video_index}', '-an', '-sn']
+        cmd.extend(self.engine.abr_video_args(bitrate, 1, passlog))
+        if self.threads:
+            cmd.extend(['-threads', str(self.threads)])
+        cmd.extend(['-f', 'null', '-'])
+        return cmd
+
+    def second_pass_command(self, input_path, output_path, bitrate, passlog, plan):
+        """Segunda passagem de uma taxa, com áudio e contêiner finais"""
+        return self.engine.build_command(input_path, output_path, self.threads, plan,
+                                         self.engine.abr_video_args(bitrate, 2, passlog))
+
+    @staticmethod
+    def scaled_progress(on_progress, weights, index):
+        """Converte o progresso de uma passagem em progresso da conversão inteira"""
+        if not on_progress:
+            return None
+        before = sum(weights[:index])
+        total = sum(weights)
+        last = index == len(weights) - 1
+
+        def report(event):
+            if event.duration > 0:
+                done = (before + weights[index] * min(event.out_time / event.duration, 1.0)) / total
+                event = replace(event, out_time=done * event.duration)
+            if event.finished and not last:
+                event = replace(event, finished=False)
+            on_progress(event)
+        return report
@@ -0,0 +1,431 @@
+"""
+Modo de observação de pasta (ingestão contínua).
+
+Arquivos de vídeo que chegam à pasta observada são detectados por inotify
+(Linux) ou, na falta dele, por varreduras periódicas. Cada arquivo só é
+entregue quando está estável: tamanho e mtime inalterados e nenhum
+processo com o arquivo aberto para escrita. Os arquivos prontos entram
+num pool de conversões simultâneas e os originais vão para as pastas de
+concluídos ou de falhas.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import queue
+import select
+import shutil
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from .batch import default_max_jobs, output_path_for, plan_workers
+from .diskspace import InsufficientSpaceError
+from .engine import is_video_file
+from .probe import get_duration
+from .scheduler import BatchJob, order_jobs
+
+STABLE_SECONDS = 2.0  # tempo sem mudanças para considerar a cópia concluída
+POLL_INTERVAL = 1.0  # segundos entre varreduras sem inotify
+RETRY_DELAY = 30.0  # espera antes de tentar de novo após falta de espaço
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+_EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, len
+
+
+class Inotify:
+    """inotify de uma pasta via libc (só Linux); levanta OSError se indisponível"""
+
+    def __init__(self, directory, mask=IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE):
+        if not sys.platform.startswith('linux'):
+            raise OSError("inotify disponível apenas no Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        if libc.inotify_add_watch(self.fd, os.fsencode(str(directory)), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, os.strerror(errno))
+
+    def read(self, timeout):
+        """[(nome, máscara)] dos eventos recebidos em até timeout segundos"""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if name:
+                events.append((os.fsdecode(name), mask))
+        return events
+
+    def close(self):
+        """Libera o descritor do inotify"""
+        os.close(self.fd)
+
+
+def files_open_for_writing(targets=None):
+    """Caminhos (reais) que algum processo mantém abertos para escrita
+
+    Consulta /proc uma vez (Linux, processos visíveis ao usuário); com
+    targets, só os descritores que apontam para esses caminhos são
+    examinados. Sem /proc retorna um conjunto vazio.
+    """
+    writers = set()
+    if not os.path.isdir('/proc/self/fd'):
+        return writers
+    for pid in os.listdir('/proc'):
+        if not pid.isdigit():
+            continue
+        fd_dir = f'/proc/{pid}/fd'
+        try:
+            fds = os.listdir(fd_dir)
+        except OSError:
+            continue
+        for fd in fds:
+            try:
+                target = os.readlink(f'{fd_dir}/{fd}')
+                if target in writers or (targets is not None and target not in targets):
+                    continue
+                with open(f'/proc/{pid}/fdinfo/{fd}', 'r') as f:
+                    for line in f:
+                        if line.startswith('flags:'):
+                            flags = int(line.split()[1], 8)
+                            if flags & os.O_ACCMODE in (os.O_WRONLY, os.O_RDWR):
+                                writers.add(target)
+                            break
+            except (OSError, ValueError):
+                continue
+    return writers
+
+
+def open_for_writing(path, writers=None):
+    """True se outro processo mantém o arquivo aberto para escrita
+
+    No Linux consulta /proc (ou writers, o resultado de uma única chamada a
+    files_open_for_writing() para vários arquivos); no Windows, tenta abrir
+    o arquivo para escrita. Em outros sistemas retorna False e vale só a
+    verificação de estabilidade.
+    """
+    if sys.platform == "win32":
+        try:
+            with open(path, 'r+b'):
+                return False
+        except PermissionError:
+            return True
+        except OSError:
+            return False
+
+    target = os.path.realpath(path)
+    if writers is None:
+        writers = files_open_for_writing({target})
+    return target in writers
+
+
+def move_to(path, folder):
+    """Move o arquivo para a pasta sem sobrescrever (acrescenta -1, -2, ...)"""
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    source = Path(path)
+    target = folder / source.name
+    counter = 1
+    while target.exists():
+        target = folder / f"{source.stem}-{counter}{source.suffix}"
+        counter += 1
+    shutil.move(str(source), str(target))
+    return target
+
+
+class FolderWatcher:
+    """Arquivos de vídeo que chegam a uma pasta, entregues quando estáveis
+
+    Observa só a própria pasta (não as subpastas, onde ficam concluídos e
+    falhas). Com inotify, um arquivo fechado após escrita (ou movido para a
+    pasta) é entregue assim que nenhum processo o mantém aberto; nas
+    varreduras, depois de stable_seconds sem mudança de tamanho e mtime.
+    Um arquivo entregue só volta a ser entregue depois de forget() ou se
+    for substituído (tamanho ou mtime diferentes).
+    """
+
+    def __init__(self, directory, stable_seconds=STABLE_SECONDS, poll_interval=POLL_INTERVAL,
+                 use_inotify=True):
+        self.directory = Path(directory)
+        self.stable_seconds = stable_seconds
+        self.poll_interval = poll_interval
+        self.inotify = None
+        if use_inotify:
+            try:
+                self.inotify = Inotify(self.directory)
+            except OSError:
+                self.inotify = None
+        self.candidates = {}  # caminho -> [tamanho, mtime_ns, desde, escrita concluída]
+        self.delivered = {}  # caminho -> (tamanho, mtime_ns) na entrega
+        self.last_scan = 0.0
+        self.scan()  # arquivos que já estavam na pasta
+
+    @property
+    def mode(self):
+        """'inotify' ou 'varredura'"""
+        return 'inotify' if self.inotify else 'varredura'
+
+    def scan(self):
+        """Uma varredura da pasta (início e modo sem inotify)"""
+        self.last_scan = time.monotonic()
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.is_file() and is_video_file(entry.name):
+                        self.add(entry.path)
+        except OSError:
+            pass
+
+    def add(self, path, closed=False):
+        """Registra um arquivo novo ou alterado"""
+        identity = self.delivered.get(path)
+        if identity is not None:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return
+            if (stat.st_size, stat.st_mtime_ns) == identity:
+                return
+            del self.delivered[path]  # substituído por outro arquivo com o mesmo nome
+        candidate = self.candidates.get(path)
+        if candidate is None:
+            self.candidates[path] = [-1, -1, time.monotonic(), closed]
+        elif closed:
+            candidate[3] = True
+
+    def forget(self, path):
+        """O arquivo saiu da pasta (ou pode ser entregue de novo)"""
+        self.delivered.pop(path, None)
+        self.candidates.pop(path, None)
+
+    def defer(self, path, delay):
+        """Entrega o arquivo de novo, inalterado, só depois de delay segundos"""
+        self.delivered.pop(path, None)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self.candidates.pop(path, None)
+            return
+        self.candidates[path] = [stat.st_size, stat.st_mtime_ns, time.monotonic() + delay, False]
+
+    def wait_ready(self, timeout=1.0):
+        """Espera até timeout segundos e retorna os arquivos prontos"""
+        # Com candidatos pendentes, a estabilidade é reavaliada com frequência
+        wait = min(timeout, 0.25) if self.candidates else timeout
+        if self.inotify:
+            for name, mask in self.inotify.read(wait):
+                if is_video_file(name):
+                    self.add(str(self.directory / name),
+                             closed=bool(mask & (IN_CLOSE_WRITE | IN_MOVED_TO)))
+        else:
+            remaining = self.poll_interval - (time.monotonic() - self.last_scan)
+            if remaining > 0:
+                time.sleep(min(wait, remaining))
+            if time.monotonic() - self.last_scan >= self.poll_interval:
+                self.scan()
+        return self.collect_ready()
+
+    def collect_ready(self):
+        """Candidatos estáveis, retirados da lista de espera"""
+        now = time.monotonic()
+        stable = []
+        for path, candidate in list(self.candidates.items()):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                del self.candidates[path]  # removido ou renomeado antes de ficar pronto
+                continue
+            size, mtime_ns, since, closed = candidate
+            if (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns):
+                candidate[0], candidate[1], candidate[2] = stat.st_size, stat.st_mtime_ns, now
+                if not closed:
+                    continue
+            elif not closed and now - since < self.stable_seconds:
+                continue
+            if stat.st_size == 0:
+                candidate[3] = False
+                continue
+            stable.append(path)
+        if not stable:
+            return []
+
+        # Uma única consulta a /proc para todos os candidatos estáveis
+        writers = None
+        if sys.platform != "win32":
+            writers = files_open_for_writing({os.path.realpath(path) for path in stable})
+        ready = []
+        for path in stable:
+            candidate = self.candidates[path]
+            if open_for_writing(path, writers):
+                candidate[3] = False  # ainda sendo escrito: volta a esperar estabilidade
+                continue
+            del self.candidates[path]
+            self.delivered[path] = (candidate[0], candidate[1])
+            ready.append(path)
+        return ready
+
+    def close(self):
+        """Encerra o inotify"""
+        if self.inotify:
+            self.inotify.close()
+            self.inotify = None
+
+
+class WatchDaemon:
+    """Converte continuamente os vídeos que chegam a uma pasta
+
+    Cada arquivo pronto vai para um pool de conversões que dura enquanto a
+    pasta é observada: um arquivo que chega enquanto outros convertem
+    começa assim que houver um processo livre. Arquivos prontos ao mesmo
+    tempo entram na ordem da política. Ao fim de cada arquivo, o original
+    vai para done_dir ou failed_dir; se não puder ser movido, fica na pasta
+    e só é convertido de novo se for substituído.
+    """
+
+    def __init__(self, engine, directory, output_directory=None, done_dir=None, failed_dir=None,
+                 max_jobs=None, policy='longest_first', use_inotify=True,
+                 stable_seconds=STABLE_SECONDS):
+        self.engine = engine
+        self.directory = Path(directory)
+        self.output_directory = Path(output_directory) if output_directory else self.directory / "converted"
+        self.done_dir = Path(done_dir) if done_dir else self.directory / "done"
+        self.failed_dir = Path(failed_dir) if failed_dir else self.directory / "failed"
+        self.max_jobs = max_jobs
+        self.policy = policy
+        self.use_inotify = use_inotify
+        self.stable_seconds = stable_seconds
+        self.stop_event = threading.Event()
+        self.watcher = None
+        self.active_lock = threading.Lock()
+        self.active = 0  # arquivos na fila do pool ou convertendo
+        self.finished = queue.SimpleQueue()  # (caminho, atraso para nova entrega ou None)
+
+    def stop(self):
+        """Para de observar; conversões em andamento terminam, as da fila não começam"""
+        self.stop_event.set()
+
+    def run(self):
+        """Observa a pasta até stop() ou cancelamento do engine"""
+        log = self.engine.log_message
+        self.output_directory.mkdir(parents=True, exist_ok=True)
+        self.engine.cleanup_stale_outputs(self.output_directory)
+        self.watcher = FolderWatcher(self.directory, self.stable_seconds,
+                                     use_inotify=self.use_inotify)
+        max_workers = max(1, min(self.max_jobs or default_max_jobs(), os.cpu_count() or 1))
+        log(f"👀 Observando {self.directory} ({self.watcher.mode}); "
+            f"saídas em {self.output_directory}")
+        log(f"   ⚙️ até {max_workers} conversões simultâneas")
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            while not self.stop_event.is_set() and not self.engine.cancelled:
+                ready = self.watcher.wait_ready()
+                self.settle_finished()
+                if ready:
+                    log(f"📥 {len(ready)} arquivos prontos para conversão")
+                    for path in self.order_ready(ready):
+                        with self.active_lock:
+                            self.active += 1
+                        executor.submit(self.convert, path)
+        except KeyboardInterrupt:
+            self.stop_event.set()
+            self.engine.cancel()
+            raise
+        finally:
+            self.stop_event.set()  # arquivos ainda na fila não são iniciados
+            executor.shutdown(wait=True)
+            self.watcher.close()
+
+    def order_ready(self, paths):
+        """Arquivos prontos ao mesmo tempo, na ordem da política"""
+        jobs = []
+        for i, path in enumerate(paths):
+            info = self.engine.probe(path)
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                size = 0
+            jobs.append(BatchJob(i, path, get_duration(info), size))
+        return [job.input_path for job in order_jobs(jobs, self.policy)]
+
+    def settle_finished(self):
+        """Atualiza o watcher com os arquivos finalizados pelas conversões"""
+        while True:
+            try:
+                path, delay = self.finished.get_nowait()
+            except queue.Empty:
+                return
+            if delay is not None:
+                self.watcher.defer(path, delay)
+            elif not os.path.exists(path):
+                self.watcher.forget(path)
+            # Se o original não pôde ser movido, continua entregue: só um
+            # arquivo substituído (tamanho ou mtime diferentes) é convertido de novo
+
+    def convert(self, input_path):
+        """Converte um arquivo da pasta (chamado nas threads do pool)"""
+        try:
+            if not (self.stop_event.is_set() or self.engine.cancelled):
+                self._convert(input_path)
+        finally:
+            with self.active_lock:
+                self.active -= 1
+
+    def _convert(self, input_path):
+        # As threads do FFmpeg são divididas entre os arquivos pendentes agora:
+        # um arquivo sozinho usa todos os núcleos
+        with self.active_lock:
+            active = self.active
+        _, threads = plan_workers(active, self.max_jobs)
+        log = self.engine.log_message
+        name = Path(input_path).name
+        output_file = output_path_for(input_path, self.output_directory)
+        try:
+            info = self.engine.probe(input_path)
+            self.engine.space.check_batch(
+                [(output_file, self.engine.space_needed(input_path, info))])
+        except InsufficientSpaceError as e:
+            log(f"❌ {e}")
+            log(f"   ⏳ {name} será tentado de novo em {RETRY_DELAY:.0f}s")
+            self.finished.put((input_path, RETRY_DELAY))
+            return
+
+        log(f"📁 Convertendo: {name} ({threads} threads)")
+        success = self.engine.convert(input_path, output_file, threads=threads)
+        if success:
+            log(f"✅ Sucesso: {name}")
+        elif self.engine.cancelled:
+            log(f"⏹️ Cancelado: {name}")
+        else:
+            log(f"❌ Falha: {name}")
+        self.job_done(input_path, success)
+
+    def job_done(self, input_path, success):
+        """Move o original conforme o resultado (cancelados ficam na pasta)"""
+        if not success and self.engine.cancelled:
+            return
+        folder = self.done_dir if success else self.failed_dir
+        try:
+            target = move_to(input_path, folder)
+            self.engine.log_message(f"📦 {Path(input_path).name} → {target.parent.name}/")
+        except OSError as e:
+            self.engine.log_message(f"⚠️ Não foi possível mover {Path(input_path).name}: {e}")
+        self.finished.put((input_path, None))
@@ -11,13 +11,44 @@ import sys
 import subprocess
 import threading
 import json
+import io
 import time
-import re
+import traceback
 from pathlib import Path
 from datetime import datetime
 import queue
 import tkinterdnd2 as tkdnd
-from PIL import Image, ImageTk
+
+from conversor import (BACKGROUND_PROCESSES, HISTORY_DB, HISTORY_PAGE_SIZE, JOB_CANCELLED,
+                       JOB_DONE, JOB_FAILED, JOB_QUEUED, JOB_RUNNING, JOB_STATUS_LABELS,
+                       JOURNAL_NAME, POLICIES,
+                       STATUS_CANCELLED, STATUS_FAILED, STATUS_SUCCESS, THUMB_COUNT,
+                       THUMB_WIDTH, BackgroundProber, BatchConverter, BatchJournal, BitrateStats,
+                       ConversionCache, ConversionEngine, ConversionSettings,
+                       HistoryStore, JobTable, LogQueue, ProbeService, ProgressBoard, SpeedStats,
+                       ThumbnailCache,
+                       default_cache_dir, default_max_jobs,
+                       format_duration, format_file_size, get_duration,
+                       is_video_file, iter_video_files, parse_bitrates)
+
+
+def decode_thumbnails(jpegs):
+    """JPEGs da tira -> imagens PIL (roda na thread do pool; PIL só é importado aqui)"""
+    from PIL import Image
+
+    images = []
+    for data in jpegs:
+        image = Image.open(io.BytesIO(data))
+        image.load()
+        image.thumbnail((THUMB_WIDTH, THUMB_WIDTH))
+        images.append(image)
+    return images
+
+
+def image_bytes(image):
+    """Memória ocupada por uma imagem PIL decodificada"""
+    return image.width * image.height * len(image.getbands())
+
 
 class VideoConverterGUI:
     def __init__(self):
@@ -43,12 +74,12 @@ class VideoConverterGUI:
             ("Todos os arquivos", "*.*")
         ]
         
-        # Fila para comunicação entre threads
-        self.progress_queue = queue.Queue()
+        # Progresso das conversões (último estado de cada job, lido pela thread principal)
+        self.progress_board = ProgressBoard()
+        self.monitor_log()
         self.monitor_progress()
-        
-        # Cache para thumbnails
-        self.thumbnail_cache = {}
+        self.monitor_probe_results()
+        self.monitor_batch_view()
         
     def setup_window(self):
         """Configura a janela principal"""
@@ -70,7 +101,20 @@ class VideoConverterGUI:
             
     def setup_variables(self):
         """Inicializa as variáveis do Tkinter"""
-        self.input_files = []
+        # Lista do lote: dados em batch_table; o Treeview mostra só as linhas visíveis
+        self.batch_table = JobTable()
+        self.batch_view = range(0)  # linhas da tabela exibidas, após filtro e ordenação
+        self.batch_top = 0  # posição em batch_view da primeira linha visível
+        self.batch_slots = []  # itens do Treeview, um por linha visível
+        self.batch_slot_rows = []  # linha da tabela exibida em cada item
+        self.batch_selected_row = None
+        self.batch_sort = None
+        self.batch_sort_reverse = False
+        self.batch_view_stale = False  # dados usados no filtro/ordenação mudaram
+        self.batch_view_time = 0.0
+        self.batch_render_pending = False  # valores das linhas visíveis mudaram
+        self.scan_generation = 0  # muda ao limpar a lista, descartando buscas em andamento
+        self.scan_chunk = 500  # arquivos enviados à lista por vez durante a busca
         self.output_directory = tk.StringVar()
         self.quality = tk.StringVar(value="medium")
         self.progress_var = tk.DoubleVar()
@@ -81,6 +125,30 @@ class VideoConverterGUI:
         self.preserve_audio = tk.BooleanVar(value=True)
         self.auto_open_folder = tk.BooleanVar(value=True)
         self.dark_mode = tk.BooleanVar(value=False)  # Tema claro por padrão
+        self.cpu_count = os.cpu_count() or 1
+        self.log_queue = LogQueue(Path("conversion_logs") / "conversor.log")
+        self.log_max_lines = 1000  # linhas mantidas no widget de log
+        self.monitor_errors = {}  # último erro registrado por laço de monitoramento
+        self.max_jobs_var = tk.IntVar(value=default_max_jobs(self.cpu_count))
+        self.prober = ProbeService(default_cache_dir() / "probe_cache.json")
+        self.background_prober = BackgroundProber(self.prober)
+        self.probe_queue = queue.Queue()
+        self.history = HistoryStore(HISTORY_DB)
+        self.history_exhausted = False
+        self.engine = ConversionEngine(log=self.log_message, log_dir="conversion_logs",
+                                       prober=self.prober,
+                                       speed_stats=SpeedStats(default_cache_dir() / "speed_stats.json"),
+                                       bitrate_stats=BitrateStats(default_cache_dir() / "bitrate_stats.json"),
+                                       history=self.history)
+        self.batch_converter = None
+        self.output_cache = None
+        self.batch_inputs = []
+        # Miniaturas: LRU de imagens PIL pequenas em memória, JPEGs em disco
+        self.thumbnail_cache = ThumbnailCache(cache_dir=default_cache_dir() / "thumbnails",
+                                              decode=decode_thumbnails, weigh=image_bytes)
+        self.preview_path = None
+        self.preview_photos = []
+        self.batch_total = 0
         
     def setup_theme(self):
         """Configura o tema da aplicação"""
@@ -200,14 +268,6 @@ class VideoConverterGUI:
                 insertbackground=self.fg_color
             )
             
-            # Atualizar cores da lista de arquivos
-            self.batch_listbox.configure(
-                bg=self.bg_color,
-                fg=self.fg_color,
-                selectbackground=self.accent_color,
-                selectforeground='white'
-            )
-            
             # Atualizar cores dos entries
             self.output_entry.configure(
                 bg=self.bg_color,
@@ -322,6 +382,9 @@ Verifique se o FFmpeg está instalado no seu sistema.
         if self.converting:
             if messagebox.askyesno("Cancelar", "Deseja cancelar a conversão atual?"):
                 self.converting = False
+                if self.batch_converter:
+                    self.batch_converter.cancel()
+                self.engine.cancel()
                 self.status_var.set("Conversão cancelada")
                 self.log_message("⏹️ Conversão cancelada pelo usuário")
     
@@ -449,16 +512,64 @@ Verifique se o FFmpeg está instalado no seu sistema.
         self.drop_batch_label.drop_target_register(tkdnd.DND_FILES)
         self.drop_batch_label.dnd_bind('<<Drop>>', self.on_drop_batch_files)
         
+        # Filtro da lista por nome e status
+        filter_frame = ttk.Frame(self.batch_file_frame)
+        filter_frame.pack(fill=tk.X, pady=(0, 5))
+        
+        ttk.Label(filter_frame, text="🔎 Filtrar:").pack(side=tk.LEFT, padx=(0, 5))
+        self.batch_filter_var = tk.StringVar()
+        self.batch_filter_var.trace_add('write', lambda *args: self.refresh_batch_view())
+        ttk.Entry(filter_frame, textvariable=self.batch_filter_var,
+                  font=('Arial', 9)).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 10))
+        
+        self.batch_status_var = tk.StringVar(value="Todos")
+        status_filter = ttk.Combobox(filter_frame, textvariable=self.batch_status_var,
+                                     values=("Todos",) + tuple(JOB_STATUS_LABELS.values()),
+                                     state="readonly", width=14)
+        status_filter.pack(side=tk.RIGHT)
+        status_filter.bind("<<ComboboxSelected>>", lambda event: self.refresh_batch_view())
+        ttk.Label(filter_frame, text="Status:").pack(side=tk.RIGHT, padx=(0, 5))
+        
         # Lista de arquivos em lote
         list_frame = ttk.Frame(self.batch_file_frame)
         list_frame.pack(fill=tk.BOTH, expand=True)
         
-        self.batch_listbox = tk.Listbox(list_frame, height=6, font=('Arial', 9))
-        self.batch_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        
-        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.batch_listbox.yview)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.batch_listbox.configure(yscrollcommand=scrollbar.set)
+        # Lista virtual: o Treeview só tem os itens visíveis, preenchidos a partir de
+        # batch_table conforme a rolagem (a rolagem e a barra são controladas aqui)
+        self.batch_columns = (('Arquivo', 'name'), ('Status', 'status'), ('Duração', 'duration'),
+                              ('Codec', 'codec'), ('Progresso', 'progress'), ('Tamanho', 'size'))
+        columns = tuple(col for col, _ in self.batch_columns)
+        self.batch_tree = ttk.Treeview(list_frame, columns=columns, show='headings', height=6,
+                                       selectmode='browse')
+        
+        for col, key in self.batch_columns:
+            self.batch_tree.heading(col, text=col, command=lambda key=key: self.sort_batch_view(key))
+            self.batch_tree.column(col, width=260 if col == 'Arquivo' else 110,
+                                   stretch=(col == 'Arquivo'))
+        
+        self.batch_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        self.batch_scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL,
+                                             command=self.scroll_batch_view)
+        self.batch_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.batch_tree.bind('<<TreeviewSelect>>', self.on_batch_select)
+        self.batch_tree.bind('<Configure>', self.on_batch_tree_resize)
+        for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+            self.batch_tree.bind(sequence, self.on_batch_wheel)
+        self.batch_tree.bind('<Up>', lambda event: self.move_batch_selection(-1))
+        self.batch_tree.bind('<Down>', lambda event: self.move_batch_selection(1))
+        self.batch_tree.bind('<Prior>', lambda event: self.move_batch_selection(-len(self.batch_slots)))
+        self.batch_tree.bind('<Next>', lambda event: self.move_batch_selection(len(self.batch_slots)))
+        self.resize_batch_slots(6)
+        
+        # Prévia: tira de miniaturas do arquivo selecionado (nos dois modos)
+        self.preview_frame = ttk.Frame(self.files_frame)
+        self.preview_frame.pack(side=tk.BOTTOM, fill=tk.X, pady=(10, 0))
+        self.preview_labels = []
+        for _ in range(THUMB_COUNT):
+            label = ttk.Label(self.preview_frame)
+            label.pack(side=tk.LEFT, padx=(0, 4))
+            self.preview_labels.append(label)
         
         # Configurações rápidas
         config_frame = ttk.LabelFrame(main_frame, text="⚙️ Configurações Rápidas", padding="10")
@@ -566,6 +677,45 @@ Verifique se o FFmpeg está instalado no seu sistema.
         self.bufsize_var = tk.StringVar(value="16M")
         ttk.Entry(ffmpeg_frame, textvariable=self.bufsize_var, width=15).grid(row=2, column=1, padx=(10, 0), pady=(10, 0), sticky=tk.W)
         
+        ttk.Label(ffmpeg_frame, text="Segmentos Paralelos (arquivo único):").grid(row=5, column=0, sticky=tk.W, pady=(10, 0))
+        self.segments_var = tk.IntVar(value=0)
+        ttk.Spinbox(ffmpeg_frame, from_=0, to=self.cpu_count, textvariable=self.segments_var,
+                    width=13).grid(row=5, column=1, padx=(10, 0), pady=(10, 0), sticky=tk.W)
+        
+        ttk.Label(ffmpeg_frame, text="Ordem do Lote:").grid(row=6, column=0, sticky=tk.W, pady=(10, 0))
+        self.batch_policy_var = tk.StringVar(value="longest_first")
+        ttk.Combobox(ffmpeg_frame, textvariable=self.batch_policy_var,
+                     values=sorted(POLICIES), state="readonly",
+                     width=15).grid(row=6, column=1, padx=(10, 0), pady=(10, 0), sticky=tk.W)
+        
+        self.output_cache_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(ffmpeg_frame, text="Reaproveitar conversões de arquivos idênticos (cache)",
+                       variable=self.output_cache_var).grid(row=7, column=0, columnspan=2, sticky=tk.W, pady=(10, 0))
+        
+        ttk.Label(ffmpeg_frame, text="CRF Automático - MB/min (0 = desligado):").grid(row=8, column=0, sticky=tk.W, pady=(10, 0))
+        self.target_mb_var = tk.StringVar(value="0")
+        ttk.Entry(ffmpeg_frame, textvariable=self.target_mb_var, width=15).grid(row=8, column=1, padx=(10, 0), pady=(10, 0), sticky=tk.W)
+        
+        ttk.Label(ffmpeg_frame, text="CRF Automático - SSIM mínimo (0 = desligado):").grid(row=9, column=0, sticky=tk.W, pady=(10, 0))
+        self.target_ssim_var = tk.StringVar(value="0")
+        ttk.Entry(ffmpeg_frame, textvariable=self.target_ssim_var, width=15).grid(row=9, column=1, padx=(10, 0), pady=(10, 0), sticky=tk.W)
+        
+        ttk.Label(ffmpeg_frame, text="Taxa ABR 2 passagens (ex.: 4M,2M; vazio = CRF):").grid(row=10, column=0, sticky=tk.W, pady=(10, 0))
+        self.video_bitrate_var = tk.StringVar(value="")
+        ttk.Entry(ffmpeg_frame, textvariable=self.video_bitrate_var, width=15).grid(row=10, column=1, padx=(10, 0), pady=(10, 0), sticky=tk.W)
+        
+        self.resume_batch_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(ffmpeg_frame, text="Retomar lote (pular arquivos já convertidos com as mesmas configurações)",
+                       variable=self.resume_batch_var).grid(row=11, column=0, columnspan=2, sticky=tk.W, pady=(10, 0))
+        
+        self.stream_copy_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(ffmpeg_frame, text="Copiar streams já compatíveis (remux sem recodificar)",
+                       variable=self.stream_copy_var).grid(row=4, column=0, columnspan=2, sticky=tk.W, pady=(10, 0))
+        
+        ttk.Label(ffmpeg_frame, text="Conversões Simultâneas:").grid(row=3, column=0, sticky=tk.W, pady=(10, 0))
+        ttk.Spinbox(ffmpeg_frame, from_=1, to=self.cpu_count, textvariable=self.max_jobs_var,
+                    width=13).grid(row=3, column=1, padx=(10, 0), pady=(10, 0), sticky=tk.W)
+        
         # Configurações de áudio
         audio_frame = ttk.LabelFrame(settings_frame, text="🔊 Configurações de Áudio", padding="10")
         audio_frame.pack(fill=tk.X, pady=(0, 15))
@@ -614,24 +764,36 @@ Verifique se o FFmpeg está instalado no seu sistema.
         ttk.Button(controls_frame, text="🗑️ Limpar Histórico", 
                   command=self.clear_history).pack(side=tk.LEFT, padx=(0, 10))
         ttk.Button(controls_frame, text="📁 Abrir Pasta de Histórico", 
-                  command=self.open_history_folder).pack(side=tk.LEFT)
+                  command=self.open_history_folder).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Button(controls_frame, text="📤 Exportar", 
+                  command=self.export_history).pack(side=tk.LEFT)
+        
+        self.history_status_var = tk.StringVar(value="Todos")
+        status_filter = ttk.Combobox(controls_frame, textvariable=self.history_status_var,
+                                     values=("Todos", STATUS_SUCCESS, STATUS_FAILED, STATUS_CANCELLED),
+                                     state="readonly", width=12)
+        status_filter.pack(side=tk.RIGHT)
+        status_filter.bind("<<ComboboxSelected>>", lambda event: self.load_history())
+        ttk.Label(controls_frame, text="Status:").pack(side=tk.RIGHT, padx=(0, 5))
         
         # Lista de histórico
         list_frame = ttk.Frame(history_frame)
         list_frame.pack(fill=tk.BOTH, expand=True)
         
-        columns = ('Data', 'Arquivo Original', 'Arquivo Convertido', 'Status', 'Tamanho')
+        columns = ('Data', 'Arquivo Original', 'Arquivo Convertido', 'Status', 'Tamanho', 'Velocidade')
         self.history_tree = ttk.Treeview(list_frame, columns=columns, show='headings', height=15)
         
         for col in columns:
             self.history_tree.heading(col, text=col)
-            self.history_tree.column(col, width=150)
+            self.history_tree.column(col, width=100 if col in ('Status', 'Velocidade') else 150)
         
         self.history_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
-        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.history_tree.yview)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.history_tree.configure(yscrollcommand=scrollbar.set)
+        self.history_scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL,
+                                               command=self.history_tree.yview)
+        self.history_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        # Páginas mais antigas são carregadas conforme a rolagem chega ao fim
+        self.history_tree.configure(yscrollcommand=self.on_history_scroll)
         
         # Carregar histórico
         self.load_history()
@@ -669,30 +831,59 @@ Verifique se o FFmpeg está instalado no seu sistema.
                 self.output_entry.delete(0, tk.END)
                 self.output_entry.insert(0, str(suggested_output))
             
-            # Mostrar informações do vídeo
+            # Mostrar informações e prévia do vídeo
+            self.show_preview(filename)
             self.show_video_info(filename)
             self.log_message(f"📁 Arquivo selecionado: {file_name}")
     
+    def on_batch_select(self, event=None):
+        """Mostra a prévia do arquivo selecionado na lista do lote"""
+        selection = self.batch_tree.selection()
+        if not selection:
+            return
+        index = self.batch_slots.index(selection[0])
+        if index < len(self.batch_slot_rows):
+            self.select_batch_row(self.batch_slot_rows[index])
+    
+    def select_batch_row(self, row):
+        """Guarda a linha selecionada (por linha da tabela, não por item) e mostra a prévia"""
+        self.batch_selected_row = row
+        file_path = self.batch_table.paths[row]
+        if file_path != self.preview_path:
+            self.show_preview(file_path)
+    
+    def show_preview(self, file_path):
+        """Pede a tira de miniaturas do arquivo (gerada fora da thread principal)"""
+        self.preview_path = file_path
+        duration = get_duration(self.prober.cached(file_path))
+        self.thumbnail_cache.request(
+            file_path,
+            lambda path, strip: self.window.after(0, self.show_thumbnail_strip, path, strip),
+            duration)
+    
+    def show_thumbnail_strip(self, file_path, strip):
+        """Exibe a tira (thread principal); ignora tiras de um arquivo já deselecionado"""
+        if file_path != self.preview_path:
+            return
+        # Só a tira visível vira PhotoImage
+        self.preview_photos = []
+        if strip:
+            try:
+                from PIL import ImageTk
+                self.preview_photos = [ImageTk.PhotoImage(image) for image in strip]
+            except Exception as e:
+                self.log_message(f"⚠️ Prévia indisponível: {e}")
+        for i, label in enumerate(self.preview_labels):
+            photo = self.preview_photos[i] if i < len(self.preview_photos) else ''
+            label.configure(image=photo)
+    
     def show_video_info(self, file_path):
         """Mostra informações do vídeo selecionado"""
         try:
             # Usar FFprobe para obter informações do vídeo
-            cmd = [
-                'ffprobe',
-                '-v', 'quiet',
-                '-print_format', 'json',
-                '-show_format',
-                '-show_streams',
-                file_path
-            ]
+            info = self.prober.probe(file_path, BACKGROUND_PROCESSES)
             
-            result = subprocess.run(cmd, capture_output=True, text=True, 
-                                  creationflags=subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0)
-            
-            if result.returncode == 0:
-                import json
-                info = json.loads(result.stdout)
-                
+            if info is not None:
                 # Extrair informações relevantes
                 format_info = info.get('format', {})
                 streams = info.get('streams', [])
@@ -729,8 +920,8 @@ Verifique se o FFmpeg está instalado no seu sistema.
                 duration = float(format_info.get('duration', 0))
                 size = int(format_info.get('size', 0))
                 
-                ttk.Label(general_frame, text=f"📁 Tamanho: {self.format_file_size(size)}").pack(anchor=tk.W)
-                ttk.Label(general_frame, text=f"⏱️ Duração: {self.format_duration(duration)}").pack(anchor=tk.W)
+                ttk.Label(general_frame, text=f"📁 Tamanho: {format_file_size(size)}").pack(anchor=tk.W)
+                ttk.Label(general_frame, text=f"⏱️ Duração: {format_duration(duration)}").pack(anchor=tk.W)
                 ttk.Label(general_frame, text=f"🎬 Formato: {format_info.get('format_name', 'N/A')}").pack(anchor=tk.W)
                 
                 # Informações de vídeo
@@ -762,30 +953,6 @@ Verifique se o FFmpeg está instalado no seu sistema.
         except Exception as e:
             self.log_message(f"⚠️ Erro ao obter informações do vídeo: {e}")
     
-    def format_file_size(self, size_bytes):
-        """Formata tamanho de arquivo em bytes para formato legível"""
-        if size_bytes == 0:
-            return "0 B"
-        
-        size_names = ["B", "KB", "MB", "GB", "TB"]
-        i = 0
-        while size_bytes >= 1024 and i < len(size_names) - 1:
-            size_bytes /= 1024.0
-            i += 1
-        
-        return f"{size_bytes:.1f} {size_names[i]}"
-    
-    def format_duration(self, seconds):
-        """Formata duração em segundos para formato legível"""
-        if seconds == 0:
-            return "00:00:00"
-        
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        secs = int(seconds % 60)
-        
-        return f"{hours:02d}:{minutes:02d}:{secs:02d}"
-    
     def browse_output_file(self):
         """Abre diálogo para selecionar arquivo de saída"""
         filename = filedialog.asksaveasfilename(
@@ -804,30 +971,84 @@ Verifique se o FFmpeg está instalado no seu sistema.
             title="Selecionar arquivos de vídeo",
             filetypes=self.supported_formats
         )
-        for filename in filenames:
-            if filename not in self.input_files:
-                self.input_files.append(filename)
-                self.batch_listbox.insert(tk.END, Path(filename).name)
+        self.add_batch_files(filenames)
         self.log_message(f"📁 Adicionados {len(filenames)} arquivos")
     
     def browse_batch_folder(self):
         """Abre diálogo para selecionar pasta com arquivos"""
         folder = filedialog.askdirectory(title="Selecionar pasta com vídeos")
         if folder:
-            folder_path = Path(folder)
-            video_extensions = ['.mpg', '.mpeg', '.avi', '.mkv', '.wmv', '.flv', '.webm']
-            video_files = []
-            
-            for ext in video_extensions:
-                video_files.extend(folder_path.glob(f"*{ext}"))
-                video_files.extend(folder_path.glob(f"*{ext.upper()}"))
-            
-            for video_file in video_files:
-                if str(video_file) not in self.input_files:
-                    self.input_files.append(str(video_file))
-                    self.batch_listbox.insert(tk.END, video_file.name)
-            
-            self.log_message(f"📁 Adicionados {len(video_files)} arquivos da pasta")
+            self.log_message(f"🔍 Procurando vídeos em {Path(folder).name} (incluindo subpastas)...")
+            counter = {'added': 0}
+            threading.Thread(target=self.scan_batch_folder,
+                             args=(folder, self.scan_generation, counter), daemon=True).start()
+    
+    def scan_batch_folder(self, folder, generation, counter):
+        """Percorre a pasta em segundo plano, enviando os vídeos à lista em lotes"""
+        chunk = []
+        try:
+            for file_path in iter_video_files(folder):
+                if generation != self.scan_generation:
+                    return  # Lista limpa durante a busca
+                chunk.append(file_path)
+                if len(chunk) >= self.scan_chunk:
+                    self.window.after(0, self.add_scanned_files, chunk, generation, counter)
+                    chunk = []
+        except Exception as e:
+            self.log_message(f"❌ Erro ao procurar vídeos: {e}")
+        self.window.after(0, self.add_scanned_files, chunk, generation, counter, True)
+    
+    def add_scanned_files(self, file_paths, generation, counter, finished=False):
+        """Acrescenta um lote da busca à lista (thread principal)"""
+        if generation != self.scan_generation:
+            return
+        counter['added'] += self.add_batch_files(file_paths)
+        if finished:
+            self.log_message(f"📁 Adicionados {counter['added']} arquivos da pasta")
+    
+    def add_batch_files(self, file_paths):
+        """Adiciona arquivos à lista do lote e agenda o ffprobe em segundo plano"""
+        added_count = 0
+        for file_path in file_paths:
+            if self.batch_table.add(file_path) is None:
+                continue
+            self.background_prober.submit(file_path, self.on_probe_result)
+            added_count += 1
+        if added_count:
+            # Sem filtro nem ordenação a visão é um range: recalcular não custa nada
+            if isinstance(self.batch_view, range):
+                self.refresh_batch_view()
+            else:
+                self.batch_view_stale = True
+        return added_count
+    
+    def on_probe_result(self, file_path, info):
+        """Chamado pelo pool do ffprobe; repassa o resultado para a thread principal"""
+        self.probe_queue.put((file_path, info))
+    
+    def monitor_probe_results(self):
+        """Preenche as colunas do lote com os resultados do ffprobe"""
+        settings = None
+        try:
+            while True:
+                file_path, info = self.probe_queue.get_nowait()
+                row = self.batch_table.row(file_path)
+                if row is None:
+                    continue  # Removido da lista enquanto o probe rodava
+                if info is None:
+                    self.batch_table.set_probe(row, None, None, None)
+                else:
+                    settings = settings or self.get_conversion_settings()
+                    video_stream = next((s for s in info.get('streams', [])
+                                         if s.get('codec_type') == 'video'), {})
+                    self.batch_table.set_probe(row, get_duration(info),
+                                               video_stream.get('codec_name'),
+                                               self.engine.estimate_size(info, settings))
+                self.touch_batch_rows(('duration', 'codec', 'size'))
+        except queue.Empty:
+            pass
+        finally:
+            self.window.after(200, self.monitor_probe_results)
     
     def browse_output_directory(self):
         """Abre diálogo para selecionar pasta de saída"""
@@ -838,10 +1059,161 @@ Verifique se o FFmpeg está instalado no seu sistema.
     
     def clear_batch_list(self):
         """Limpa a lista de arquivos em lote"""
-        self.input_files.clear()
-        self.batch_listbox.delete(0, tk.END)
+        self.batch_table.clear()
+        self.scan_generation += 1
+        self.batch_top = 0
+        self.batch_selected_row = None
+        self.refresh_batch_view()
+        self.preview_path = None
+        self.show_thumbnail_strip(None, None)
         self.log_message("🗑️ Lista de arquivos limpa")
     
+    def refresh_batch_view(self):
+        """Recalcula as linhas exibidas (filtro e ordenação) e redesenha a lista"""
+        status_label = self.batch_status_var.get()
+        status = next((code for code, label in JOB_STATUS_LABELS.items()
+                       if label == status_label), None)
+        self.batch_view = self.batch_table.view(self.batch_filter_var.get().strip(), status,
+                                                self.batch_sort, self.batch_sort_reverse)
+        self.batch_view_stale = False
+        self.batch_view_time = time.monotonic()
+        self.render_batch_view()
+    
+    def render_batch_view(self):
+        """Preenche os itens do Treeview com as linhas a partir de batch_top"""
+        self.batch_render_pending = False
+        total = len(self.batch_view)
+        visible = len(self.batch_slots)
+        self.batch_top = max(0, min(self.batch_top, total - visible))
+        self.batch_slot_rows = list(self.batch_view[self.batch_top:self.batch_top + visible])
+        
+        selected = ()
+        for slot, row in zip(self.batch_slots, self.batch_slot_rows):
+            self.batch_tree.item(slot, values=self.batch_row_values(row))
+            if row == self.batch_selected_row:
+                selected = (slot,)
+        for slot in self.batch_slots[len(self.batch_slot_rows):]:
+            self.batch_tree.item(slot, values=())
+        if self.batch_tree.selection() != selected:
+            self.batch_tree.selection_set(selected)
+        
+        if total:
+            self.batch_scrollbar.set(self.batch_top / total,
+                                     min(1.0, (self.batch_top + visible) / total))
+        else:
+            self.batch_scrollbar.set(0.0, 1.0)
+    
+    def batch_row_values(self, row):
+        """Valores de uma linha da lista do lote"""
+        table = self.batch_table
+        status = table.status[row]
+        if table.probed[row]:
+            duration = table.duration[row]
+            duration_text = format_duration(duration) if duration >= 0 else "N/A"
+            codec = table.codec_name(row) or "N/A"
+        else:
+            duration_text = codec = "…"
+        
+        if status == JOB_RUNNING:
+            progress = f"{table.progress[row]:.0f}% ({table.speed[row]:.1f}x)"
+        elif status == JOB_DONE:
+            progress = "100%"
+        else:
+            progress = ""
+        
+        # Tamanho real depois da conversão; antes, a estimativa
+        if table.output_size[row] >= 0:
+            size = format_file_size(table.output_size[row])
+        elif table.estimated_size[row] >= 0:
+            size = f"≈ {format_file_size(table.estimated_size[row])}"
+        else:
+            size = "N/A" if table.probed[row] else "…"
+        return (table.name(row), JOB_STATUS_LABELS[status], duration_text, codec, progress, size)
+    
+    def touch_batch_rows(self, keys):
+        """Agenda o redesenho; refiltra/reordena se keys afetam a visão atual"""
+        self.batch_render_pending = True
+        if self.batch_sort in keys or ('status' in keys and self.batch_status_var.get() != "Todos"):
+            self.batch_view_stale = True
+    
+    def monitor_batch_view(self):
+        """Redesenha a lista do lote quando os dados mudam (reordena no máximo 1x por segundo)"""
+        try:
+            if self.batch_view_stale and time.monotonic() - self.batch_view_time >= 1.0:
+                self.refresh_batch_view()
+            elif self.batch_render_pending:
+                self.render_batch_view()
+        except Exception as e:
+            self.report_monitor_error("lista do lote", e)
+        finally:
+            self.window.after(200, self.monitor_batch_view)
+    
+    def sort_batch_view(self, key):
+        """Ordena pela coluna clicada; um segundo clique inverte a ordem"""
+        if self.batch_sort == key:
+            self.batch_sort_reverse = not self.batch_sort_reverse
+        else:
+            self.batch_sort = key
+            self.batch_sort_reverse = False
+        for col, column_key in self.batch_columns:
+            arrow = (" ▼" if self.batch_sort_reverse else " ▲") if column_key == key else ""
+            self.batch_tree.heading(col, text=col + arrow)
+        self.refresh_batch_view()
+    
+    def scroll_batch_view(self, action, value, unit=None):
+        """Comando da barra de rolagem: ('moveto', fração) ou ('scroll', n, 'units'/'pages')"""
+        if action == 'moveto':
+            self.batch_top = int(float(value) * len(self.batch_view))
+        elif unit == 'pages':
+            self.batch_top += int(value) * max(1, len(self.batch_slots) - 1)
+        else:
+            self.batch_top += int(value)
+        self.render_batch_view()
+    
+    def on_batch_wheel(self, event):
+        """Roda do mouse (MouseWheel no Windows/macOS, botões 4 e 5 no X11)"""
+        if event.num == 4 or (event.num != 5 and event.delta > 0):
+            self.scroll_batch_view('scroll', -3)
+        else:
+            self.scroll_batch_view('scroll', 3)
+        return "break"
+    
+    def move_batch_selection(self, delta):
+        """Setas e Page Up/Down percorrem a lista inteira, rolando quando preciso"""
+        if not self.batch_view:
+            return "break"
+        if self.batch_selected_row in self.batch_slot_rows:
+            position = self.batch_top + self.batch_slot_rows.index(self.batch_selected_row) + delta
+        else:
+            position = self.batch_top
+        position = max(0, min(position, len(self.batch_view) - 1))
+        visible = len(self.batch_slots)
+        if position < self.batch_top:
+            self.batch_top = position
+        elif position >= self.batch_top + visible:
+            self.batch_top = position - visible + 1
+        self.select_batch_row(self.batch_view[position])
+        self.render_batch_view()
+        return "break"
+    
+    def on_batch_tree_resize(self, event):
+        """Ajusta o número de itens do Treeview à altura disponível"""
+        bbox = self.batch_tree.bbox(self.batch_slots[0]) if self.batch_slots else ''
+        if not bbox:
+            return
+        _, top, _, row_height = bbox
+        self.resize_batch_slots(max(1, (event.height - top) // row_height))
+    
+    def resize_batch_slots(self, count):
+        """Cria ou remove itens do Treeview até haver count linhas visíveis"""
+        if count == len(self.batch_slots):
+            return
+        while len(self.batch_slots) < count:
+            self.batch_slots.append(self.batch_tree.insert('', 'end', iid=f"slot{len(self.batch_slots)}"))
+        while len(self.batch_slots) > count:
+            self.batch_tree.delete(self.batch_slots.pop())
+        self.render_batch_view()
+    
     def show_advanced_settings(self):
         """Mostra janela de configurações avançadas"""
         advanced_window = tk.Toplevel(self.window)
@@ -913,13 +1285,9 @@ Verifique se o FFmpeg está instalado no seu sistema.
     
     def check_ffmpeg_installation(self):
         """Verifica se o FFmpeg está instalado"""
-        try:
-            subprocess.run(['ffmpeg', '-version'], 
-                         stdout=subprocess.DEVNULL, 
-                         stderr=subprocess.DEVNULL, 
-                         check=True)
+        if self.engine.check_ffmpeg():
             self.log_message("✅ FFmpeg detectado com sucesso!")
-        except (subprocess.CalledProcessError, FileNotFoundError):
+        else:
             self.log_message("❌ FFmpeg não encontrado!")
             messagebox.showerror("Erro", 
                                "FFmpeg não está instalado!\n\n" +
@@ -929,19 +1297,38 @@ Verifique se o FFmpeg está instalado no seu sistema.
                                "• Linux: sudo apt install ffmpeg")
     
     def log_message(self, message):
-        """Adiciona mensagem ao log"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        self.log_text.configure(state=tk.NORMAL)
-        self.log_text.insert(tk.END, f"[{timestamp}] {message}\n")
-        self.log_text.configure(state=tk.DISABLED)
-        self.log_text.see(tk.END)
-        self.window.update_idletasks()
+        """Adiciona mensagem ao log (seguro em qualquer thread; exibida por monitor_log)"""
+        self.log_queue.put(message)
+    
+    def monitor_log(self):
+        """Exibe em lote as mensagens enfileiradas, mantendo só as últimas linhas"""
+        try:
+            lines = self.log_queue.drain()
+            if lines:
+                lines = lines[-self.log_max_lines:]
+                self.log_text.configure(state=tk.NORMAL)
+                self.log_text.insert(tk.END, "\n".join(lines) + "\n")
+                line_count = int(self.log_text.index('end-1c').split('.')[0]) - 1
+                if line_count > self.log_max_lines:
+                    self.log_text.delete('1.0', f'{line_count - self.log_max_lines + 1}.0')
+                self.log_text.configure(state=tk.DISABLED)
+                self.log_text.see(tk.END)
+        except Exception as e:
+            self.report_monitor_error("log", e)
+        finally:
+            self.window.after(100, self.monitor_log)
     
     def start_conversion(self):
         """Inicia a conversão"""
         if self.converting:
             return
-            
+
+        try:
+            parse_bitrates(self.video_bitrate_var.get())
+        except ValueError as e:
+            messagebox.showerror("Erro", f"Taxa ABR inválida: {e}")
+            return
+
         if self.batch_mode.get():
             self.start_batch_conversion()
         else:
@@ -969,6 +1356,10 @@ Verifique se o FFmpeg está instalado no seu sistema.
                 return
         
         # Iniciar conversão
+        self.engine.settings = self.get_conversion_settings()
+        self.engine.output_cache = self.get_output_cache()
+        self.engine.reset_cancel()
+        self.progress_board.reset()
         self.converting = True
         self.convert_button.configure(text="⏸️ Convertendo...", state="disabled")
         self.progress_var.set(0)
@@ -980,7 +1371,7 @@ Verifique se o FFmpeg está instalado no seu sistema.
     
     def start_batch_conversion(self):
         """Inicia conversão em lote"""
-        if not self.input_files:
+        if not self.batch_table:
             messagebox.showerror("Erro", "Adicione arquivos para conversão em lote!")
             return
             
@@ -990,15 +1381,28 @@ Verifique se o FFmpeg está instalado no seu sistema.
         
         # Confirmar conversão em lote
         if not messagebox.askyesno("Confirmar", 
-                                 f"Converter {len(self.input_files)} arquivos?\n\n" +
+                                 f"Converter {len(self.batch_table)} arquivos?\n\n" +
                                  f"Pasta de saída: {self.output_directory.get()}"):
             return
         
-        # Iniciar conversão em lote
+        # Iniciar conversão em lote (o paralelismo já vem dos arquivos simultâneos)
+        self.engine.settings = self.get_conversion_settings()
+        self.engine.settings.segments = 0
+        self.engine.output_cache = self.get_output_cache()
+        self.engine.reset_cancel()
+        self.batch_converter = BatchConverter(
+            self.engine,
+            max_jobs=self.get_max_jobs(),
+            on_job_done=self.on_batch_job_done,
+            policy=self.batch_policy_var.get(),
+            journal=self.get_batch_journal(),
+            progress=self.progress_board)
         self.converting = True
         self.convert_button.configure(text="⏸️ Convertendo...", state="disabled")
         self.progress_var.set(0)
         self.status_var.set("Iniciando conversão em lote...")
+        self.batch_table.reset_status(JOB_QUEUED)
+        self.touch_batch_rows(('status', 'progress', 'size'))
         
         thread = threading.Thread(target=self.convert_batch_videos)
         thread.daemon = True
@@ -1021,236 +1425,153 @@ Verifique se o FFmpeg está instalado no seu sistema.
             
             if success:
                 self.window.after(0, self.conversion_success, output_path)
+            elif self.engine.cancelled:
+                self.window.after(0, self.conversion_cancelled)
             else:
                 self.window.after(0, self.conversion_error, "Erro na conversão")
                 
         except Exception as e:
             self.window.after(0, self.conversion_error, str(e))
+        finally:
+            self.engine.reset_cancel()
+    
+    def get_conversion_settings(self):
+        """Lê as variáveis do Tkinter (na thread principal) para o motor"""
+        return ConversionSettings(
+            quality=self.quality.get(),
+            preset=self.preset_var.get(),
+            maxrate=self.maxrate_var.get(),
+            bufsize=self.bufsize_var.get(),
+            audio_codec=self.audio_codec_var.get(),
+            audio_bitrate=self.audio_bitrate_var.get(),
+            preserve_audio=self.preserve_audio.get(),
+            stream_copy=self.stream_copy_var.get(),
+            segments=self.get_int_var(self.segments_var, 0),
+            target_mb_per_min=self.get_float_var(self.target_mb_var, 0.0),
+            target_ssim=min(self.get_float_var(self.target_ssim_var, 0.0), 1.0),
+            video_bitrate=self.video_bitrate_var.get().strip())
+    
+    def get_int_var(self, variable, default):
+        """Valor inteiro de um Spinbox, ou default se o texto for inválido"""
+        try:
+            return int(variable.get())
+        except (tk.TclError, ValueError):
+            return default
+    
+    def get_float_var(self, variable, default):
+        """Valor decimal (>= 0) de um campo, aceitando vírgula; default se inválido"""
+        try:
+            return max(0.0, float(variable.get().replace(',', '.')))
+        except (tk.TclError, ValueError):
+            return default
+    
+    def get_output_cache(self):
+        """Cache de conversões, se habilitado nas configurações"""
+        if not self.output_cache_var.get():
+            return None
+        if self.output_cache is None:
+            self.output_cache = ConversionCache(default_cache_dir() / "outputs")
+        return self.output_cache
+    
+    def get_batch_journal(self):
+        """Diário do lote na pasta de saída, ou None para reconverter tudo"""
+        if not self.resume_batch_var.get():
+            return None
+        return BatchJournal(Path(self.output_directory.get()) / JOURNAL_NAME)
+    
+    def get_max_jobs(self):
+        """Número de conversões simultâneas configurado"""
+        return max(1, self.get_int_var(self.max_jobs_var, default_max_jobs(self.cpu_count)))
     
     def convert_batch_videos(self):
         """Executa a conversão em lote"""
         try:
-            total_files = len(self.input_files)
-            successful = 0
-            failed = 0
+            input_files = list(self.batch_table.paths)
+            self.batch_inputs = input_files
+            self.batch_total = len(input_files)
+            self.batch_finished = 0
             
-            self.log_message("=" * 50)
-            self.log_message(f"🎬 Iniciando conversão em lote: {total_files} arquivos")
-            self.log_message("=" * 50)
+            successful, failed = self.batch_converter.run(input_files, self.output_directory.get())
             
-            for i, input_path in enumerate(self.input_files):
-                if not self.converting:  # Verificar se foi cancelado
-                    break
-                    
-                input_file = Path(input_path)
-                output_file = Path(self.output_directory.get()) / f"{input_file.stem}.mov"
-                
-                self.window.after(0, lambda p=i+1, t=total_files: 
-                                self.status_var.set(f"Convertendo {p}/{t}: {input_file.name}"))
-                
-                self.log_message(f"📁 [{i+1}/{total_files}] Convertendo: {input_file.name}")
-                
-                success = self.run_ffmpeg_conversion(input_path, str(output_file))
-                
-                if success:
-                    successful += 1
-                    self.log_message(f"✅ [{i+1}/{total_files}] Sucesso: {input_file.name}")
-                else:
-                    failed += 1
-                    self.log_message(f"❌ [{i+1}/{total_files}] Falha: {input_file.name}")
-                
-                # Atualizar progresso
-                progress = ((i + 1) / total_files) * 100
-                self.window.after(0, lambda p=progress: self.progress_var.set(p))
-            
-            self.window.after(0, self.batch_conversion_finished, successful, failed)
+            if self.engine.cancelled:
+                self.window.after(0, self.conversion_cancelled)
+            else:
+                self.window.after(0, self.batch_conversion_finished, successful, failed)
             
         except Exception as e:
             self.window.after(0, self.conversion_error, str(e))
+        finally:
+            self.engine.reset_cancel()
     
-    def run_ffmpeg_conversion(self, input_path, output_path):
-        """Executa a conversão com FFmpeg"""
-        try:
-            # Validar arquivo de entrada
-            if not self.validate_input_file(input_path):
-                return False
-            
-            # Verificar espaço em disco
-            if not self.check_disk_space(input_path, output_path):
-                return False
-            
-            # Parâmetros do FFmpeg baseados na qualidade
-            crf_values = {'high': '18', 'medium': '23', 'low': '28'}
-            
-            cmd = [
-                'ffmpeg',
-                '-i', input_path,
-                '-y',  # Sobrescrever arquivo existente
-                '-c:v', 'libx264',
-                '-preset', self.preset_var.get(),
-                '-crf', crf_values[self.quality.get()],
-                '-c:a', self.audio_codec_var.get() if self.preserve_audio.get() else 'an',
-                '-b:a', self.audio_bitrate_var.get() if self.preserve_audio.get() else '0',
-                '-movflags', '+faststart',
-                '-pix_fmt', 'yuv420p',
-                '-profile:v', 'high',
-                '-level', '4.1',
-                '-maxrate', self.maxrate_var.get(),
-                '-bufsize', self.bufsize_var.get(),
-                output_path
-            ]
-            
-            self.log_message(f"🔧 Comando FFmpeg: {' '.join(cmd)}")
-            
-            # Executar FFmpeg
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                universal_newlines=True,
-                creationflags=subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0
-            )
-            
-            # Monitorar progresso
-            self.monitor_ffmpeg_progress(process)
-            
-            stdout, stderr = process.communicate()
-            
-            if process.returncode != 0:
-                self.log_message(f"❌ Erro no FFmpeg: {stderr}")
-                return False
-            
-            # Verificar se o arquivo de saída foi criado
-            if not Path(output_path).exists():
-                self.log_message("❌ Arquivo de saída não foi criado")
-                return False
-            
-            # Verificar tamanho do arquivo de saída
-            output_size = Path(output_path).stat().st_size
-            if output_size == 0:
-                self.log_message("❌ Arquivo de saída está vazio")
-                return False
-            
-            self.log_message(f"✅ Conversão concluída. Tamanho: {self.format_file_size(output_size)}")
-            return True
-            
-        except Exception as e:
-            self.log_message(f"❌ Erro na conversão: {e}")
-            return False
-    
-    def validate_input_file(self, file_path):
-        """Valida o arquivo de entrada"""
-        try:
-            path = Path(file_path)
-            
-            # Verificar se o arquivo existe
-            if not path.exists():
-                self.log_message(f"❌ Arquivo não encontrado: {path.name}")
-                return False
-            
-            # Verificar se é um arquivo (não pasta)
-            if not path.is_file():
-                self.log_message(f"❌ Não é um arquivo válido: {path.name}")
-                return False
-            
-            # Verificar se o arquivo não está vazio
-            if path.stat().st_size == 0:
-                self.log_message(f"❌ Arquivo está vazio: {path.name}")
-                return False
-            
-            # Verificar se é um formato de vídeo suportado
-            video_extensions = ['.mpg', '.mpeg', '.avi', '.mkv', '.wmv', '.flv', '.webm']
-            if path.suffix.lower() not in video_extensions:
-                self.log_message(f"❌ Formato não suportado: {path.suffix}")
-                return False
-            
-            # Verificar se o arquivo pode ser lido
+    def on_batch_job_done(self, job_id, input_path, output_path, success):
+        """Chamado pela thread de trabalho ao terminar um arquivo do lote"""
+        output_size = None
+        if success:
             try:
-                with open(path, 'rb') as f:
-                    f.read(1024)  # Tentar ler os primeiros bytes
-            except PermissionError:
-                self.log_message(f"❌ Sem permissão para ler: {path.name}")
-                return False
-            except Exception as e:
-                self.log_message(f"❌ Erro ao ler arquivo: {e}")
-                return False
-            
-            return True
-            
-        except Exception as e:
-            self.log_message(f"❌ Erro na validação: {e}")
-            return False
+                output_size = os.path.getsize(output_path)
+            except OSError:
+                pass
+        self.window.after(0, self.update_batch_status, input_path, success, output_size)
     
-    def check_disk_space(self, input_path, output_path):
-        """Verifica se há espaço suficiente em disco"""
-        try:
-            import shutil
-            
-            # Obter tamanho do arquivo de entrada
-            input_size = Path(input_path).stat().st_size
-            
-            # Estimar tamanho do arquivo de saída (geralmente menor que o original)
-            estimated_output_size = input_size * 0.8  # Estimativa conservadora
-            
-            # Obter espaço livre no disco de destino
-            output_drive = Path(output_path).drive
-            free_space = shutil.disk_usage(output_drive).free
-            
-            # Verificar se há espaço suficiente (com margem de segurança)
-            required_space = estimated_output_size * 1.5  # 50% de margem
-            
-            if free_space < required_space:
-                self.log_message(f"❌ Espaço insuficiente em disco")
-                self.log_message(f"   Espaço livre: {self.format_file_size(free_space)}")
-                self.log_message(f"   Espaço necessário: {self.format_file_size(required_space)}")
-                return False
-            
-            return True
-            
-        except Exception as e:
-            self.log_message(f"⚠️ Erro ao verificar espaço em disco: {e}")
-            return True  # Continuar mesmo com erro na verificação
+    def update_batch_status(self, input_path, success, output_size=None):
+        """Atualiza o status do lote e a linha do arquivo (thread principal)"""
+        self.refresh_history()
+        row = self.batch_table.row(input_path)
+        if row is not None:
+            if success:
+                status = JOB_DONE
+            else:
+                status = JOB_CANCELLED if self.engine.cancelled else JOB_FAILED
+            self.batch_table.set_output(row, status, output_size)
+            self.touch_batch_rows(('status', 'progress', 'size'))
+        self.batch_finished += 1
+        eta = self.batch_converter.eta()
+        self.status_var.set(f"Convertidos {self.batch_finished}/{self.batch_total} arquivos "
+                            f"(restante estimado: {format_duration(eta)})")
     
-    def monitor_ffmpeg_progress(self, process):
-        """Monitora o progresso do FFmpeg"""
-        duration_pattern = re.compile(r"Duration: (\d{2}):(\d{2}):(\d{2})\.(\d{2})")
-        time_pattern = re.compile(r"time=(\d{2}):(\d{2}):(\d{2})\.(\d{2})")
-        
-        duration_seconds = 0
-        
-        while process.poll() is None:
-            line = process.stderr.readline()
-            if not line:
-                break
-                
-            # Extrair duração total
-            duration_match = duration_pattern.search(line)
-            if duration_match:
-                h, m, s, ms = map(int, duration_match.groups())
-                duration_seconds = h * 3600 + m * 60 + s + ms / 100
-            
-            # Extrair tempo atual
-            time_match = time_pattern.search(line)
-            if time_match and duration_seconds > 0:
-                h, m, s, ms = map(int, time_match.groups())
-                current_seconds = h * 3600 + m * 60 + s + ms / 100
-                progress = (current_seconds / duration_seconds) * 100
-                
-                # Enviar progresso para a thread principal
-                self.progress_queue.put(progress)
+    def run_ffmpeg_conversion(self, input_path, output_path):
+        """Executa a conversão com FFmpeg"""
+        self.engine.cleanup_stale_outputs(Path(output_path).parent)
+        return self.engine.convert(
+            input_path, output_path, threads=self.cpu_count,
+            on_progress=lambda event: self.progress_board.update(None, event))
     
     def monitor_progress(self):
-        """Monitora a fila de progresso"""
+        """Aplica o último estado de cada conversão alterada (custo proporcional aos jobs)"""
         try:
-            while True:
-                progress = self.progress_queue.get_nowait()
-                self.progress_var.set(progress)
-                self.status_var.set(f"Convertendo... {progress:.1f}%")
-        except queue.Empty:
-            pass
+            changes = self.progress_board.changes()
+            batch_changed = False
+            for job_id, event in changes.items():
+                if job_id is None:
+                    self.progress_var.set(event.percent)
+                    self.status_var.set(f"Convertendo... {event.percent:.1f}% "
+                                        f"({event.fps:.0f} fps, {event.speed:.2f}x)")
+                    continue
+                batch_changed = True
+                # Arquivos finalizados recebem o status em update_batch_status
+                if event.finished or job_id >= len(self.batch_inputs):
+                    continue
+                row = self.batch_table.row(self.batch_inputs[job_id])
+                if row is not None and self.batch_table.status[row] in (JOB_QUEUED, JOB_RUNNING):
+                    self.batch_table.set_status(row, JOB_RUNNING, event.percent, event.speed)
+            if batch_changed:
+                self.touch_batch_rows(('status', 'progress'))
+                # Lote: média ponderada pela duração de cada arquivo
+                self.progress_var.set(self.progress_board.overall())
+        except Exception as e:
+            self.report_monitor_error("progresso", e)
         finally:
             self.window.after(100, self.monitor_progress)
     
+    def report_monitor_error(self, where, error):
+        """Registra no log um erro de um laço periódico (uma vez enquanto se repetir)"""
+        message = f"{type(error).__name__}: {error}"
+        if self.monitor_errors.get(where) == message:
+            return
+        self.monitor_errors[where] = message
+        self.log_message(f"⚠️ Erro ao atualizar {where}: {message}")
+        self.log_queue.put_file(traceback.format_exc().rstrip())
+    
     def conversion_success(self, output_path):
         """Callback para conversão bem-sucedida"""
         self.converting = False
@@ -1261,8 +1582,8 @@ Verifique se o FFmpeg está instalado no seu sistema.
         self.log_message("✅ CONVERSÃO CONCLUÍDA COM SUCESSO!")
         self.log_message(f"📁 Arquivo salvo em: {output_path}")
         
-        # Adicionar ao histórico
-        self.add_to_history(Path(self.input_entry.get()).name, Path(output_path).name, "Sucesso")
+        # O motor já gravou a conversão no histórico
+        self.refresh_history()
         
         # Perguntar se quer abrir pasta do arquivo
         if self.auto_open_folder.get():
@@ -1294,12 +1615,21 @@ Verifique se o FFmpeg está instalado no seu sistema.
                                  "Deseja abrir a pasta de saída?"):
                 self.open_file_location(self.output_directory.get())
     
+    def conversion_cancelled(self):
+        """Callback para conversão cancelada (processos já encerrados)"""
+        self.converting = False
+        self.convert_button.configure(text="🚀 Converter Vídeo", state="normal")
+        self.progress_var.set(0)
+        self.status_var.set("Conversão cancelada")
+        self.refresh_history()
+    
     def conversion_error(self, error_msg):
         """Callback para erro na conversão"""
         self.converting = False
         self.convert_button.configure(text="🚀 Converter Vídeo", state="normal")
         self.progress_var.set(0)
         self.status_var.set("Erro na conversão ❌")
+        self.refresh_history()
         
         self.log_message("❌ ERRO NA CONVERSÃO:")
         self.log_message(error_msg)
@@ -1336,6 +1666,15 @@ Verifique se o FFmpeg está instalado no seu sistema.
                 self.preserve_audio.set(settings.get('preserve_audio', True))
                 self.auto_open_folder.set(settings.get('auto_open_folder', True))
                 self.dark_mode.set(settings.get('dark_mode', False)) # Carregar tema
+                self.max_jobs_var.set(settings.get('max_jobs', default_max_jobs(self.cpu_count)))
+                self.stream_copy_var.set(settings.get('stream_copy', True))
+                self.segments_var.set(settings.get('segments', 0))
+                self.batch_policy_var.set(settings.get('batch_policy', 'longest_first'))
+                self.output_cache_var.set(settings.get('output_cache', False))
+                self.resume_batch_var.set(settings.get('resume_batch', True))
+                self.target_mb_var.set(str(settings.get('target_mb_per_min', 0)))
+                self.target_ssim_var.set(str(settings.get('target_ssim', 0)))
+                self.video_bitrate_var.set(settings.get('video_bitrate', ''))
                 
                 self.log_message("⚙️ Configurações carregadas")
         except Exception as e:
@@ -1353,7 +1692,16 @@ Verifique se o FFmpeg está instalado no seu sistema.
                 'audio_bitrate': self.audio_bitrate_var.get(),
                 'preserve_audio': self.preserve_audio.get(),
                 'auto_open_folder': self.auto_open_folder.get(),
-                'dark_mode': self.dark_mode.get() # Salvar tema
+                'dark_mode': self.dark_mode.get(), # Salvar tema
+                'max_jobs': self.max_jobs_var.get(),
+                'stream_copy': self.stream_copy_var.get(),
+                'segments': self.get_int_var(self.segments_var, 0),
+                'batch_policy': self.batch_policy_var.get(),
+                'output_cache': self.output_cache_var.get(),
+                'resume_batch': self.resume_batch_var.get(),
+                'target_mb_per_min': self.get_float_var(self.target_mb_var, 0.0),
+                'target_ssim': self.get_float_var(self.target_ssim_var, 0.0),
+                'video_bitrate': self.video_bitrate_var.get().strip()
             }
             
             with open("converter_settings.json", 'w', encoding='utf-8') as f:
@@ -1377,89 +1725,95 @@ Verifique se o FFmpeg está instalado no seu sistema.
             self.preserve_audio.set(True)
             self.auto_open_folder.set(True)
             self.dark_mode.set(False) # Resetar tema
+            self.max_jobs_var.set(default_max_jobs(self.cpu_count))
+            self.stream_copy_var.set(True)
+            self.segments_var.set(0)
+            self.batch_policy_var.set("longest_first")
+            self.output_cache_var.set(False)
+            self.resume_batch_var.set(True)
+            self.target_mb_var.set("0")
+            self.target_ssim_var.set("0")
+            self.video_bitrate_var.set("")
             
             self.log_message(" Configurações restauradas")
     
-    def add_to_history(self, input_file, output_file, status):
-        """Adiciona entrada ao histórico"""
+    def load_history(self):
+        """Carrega a primeira página do histórico (mais recentes primeiro)"""
         try:
-            history_file = Path("conversion_history.json")
-            history = []
-            
-            if history_file.exists():
-                with open(history_file, 'r', encoding='utf-8') as f:
-                    history = json.load(f)
-            
-            entry = {
-                'date': datetime.now().isoformat(),
-                'input_file': input_file,
-                'output_file': output_file,
-                'status': status,
-                'size': self.get_file_size(output_file) if status == "Sucesso" else "N/A"
-            }
-            
-            history.append(entry)
-            
-            # Manter apenas os últimos 100 registros
-            if len(history) > 100:
-                history = history[-100:]
-            
-            with open(history_file, 'w', encoding='utf-8') as f:
-                json.dump(history, f, indent=2, ensure_ascii=False)
-            
-            self.log_message(f"📋 Adicionado ao histórico: {input_file}")
+            migrated = self.history.import_legacy()
+            if migrated:
+                self.log_message(f"📋 {migrated} entradas migradas do histórico antigo")
+            
+            # Limpar lista atual
+            for item in self.history_tree.get_children():
+                self.history_tree.delete(item)
+            self.history_exhausted = False
+            
+            self.load_history_page()
+            status = self.get_history_status_filter()
+            self.log_message(f"📋 Histórico carregado: {self.history.count(status)} entradas")
         except Exception as e:
-            self.log_message(f"⚠️ Erro ao salvar histórico: {e}")
+            self.log_message(f"⚠️ Erro ao carregar histórico: {e}")
+    
+    def get_history_status_filter(self):
+        """Status selecionado no filtro do histórico (None para todos)"""
+        status = self.history_status_var.get()
+        return None if status == "Todos" else status
     
-    def get_file_size(self, file_path):
-        """Retorna o tamanho do arquivo formatado"""
+    def history_row_values(self, entry):
+        """Valores de uma linha da tabela de histórico"""
         try:
-            size = Path(file_path).stat().st_size
-            if size < 1024:
-                return f"{size} B"
-            elif size < 1024 * 1024:
-                return f"{size / 1024:.1f} KB"
-            elif size < 1024 * 1024 * 1024:
-                return f"{size / (1024 * 1024):.1f} MB"
-            else:
-                return f"{size / (1024 * 1024 * 1024):.1f} GB"
-        except:
-            return "N/A"
+            date = datetime.fromisoformat(entry['date']).strftime("%d/%m/%Y %H:%M")
+        except ValueError:
+            date = entry['date']
+        size = entry['size']
+        speed = entry.get('speed')
+        return (date,
+                Path(entry['input_file']).name,
+                Path(entry['output_file']).name,
+                entry['status'],
+                format_file_size(size) if size else "N/A",
+                f"{speed:.2f}x" if speed else "N/A")
     
-    def load_history(self):
-        """Carrega o histórico de conversões"""
+    def load_history_page(self):
+        """Acrescenta a próxima página de entradas mais antigas ao fim da lista"""
+        if self.history_exhausted:
+            return
+        children = self.history_tree.get_children()
+        before_id = int(children[-1]) if children else None
+        entries = self.history.query(before_id=before_id,
+                                     status=self.get_history_status_filter())
+        if len(entries) < HISTORY_PAGE_SIZE:
+            self.history_exhausted = True
+        for entry in entries:
+            self.history_tree.insert('', 'end', iid=str(entry['id']),
+                                     values=self.history_row_values(entry))
+    
+    def refresh_history(self):
+        """Insere no topo as entradas gravadas depois da mais recente exibida"""
         try:
-            history_file = Path("conversion_history.json")
-            if history_file.exists():
-                with open(history_file, 'r', encoding='utf-8') as f:
-                    history = json.load(f)
-                
-                # Limpar lista atual
-                for item in self.history_tree.get_children():
-                    self.history_tree.delete(item)
-                
-                # Adicionar entradas do histórico
-                for entry in reversed(history):  # Mais recentes primeiro
-                    date = datetime.fromisoformat(entry['date']).strftime("%d/%m/%Y %H:%M")
-                    self.history_tree.insert('', 'end', values=(
-                        date,
-                        entry['input_file'],
-                        entry['output_file'],
-                        entry['status'],
-                        entry['size']
-                    ))
-                
-                self.log_message(f"📋 Histórico carregado: {len(history)} entradas")
+            children = self.history_tree.get_children()
+            after_id = int(children[0]) if children else 0
+            entries = self.history.query(after_id=after_id,
+                                         status=self.get_history_status_filter())
+            for entry in reversed(entries):
+                self.history_tree.insert('', 0, iid=str(entry['id']),
+                                         values=self.history_row_values(entry))
         except Exception as e:
-            self.log_message(f"⚠️ Erro ao carregar histórico: {e}")
+            self.log_message(f"⚠️ Erro ao atualizar histórico: {e}")
+    
+    def on_history_scroll(self, first, last):
+        """Atualiza a barra de rolagem e carrega mais entradas ao chegar no fim"""
+        self.history_scrollbar.set(first, last)
+        if float(last) >= 0.98 and not self.history_exhausted:
+            self.window.after_idle(self.load_history_page)
     
     def clear_history(self):
         """Limpa o histórico de conversões"""
         if messagebox.askyesno("Confirmar", "Limpar todo o histórico de conversões?"):
             try:
-                history_file = Path("conversion_history.json")
-                if history_file.exists():
-                    history_file.unlink()
+                self.history.clear()
+                self.history_exhausted = True
                 
                 # Limpar lista
                 for item in self.history_tree.get_children():
@@ -1471,10 +1825,25 @@ Verifique se o FFmpeg está instalado no seu sistema.
                 self.log_message(f"❌ Erro ao limpar histórico: {e}")
                 messagebox.showerror("Erro", f"Erro ao limpar histórico:\n{e}")
     
+    def export_history(self):
+        """Exporta o histórico com as métricas de cada conversão (CSV ou JSON Lines)"""
+        export_file = filedialog.asksaveasfilename(
+            title="Exportar histórico",
+            defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl")])
+        if not export_file:
+            return
+        try:
+            count = self.history.export(export_file, status=self.get_history_status_filter())
+            self.log_message(f"📤 {count} entradas do histórico exportadas para {export_file}")
+        except Exception as e:
+            self.log_message(f"❌ Erro ao exportar histórico: {e}")
+            messagebox.showerror("Erro", f"Erro ao exportar histórico:\n{e}")
+    
     def open_history_folder(self):
         """Abre a pasta onde está o arquivo de histórico"""
         try:
-            history_file = Path("conversion_history.json")
+            history_file = self.history.db_path
             if history_file.exists():
                 self.open_file_location(str(history_file))
             else:
@@ -1485,6 +1854,8 @@ Verifique se o FFmpeg está instalado no seu sistema.
     def run(self):
         """Executa a aplicação"""
         self.window.mainloop()
+        self.thumbnail_cache.shutdown()
+        self.log_queue.close()
     
     def on_drop_single_file(self, event):
         """Manipula o drop de um arquivo único"""
@@ -1514,6 +1885,7 @@ Verifique se o FFmpeg está instalado no seu sistema.
                     self.output_entry.delete(0, tk.END)
                     self.output_entry.insert(0, str(suggested_output))
                 
+                self.show_preview(file_path)
                 self.log_message(f"📁 Arquivo arrastado: {file_name}")
             else:
                 self.log_message(f"❌ Arquivo não suportado: {Path(file_path).name}")
@@ -1549,20 +1921,19 @@ Verifique se o FFmpeg está instalado no seu sistema.
                 # Em outros sistemas, separados por espaço
                 files = files_data.split()
             
-            added_count = 0
+            valid_files = []
             for file_path in files:
                 if self.is_valid_video_file(file_path):
-                    if file_path not in self.input_files:
-                        self.input_files.append(file_path)
-                        self.batch_listbox.insert(tk.END, Path(file_path).name)
-                        added_count += 1
+                    valid_files.append(file_path)
                 else:
                     self.log_message(f"❌ Arquivo ignorado (não suportado): {Path(file_path).name}")
             
+            added_count = self.add_batch_files(valid_files)
+            
             if added_count > 0:
                 self.log_message(f"📁 Adicionados {added_count} arquivos via drag & drop")
                 # Atualizar visual da área de drop
-                self.drop_batch_label.configure(text=f"📁 {len(self.input_files)} arquivos carregados", 
+                self.drop_batch_label.configure(text=f"📁 {len(self.batch_table)} arquivos carregados", 
                                               foreground='green')
             else:
                 self.log_message("❌ Nenhum arquivo válido encontrado")
@@ -1578,8 +1949,7 @@ Verifique se o FFmpeg está instalado no seu sistema.
                 return False
             
             # Verificar extensão
-            video_extensions = ['.mpg', '.mpeg', '.avi', '.mkv', '.wmv', '.flv', '.webm']
-            return file_path.suffix.lower() in video_extensions
+            return is_video_file(file_path)
         except:
             return False
 
@@ -0,0 +1,55 @@
+import os
+import subprocess
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from conversor.atomic import STALE_AGE, TEMP_PREFIX, cleanup_stale_temp
+
+
+def dead_pid():
+    """PID de um processo que já terminou"""
+    process = subprocess.Popen(['true'])
+    process.wait()
+    return process.pid
+
+
+class CleanupStaleTempTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.dir.name)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def temp(self, owner, age=0):
+        path = self.root / f"{TEMP_PREFIX}{owner}-abcd1234-a.mov"
+        path.write_bytes(b'parcial')
+        old = time.time() - age
+        os.utime(path, (old, old))
+        return path
+
+    def test_old_temp_of_live_process_is_kept(self):
+        path = self.temp(os.getpid(), age=STALE_AGE * 2)
+        self.assertEqual(cleanup_stale_temp(self.root), 0)
+        self.assertTrue(path.exists())
+
+    @unittest.skipIf(os.name == 'nt', "PID verificado só em POSIX")
+    def test_temp_of_dead_process_is_removed(self):
+        path = self.temp(dead_pid())
+        self.assertEqual(cleanup_stale_temp(self.root), 1)
+        self.assertFalse(path.exists())
+
+    def test_unknown_owner_is_decided_by_age(self):
+        recent = self.temp('x')
+        old = self.root / f"{TEMP_PREFIX}y-abcd1234-b.mov"
+        old.write_bytes(b'parcial')
+        os.utime(old, (time.time() - STALE_AGE * 2,) * 2)
+        self.assertEqual(cleanup_stale_temp(self.root), 1)
+        self.assertTrue(recent.exists())
+        self.assertFalse(old.exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import csv
+import tempfile
+import unittest
+from pathlib import Path
+
+from conversor.benchmark import _METRIC_PATTERNS, compare, write_csv
+
+
+def result(preset, fps, success=True, **extra):
+    return dict(container='mp4', preset=preset, quality='medium', threads=4,
+                success=success, avg_fps=fps, **extra)
+
+
+class CompareTest(unittest.TestCase):
+    def test_regressions_beyond_the_tolerance(self):
+        baseline = [result('fast', 100.0), result('slow', 40.0), result('medium', 60.0)]
+        current = [result('fast', 85.0), result('slow', 38.0), result('medium', 0.0, success=False),
+                   result('veryslow', 5.0)]
+        regressions = compare(current, baseline, tolerance=0.10)
+        self.assertEqual(regressions, [
+            (('mp4', 'fast', 'medium', 4), 100.0, 85.0),
+            (('mp4', 'medium', 'medium', 4), 60.0, 0.0),
+        ])
+
+    def test_failed_baseline_is_ignored(self):
+        self.assertEqual(compare([result('fast', 1.0)], [result('fast', 100.0, success=False)]), [])
+
+
+class WriteCsvTest(unittest.TestCase):
+    def test_columns_are_the_union_of_all_results(self):
+        with tempfile.TemporaryDirectory() as directory:
+            csv_file = Path(directory) / 'bench.csv'
+            write_csv([result('fast', 10.0), result('slow', 5.0, ssim=0.98)], csv_file)
+            with open(csv_file, encoding='utf-8', newline='') as f:
+                rows = list(csv.DictReader(f))
+        self.assertEqual(rows[0]['ssim'], '')
+        self.assertEqual(rows[1]['ssim'], '0.98')
+
+
+class MetricPatternsTest(unittest.TestCase):
+    def test_ffmpeg_summary_lines(self):
+        lines = {
+            'ssim': "[Parsed_ssim_0 @ 0x1] SSIM Y:0.99 U:0.98 V:0.98 All:0.985 (18.2)",
+            'psnr': "[Parsed_psnr_0 @ 0x1] PSNR y:41.2 u:44.0 v:44.1 average:42.1 min:38 max:50",
+            'vmaf': "[libvmaf @ 0x1] VMAF score: 93.456",
+        }
+        expected = {'ssim': '0.985', 'psnr': '42.1', 'vmaf': '93.456'}
+        for metric, line in lines.items():
+            with self.subTest(metric):
+                self.assertEqual(_METRIC_PATTERNS[metric].search(line).group(1), expected[metric])
+
+
+if __name__ == '__main__':
+    unittest.main()
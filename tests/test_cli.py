@@ -0,0 +1,63 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from conversor import ConversionEngine, ConversionSettings
+from conversor.cli import build_parser, collect_inputs, settings_from_args
+
+
+class SettingsFromArgsTest(unittest.TestCase):
+    def parse(self, *argv):
+        return settings_from_args(build_parser().parse_args(['a.mkv', *argv]))
+
+    def test_options_override_the_settings_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            settings_file = Path(directory) / 'converter_settings.json'
+            settings_file.write_text(json.dumps({'quality': 'low', 'preset': 'slow',
+                                                 'unknown_key': 1}))
+            settings = self.parse('--settings', str(settings_file), '-q', 'high')
+        self.assertEqual(settings.quality, 'high')
+        self.assertEqual(settings.preset, 'slow')
+
+    def test_flags(self):
+        settings = self.parse('--no-audio', '--no-stream-copy')
+        self.assertFalse(settings.preserve_audio)
+        self.assertFalse(settings.stream_copy)
+
+    def test_invalid_values_are_rejected(self):
+        with self.assertRaises(ValueError):
+            self.parse('-b', '4M,abc')
+        with self.assertRaises(ValueError):
+            self.parse('--target-ssim', '1.5')
+
+
+class CollectInputsTest(unittest.TestCase):
+    def test_folders_globs_and_stdin_without_duplicates(self):
+        with tempfile.TemporaryDirectory() as directory:
+            root = Path(directory)
+            for name in ('a.mkv', 'b.avi', 'c.txt'):
+                (root / name).write_bytes(b'')
+            a = str(root / 'a.mkv')
+            inputs = collect_inputs([directory, str(root / '*.avi'), '-'],
+                                    stdin=io.StringIO(f"{a}\n\n"))
+        self.assertEqual([os.path.basename(path) for path in inputs], ['a.mkv', 'b.avi'])
+
+
+class BuildCommandTest(unittest.TestCase):
+    def test_quality_preset_and_audio(self):
+        engine = ConversionEngine(ConversionSettings(quality='high', preset='slow',
+                                                     audio_bitrate='160k'))
+        cmd = engine.build_command('in.mkv', 'out.mov', threads=4)
+        self.assertEqual(cmd[0], 'ffmpeg')
+        self.assertEqual(cmd[cmd.index('-crf') + 1], '18')
+        self.assertEqual(cmd[cmd.index('-preset') + 1], 'slow')
+        self.assertEqual(cmd[cmd.index('-b:a') + 1], '160k')
+        self.assertEqual(cmd[cmd.index('-threads') + 1], '4')
+        self.assertEqual(cmd[-1], 'out.mov')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+
+from conversor import ConversionSettings
+from conversor.compat import plan_streams
+
+H264 = {'index': 0, 'codec_type': 'video', 'codec_name': 'h264', 'profile': 'High',
+        'level': 40, 'pix_fmt': 'yuv420p', 'field_order': 'progressive'}
+AAC = {'index': 1, 'codec_type': 'audio', 'codec_name': 'aac'}
+
+
+def info(*streams):
+    return {'streams': list(streams)}
+
+
+class PlanStreamsTest(unittest.TestCase):
+    def test_compatible_streams_are_copied(self):
+        plan = plan_streams(info(H264, AAC), ConversionSettings())
+        self.assertTrue(plan.copy_video)
+        self.assertTrue(plan.copy_audio)
+        self.assertTrue(plan.is_remux)
+
+    def test_incompatible_video_is_reencoded(self):
+        cases = {
+            'codec': dict(H264, codec_name='hevc'),
+            'level': dict(H264, level=51),
+            'pix_fmt': dict(H264, pix_fmt='yuv422p'),
+            'interlaced': dict(H264, field_order='tt'),
+            'profile': dict(H264, profile='High 10'),
+        }
+        for name, video in cases.items():
+            with self.subTest(name):
+                plan = plan_streams(info(video, AAC), ConversionSettings())
+                self.assertFalse(plan.copy_video)
+                self.assertFalse(plan.is_remux)
+
+    def test_audio_is_reencoded_for_other_codecs(self):
+        plan = plan_streams(info(H264, dict(AAC, codec_name='mp3')), ConversionSettings())
+        self.assertTrue(plan.copy_video)
+        self.assertFalse(plan.copy_audio)
+
+    def test_audio_is_ignored_without_preserve_audio(self):
+        plan = plan_streams(info(H264, AAC), ConversionSettings(preserve_audio=False))
+        self.assertIsNone(plan.audio_index)
+        self.assertTrue(plan.is_remux)
+
+    def test_cover_art_is_not_the_video_stream(self):
+        cover = {'index': 0, 'codec_type': 'video', 'codec_name': 'mjpeg',
+                 'disposition': {'attached_pic': 1}}
+        plan = plan_streams(info(cover, dict(H264, index=1)), ConversionSettings())
+        self.assertEqual(plan.video_index, 1)
+
+    def test_no_video_stream(self):
+        self.assertIsNone(plan_streams(info(AAC), ConversionSettings()))
+        self.assertIsNone(plan_streams(None, ConversionSettings()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from conversor.diskspace import InsufficientSpaceError, SpaceReservations
+
+
+class SpaceReservationsTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        root = Path(self.dir.name)
+        self.output = root / 'a.mov'
+        self.temp = root / '.conversor-tmp-a.mov'
+        self.space = SpaceReservations(margin=1.0)
+        self.device = os.stat(root).st_dev
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_written_bytes_leave_the_reservation(self):
+        ok, _, _ = self.space.reserve(self.output, 1000, [self.temp])
+        self.assertTrue(ok)
+        self.assertEqual(self.space.outstanding(self.device), 1000)
+
+        self.temp.write_bytes(b'x' * 400)
+        self.assertEqual(self.space.outstanding(self.device), 600)
+
+        self.temp.write_bytes(b'x' * 1500)  # saída maior que a estimativa
+        self.assertEqual(self.space.outstanding(self.device), 0)
+
+    def test_release_removes_the_reservation(self):
+        self.space.reserve(self.output, 1000, [self.temp])
+        self.space.release(self.output, 1000)
+        self.assertEqual(self.space.outstanding(self.device), 0)
+
+    def test_check_batch_sums_the_outputs(self):
+        free = shutil.disk_usage(self.dir.name).free
+        self.space.check_batch([(self.output, 1), (self.output, 1)])
+        with self.assertRaises(InsufficientSpaceError):
+            self.space.check_batch([(self.output, free // 2 + 1), (self.output, free // 2 + 1)])
+
+    def test_reservation_counts_against_the_next_job(self):
+        free = shutil.disk_usage(self.dir.name).free
+        ok, _, _ = self.space.reserve(self.output, free // 2 + 1, [self.temp])
+        self.assertTrue(ok)
+        ok, _, _ = self.space.reserve(self.output.with_name('b.mov'), free // 2 + 1)
+        self.assertFalse(ok)
+
+
+if __name__ == '__main__':
+    unittest.main()
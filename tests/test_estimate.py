@@ -0,0 +1,79 @@
+import unittest
+
+from conversor import ConversionSettings
+from conversor.estimate import (MUXING_OVERHEAD, BitrateStats, estimate_output_size,
+                                parse_bitrate)
+
+INFO = {
+    'format': {'duration': '60', 'bit_rate': '50000000'},
+    'streams': [
+        {'index': 0, 'codec_type': 'video', 'codec_name': 'mpeg2video', 'bit_rate': '45000000'},
+        {'index': 1, 'codec_type': 'audio', 'codec_name': 'mp2', 'bit_rate': '384000'},
+    ],
+}
+
+
+class EstimateOutputSizeTest(unittest.TestCase):
+    def test_mb_per_minute_budget_includes_audio(self):
+        settings = ConversionSettings(target_mb_per_min=10, audio_bitrate='128k', maxrate='')
+        size = estimate_output_size(INFO, settings)
+        # Um minuto com orçamento de 10 MB/min: o total fica em 10 MB, não 10 MB + áudio
+        self.assertAlmostEqual(size, 10 * 1024 ** 2, delta=16)
+
+    def test_budget_without_audio(self):
+        settings = ConversionSettings(target_mb_per_min=10, preserve_audio=False, maxrate='')
+        self.assertAlmostEqual(estimate_output_size(INFO, settings), 10 * 1024 ** 2, delta=16)
+
+
+REMUX_INFO = {
+    'format': {'duration': '100', 'bit_rate': '5000000'},
+    'streams': [
+        {'index': 0, 'codec_type': 'video', 'codec_name': 'h264', 'profile': 'High',
+         'level': 40, 'pix_fmt': 'yuv420p', 'bit_rate': '4000000'},
+        {'index': 1, 'codec_type': 'audio', 'codec_name': 'aac', 'bit_rate': '256000'},
+    ],
+}
+
+
+def expected_size(duration, bitrate):
+    return int(duration * bitrate / 8 * MUXING_OVERHEAD)
+
+
+class EstimateModesTest(unittest.TestCase):
+    def test_remux_keeps_the_source_bitrates(self):
+        size = estimate_output_size(REMUX_INFO, ConversionSettings())
+        self.assertEqual(size, expected_size(100, 4_000_000 + 256_000))
+
+    def test_maxrate_caps_the_quality_bitrate(self):
+        settings = ConversionSettings(quality='high', maxrate='2M', stream_copy=False,
+                                      audio_bitrate='128k')
+        self.assertEqual(estimate_output_size(INFO, settings), expected_size(60, 2_000_000 + 128_000))
+
+    def test_observed_bitrate_replaces_the_typical_one(self):
+        settings = ConversionSettings(maxrate='', stream_copy=False, preserve_audio=False)
+        self.assertEqual(estimate_output_size(INFO, settings, crf_bitrate=1_000_000),
+                         expected_size(60, 1_000_000))
+
+    def test_unknown_duration(self):
+        self.assertEqual(estimate_output_size({'format': {}}, ConversionSettings()), 0)
+        self.assertEqual(estimate_output_size(None, ConversionSettings()), 0)
+
+
+class ParseBitrateTest(unittest.TestCase):
+    def test_units(self):
+        self.assertEqual(parse_bitrate('10M'), 10_000_000)
+        self.assertEqual(parse_bitrate('128k'), 128_000)
+        self.assertEqual(parse_bitrate('2500000'), 2_500_000)
+        self.assertEqual(parse_bitrate('N/A'), 0)
+        self.assertEqual(parse_bitrate(None), 0)
+
+
+class BitrateStatsTest(unittest.TestCase):
+    def test_record_excludes_audio_and_muxing(self):
+        stats = BitrateStats()
+        stats.record('medium', expected_size(60, 3_000_000 + 128_000), 60, audio_bitrate=128_000)
+        self.assertAlmostEqual(stats.bitrate('medium'), 3_000_000, delta=1_000)
+
+
+if __name__ == '__main__':
+    unittest.main()
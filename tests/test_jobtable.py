@@ -0,0 +1,46 @@
+import unittest
+
+from conversor.jobtable import JOB_DONE, JOB_FAILED, JOB_QUEUED, JOB_RUNNING, JOB_WAITING, JobTable
+
+
+class JobTableTest(unittest.TestCase):
+    def setUp(self):
+        self.table = JobTable()
+        for path, duration, codec, size in [('/v/b.mkv', 30.0, 'h264', 300),
+                                            ('/v/a.mkv', 90.0, 'mpeg2video', 100),
+                                            ('/v/Clip.avi', None, None, None)]:
+            row = self.table.add(path)
+            self.table.set_probe(row, duration, codec, size)
+
+    def test_duplicates_are_ignored(self):
+        self.assertIsNone(self.table.add('/v/a.mkv'))
+        self.assertEqual(len(self.table), 3)
+        self.assertEqual(self.table.row('/v/a.mkv'), 1)
+
+    def test_view_without_filters_is_not_copied(self):
+        self.assertEqual(self.table.view(), range(3))
+        self.assertEqual(list(self.table.view(reverse=True)), [2, 1, 0])
+
+    def test_filter_by_name_and_status(self):
+        self.assertEqual(self.table.view('CLIP'), [2])
+        self.table.set_status(0, JOB_RUNNING, 50.0)
+        self.assertEqual(self.table.view(status=JOB_RUNNING), [0])
+        self.assertEqual(self.table.view('.mkv', status=JOB_WAITING), [1])
+
+    def test_sort_keys(self):
+        self.assertEqual(self.table.view(sort='name'), [1, 0, 2])
+        self.assertEqual(self.table.view(sort='duration', reverse=True), [1, 0, 2])
+        self.assertEqual(self.table.view(sort='codec'), [2, 0, 1])
+        self.table.set_output(1, JOB_DONE, 500)
+        self.assertEqual(self.table.view(sort='size'), [2, 0, 1])
+        self.assertEqual(self.table.view(sort='progress', reverse=True)[0], 1)
+
+    def test_reset_status(self):
+        self.table.set_output(0, JOB_FAILED, 10)
+        self.table.reset_status()
+        self.assertEqual(list(self.table.status), [JOB_QUEUED] * 3)
+        self.assertEqual(self.table.size(0), 300)  # volta à estimativa
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from conversor import BatchJournal
+from conversor.journal import DONE, FAILED, RUNNING
+
+
+class BatchJournalTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        root = Path(self.dir.name)
+        self.input = root / 'a.mkv'
+        self.output = root / 'a.mov'
+        self.input.write_bytes(b'entrada')
+        self.output.write_bytes(b'saida')
+        self.journal_path = root / 'journal.jsonl'
+        BatchJournal(self.journal_path).mark(self.input, DONE, self.output, 'cfg-1')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_same_settings_and_input_is_complete(self):
+        self.assertTrue(BatchJournal(self.journal_path).is_complete(self.input, self.output, 'cfg-1'))
+
+    def test_other_settings_are_not_complete(self):
+        self.assertFalse(BatchJournal(self.journal_path).is_complete(self.input, self.output, 'cfg-2'))
+
+    def test_replaced_input_is_not_complete(self):
+        stat = self.input.stat()
+        os.utime(self.input, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.assertFalse(BatchJournal(self.journal_path).is_complete(self.input, self.output, 'cfg-1'))
+
+    def test_missing_or_changed_output_is_not_complete(self):
+        self.output.write_bytes(b'outra saida')
+        self.assertFalse(BatchJournal(self.journal_path).is_complete(self.input, self.output, 'cfg-1'))
+        self.output.unlink()
+        self.assertFalse(BatchJournal(self.journal_path).is_complete(self.input, self.output, 'cfg-1'))
+
+    def test_last_state_wins(self):
+        journal = BatchJournal(self.journal_path)
+        journal.mark(self.input, RUNNING, self.output)
+        journal.mark(self.input, FAILED, self.output, 'cfg-1')
+        reloaded = BatchJournal(self.journal_path)
+        self.assertEqual(reloaded.state(self.input), FAILED)
+        self.assertFalse(reloaded.is_complete(self.input, self.output, 'cfg-1'))
+
+    def test_truncated_line_is_ignored(self):
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            f.write('{"input": "trunc')
+        self.assertTrue(BatchJournal(self.journal_path).is_complete(self.input, self.output, 'cfg-1'))
+
+    def test_compacts_repeated_records(self):
+        journal = BatchJournal(self.journal_path)
+        for _ in range(10):
+            journal.mark(self.input, RUNNING, self.output)
+        journal.mark(self.input, DONE, self.output, 'cfg-1')
+        reloaded = BatchJournal(self.journal_path)
+        self.assertEqual(len(self.journal_path.read_text().splitlines()), 1)
+        self.assertEqual(reloaded.state(self.input), DONE)
+
+
+if __name__ == '__main__':
+    unittest.main()
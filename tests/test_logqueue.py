@@ -0,0 +1,19 @@
+import unittest
+
+from conversor import LogQueue
+
+
+class LogQueueTest(unittest.TestCase):
+    def test_full_queue_drops_and_reports(self):
+        log = LogQueue(max_pending=3)
+        for i in range(10):
+            log.put(f"linha {i}")
+        lines = log.drain()
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(lines[2].endswith("linha 2"))
+        self.assertIn("7 linhas de log omitidas", lines[3])
+        self.assertEqual(log.drain(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
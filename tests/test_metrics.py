@@ -0,0 +1,35 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from conversor import STATUS_SUCCESS, HistoryStore
+from conversor.metrics import JobMetrics
+
+
+class JobMetricsTest(unittest.TestCase):
+    def test_unmeasured_cpu_stays_none(self):
+        metrics = JobMetrics()
+        metrics.add_process(None, None, frames=10)
+        data = metrics.to_dict()
+        self.assertIsNone(data['cpu_user'])
+        self.assertIsNone(data['cpu_sys'])
+
+    def test_measured_cpu_is_summed(self):
+        metrics = JobMetrics()
+        metrics.add_process(1.0, 0.25)
+        metrics.add_process(0.5, None)
+        data = metrics.to_dict()
+        self.assertEqual(data['cpu_user'], 1.5)
+        self.assertEqual(data['cpu_sys'], 0.25)
+
+    def test_unmeasured_cpu_is_null_in_history(self):
+        with tempfile.TemporaryDirectory() as directory:
+            history = HistoryStore(Path(directory) / 'history.db')
+            history.add('a.mkv', 'a.mov', STATUS_SUCCESS, 10, metrics=JobMetrics().to_dict())
+            entry = history.query()[0]
+            self.assertIsNone(entry['cpu_user'])
+            self.assertIsNone(entry['cpu_sys'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from conversor import ConversionCache
+from conversor.hashing import content_digest, sampled_digest
+
+
+class ContentDigestTest(unittest.TestCase):
+    def test_difference_between_sampled_blocks_changes_the_digest(self):
+        with tempfile.TemporaryDirectory() as directory:
+            a = Path(directory) / 'a.mkv'
+            b = Path(directory) / 'b.mkv'
+            data = bytearray(1024 * 1024)
+            a.write_bytes(bytes(data))
+            data[300 * 1024] = 1  # fora dos blocos lidos por sampled_digest
+            b.write_bytes(bytes(data))
+            self.assertEqual(sampled_digest(a), sampled_digest(b))
+            self.assertNotEqual(content_digest(a), content_digest(b))
+
+
+class ConversionCacheTest(unittest.TestCase):
+    def test_fetched_output_is_independent_of_the_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            root = Path(directory)
+            cache = ConversionCache(root / 'cache')
+            output = root / 'a.mov'
+            output.write_bytes(b'saida')
+            self.assertFalse(cache.fetch('k' * 40, root / 'unused.mov'))
+            cache.finish('k' * 40, output)
+
+            fetched = root / 'b.mov'
+            self.assertTrue(cache.fetch('k' * 40, fetched))
+            self.assertEqual(fetched.read_bytes(), b'saida')
+            cached = cache.object_path('k' * 40)
+            self.assertNotEqual(os.stat(fetched).st_ino, os.stat(cached).st_ino)
+            self.assertNotEqual(os.stat(output).st_ino, os.stat(cached).st_ino)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import json
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from conversor import ProbeService
+
+
+class ProbeServiceSaveTest(unittest.TestCase):
+    def test_concurrent_saves_publish_valid_json(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache_file = Path(directory) / 'probe_cache.json'
+            service = ProbeService(cache_file)
+            with service.lock:
+                for i in range(500):
+                    service.entries[f'/v/{i}.mkv|1|1'] = {'format': {'duration': str(i)}}
+
+            def save_many():
+                for _ in range(10):
+                    with service.lock:
+                        service.dirty = True
+                    service.save()
+
+            threads = [threading.Thread(target=save_many) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            with open(cache_file, encoding='utf-8') as f:
+                self.assertEqual(len(json.load(f)['entries']), 500)
+            self.assertEqual(list(Path(directory).glob('*.tmp')), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import signal
+import sys
+import threading
+import unittest
+
+from conversor.processes import ProcessRegistry, wait_with_usage
+
+
+@unittest.skipIf(sys.platform == "win32", "sinais POSIX")
+class ProcessRegistryCancelTest(unittest.TestCase):
+    def start(self, registry, cmd):
+        """Inicia cmd e o espera numa thread, como ConversionEngine.run_ffmpeg"""
+        process = registry.popen(cmd)
+        result = {}
+
+        def owner():
+            wait_with_usage(process)
+            result['returncode'] = process.returncode
+            registry.release(process)
+        thread = threading.Thread(target=owner)
+        thread.start()
+        return thread, result
+
+    def test_interrupted_process_keeps_its_exit_status(self):
+        registry = ProcessRegistry()
+        thread, result = self.start(registry, ['sleep', '30'])
+        registry.cancel(grace=5, wait=True)
+        thread.join(5)
+        self.assertEqual(result['returncode'], -signal.SIGINT)
+
+    def test_process_ignoring_sigint_is_killed(self):
+        registry = ProcessRegistry()
+        thread, result = self.start(registry, ['sh', '-c', 'trap "" INT; sleep 30'])
+        registry.cancel(grace=0.5, wait=True)
+        thread.join(5)
+        self.assertEqual(result['returncode'], -signal.SIGKILL)
+
+
+if __name__ == '__main__':
+    unittest.main()
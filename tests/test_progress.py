@@ -0,0 +1,85 @@
+import unittest
+
+from conversor.progress import ProgressBoard, ProgressEvent, ProgressParser
+
+BLOCK = """frame=250
+fps=49.80
+bitrate=1523.4kbits/s
+total_size=1900000
+out_time_us=10000000
+out_time_ms=10000000
+out_time=00:00:10.000000
+speed=1.99x
+progress=continue
+"""
+
+
+def feed(parser, text):
+    events = [parser.feed(line) for line in text.splitlines()]
+    return [event for event in events if event is not None]
+
+
+class ProgressParserTest(unittest.TestCase):
+    def test_block_becomes_one_event(self):
+        events = feed(ProgressParser(duration=40.0), BLOCK)
+        self.assertEqual(len(events), 1)
+        event = events[0]
+        self.assertEqual(event.out_time, 10.0)
+        self.assertEqual(event.frame, 250)
+        self.assertAlmostEqual(event.fps, 49.8)
+        self.assertAlmostEqual(event.speed, 1.99)
+        self.assertAlmostEqual(event.bitrate, 1523.4)
+        self.assertEqual(event.total_size, 1900000)
+        self.assertEqual(event.percent, 25.0)
+        self.assertFalse(event.finished)
+
+    def test_end_block_is_finished(self):
+        event = feed(ProgressParser(duration=40.0), "out_time_us=1000000\nprogress=end\n")[0]
+        self.assertTrue(event.finished)
+        self.assertEqual(event.percent, 100.0)
+
+    def test_clock_is_used_without_microseconds(self):
+        event = feed(ProgressParser(), "out_time=01:02:03.500000\nprogress=continue\n")[0]
+        self.assertEqual(event.out_time, 3723.5)
+
+    def test_unavailable_values_are_zero(self):
+        text = "speed=N/A\nbitrate=N/A\nout_time_us=-9223372036854775807\nprogress=continue\n"
+        event = feed(ProgressParser(duration=10.0), text)[0]
+        self.assertEqual(event.speed, 0.0)
+        self.assertEqual(event.bitrate, 0.0)
+        self.assertEqual(event.out_time, 0.0)
+        self.assertEqual(event.percent, 0.0)
+
+    def test_unknown_duration_has_no_percent(self):
+        event = feed(ProgressParser(), BLOCK)[0]
+        self.assertEqual(event.percent, 0.0)
+
+
+class ProgressBoardTest(unittest.TestCase):
+    def test_changes_keep_only_the_latest_event_per_job(self):
+        board = ProgressBoard()
+        board.reset({0: 10.0, 1: 10.0})
+        board.update(0, ProgressEvent(out_time=1.0, duration=10.0))
+        board.update(0, ProgressEvent(out_time=3.0, duration=10.0))
+        changes = board.changes()
+        self.assertEqual(list(changes), [0])
+        self.assertEqual(changes[0].out_time, 3.0)
+        self.assertEqual(board.changes(), {})
+
+    def test_overall_is_weighted_by_duration(self):
+        board = ProgressBoard()
+        board.reset({0: 30.0, 1: 10.0})
+        board.update(0, ProgressEvent(finished=True))
+        self.assertAlmostEqual(board.overall(), 75.0)
+        board.update(1, ProgressEvent(out_time=5.0, duration=10.0))
+        self.assertAlmostEqual(board.overall(), 87.5)
+
+    def test_unknown_duration_weighs_the_average(self):
+        board = ProgressBoard()
+        board.reset({0: 20.0, 1: 0.0})
+        board.update(1, ProgressEvent(finished=True))
+        self.assertAlmostEqual(board.overall(), 50.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from conversor.atomic import SEGMENT_DIR_PREFIX, TEMP_PREFIX
+from conversor.scan import iter_video_files
+
+
+class IterVideoFilesTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.dir.name)
+        for name in ['a.mkv', 'B.AVI', 'notes.txt', 'sub/c.webm', 'sub/deep/d.mpg',
+                     f'{TEMP_PREFIX}1-x-e.mkv', f'{SEGMENT_DIR_PREFIX}1-x/f.mkv']:
+            path = self.root / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(b'')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def names(self, **kwargs):
+        return sorted(os.path.relpath(path, self.root)
+                      for path in iter_video_files(self.root, **kwargs))
+
+    def test_recursive_scan_skips_temps_and_other_files(self):
+        self.assertEqual(self.names(), sorted(['a.mkv', 'B.AVI', os.path.join('sub', 'c.webm'),
+                                               os.path.join('sub', 'deep', 'd.mpg')]))
+
+    def test_non_recursive_scan(self):
+        self.assertEqual(self.names(recursive=False), ['B.AVI', 'a.mkv'])
+
+    @unittest.skipIf(os.name == 'nt', "links simbólicos")
+    def test_directory_symlinks_are_followed_only_on_request(self):
+        os.symlink(self.root, self.root / 'sub' / 'loop')
+        self.assertEqual(len(self.names()), 4)
+        outside = tempfile.TemporaryDirectory()
+        self.addCleanup(outside.cleanup)
+        (Path(outside.name) / 'g.mkv').write_bytes(b'')
+        os.unlink(self.root / 'sub' / 'loop')
+        os.symlink(outside.name, self.root / 'link')
+        self.assertIn(os.path.join('link', 'g.mkv'), self.names(follow_symlinks=True))
+        self.assertNotIn(os.path.join('link', 'g.mkv'), self.names())
+
+    def test_missing_root(self):
+        self.assertEqual(list(iter_video_files(self.root / 'missing')), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from conversor.scheduler import BatchJob, SpeedStats, estimate_makespan, order_jobs
+
+JOBS = [
+    BatchJob(0, 'a.mkv', duration=60.0, size=10),
+    BatchJob(1, 'b.mkv', duration=600.0, size=10),
+    BatchJob(2, 'c.mkv', duration=60.0, size=50),
+    BatchJob(3, 'd.mkv', duration=5.0, size=1),
+]
+
+
+def ids(jobs):
+    return [job.job_id for job in jobs]
+
+
+class OrderJobsTest(unittest.TestCase):
+    def test_policies(self):
+        self.assertEqual(ids(order_jobs(JOBS, 'longest_first')), [1, 2, 0, 3])
+        self.assertEqual(ids(order_jobs(JOBS, 'shortest_first')), [3, 0, 2, 1])
+        self.assertEqual(ids(order_jobs(list(reversed(JOBS)), 'fifo')), [0, 1, 2, 3])
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            order_jobs(JOBS, 'random')
+
+
+class EstimateMakespanTest(unittest.TestCase):
+    def test_longest_first_finishes_sooner(self):
+        seconds = [1, 1, 1, 1, 4]
+        self.assertEqual(estimate_makespan(seconds, 2), 6)
+        self.assertEqual(estimate_makespan(sorted(seconds, reverse=True), 2), 4)
+
+    def test_running_jobs_delay_the_workers(self):
+        self.assertEqual(estimate_makespan([2], 2, busy_until=[5, 1]), 5)
+        self.assertEqual(estimate_makespan([2, 2], 2, busy_until=[5, 1]), 5)
+        self.assertEqual(estimate_makespan([], 1), 0)
+
+
+class SpeedStatsTest(unittest.TestCase):
+    def test_observed_speed_is_persisted_and_smoothed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            stats_file = Path(directory) / 'speed.json'
+            stats = SpeedStats(stats_file)
+            stats.record('medium', 100.0, 50.0)  # 2x
+            stats.record('medium', 100.0, 25.0)  # 4x
+            self.assertAlmostEqual(SpeedStats(stats_file).speed('medium'), 2.6)
+
+    def test_job_seconds(self):
+        stats = SpeedStats()
+        self.assertEqual(stats.job_seconds(BatchJob(0, 'a', duration=300.0), 'veryfast'), 100.0)
+        self.assertLess(stats.job_seconds(BatchJob(0, 'a', duration=300.0, remux=True), 'veryfast'),
+                        10.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+
+from conversor.segments import MIN_SEGMENT_LENGTH, _concat_line, choose_split_points
+
+
+class ChooseSplitPointsTest(unittest.TestCase):
+    def test_nearest_keyframes_to_equal_parts(self):
+        keyframes = [float(t) for t in range(0, 600, 10)]  # GOP de 10 s
+        self.assertEqual(choose_split_points(keyframes, 600.0, 4), [150.0, 300.0, 450.0])
+
+    def test_snaps_to_sparse_keyframes(self):
+        keyframes = [0.0, 95.0, 205.0, 290.0]
+        self.assertEqual(choose_split_points(keyframes, 300.0, 3), [95.0, 205.0])
+
+    def test_skips_segments_shorter_than_the_minimum(self):
+        keyframes = [0.0, 100.0, 105.0, 200.0]
+        points = choose_split_points(keyframes, 210.0, 3)
+        self.assertEqual(points, [100.0])
+        edges = [0.0] + points + [210.0]
+        self.assertTrue(all(b - a >= MIN_SEGMENT_LENGTH for a, b in zip(edges, edges[1:])))
+
+    def test_no_keyframes(self):
+        self.assertEqual(choose_split_points([], 600.0, 4), [])
+
+
+class ConcatLineTest(unittest.TestCase):
+    def test_quotes_are_escaped(self):
+        self.assertEqual(_concat_line("/tmp/d/it's.mov"), "file 'it'\\''s.mov'\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
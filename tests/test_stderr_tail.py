@@ -0,0 +1,42 @@
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from conversor.stderr_tail import prune_job_logs
+
+
+class PruneJobLogsTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.dir.name)
+        now = time.time()
+        self.logs = []
+        for i in range(5):
+            path = self.root / f"video-20260101-12000{i}-{i + 1}.log"
+            path.write_text("ffmpeg")
+            os.utime(path, (now - 100 + i, now - 100 + i))
+            self.logs.append(path)
+        self.app_log = self.root / "conversor.log"
+        self.app_log.write_text("interface")
+        os.utime(self.app_log, (0, 0))
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_keeps_the_newest_logs(self):
+        self.assertEqual(prune_job_logs(self.root, keep=2), 3)
+        self.assertEqual([path.exists() for path in self.logs], [False, False, False, True, True])
+        self.assertTrue(self.app_log.exists())
+
+    def test_removes_logs_older_than_max_age(self):
+        old = self.logs[0]
+        os.utime(old, (time.time() - 3600, time.time() - 3600))
+        self.assertEqual(prune_job_logs(self.root, keep=10, max_age=600), 1)
+        self.assertFalse(old.exists())
+        self.assertTrue(self.app_log.exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
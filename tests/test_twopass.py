@@ -0,0 +1,38 @@
+import unittest
+from pathlib import Path
+
+from conversor import PRESETS, ConversionEngine, ConversionSettings, StreamPlan, TwoPassEncoder
+
+
+def option(cmd, name):
+    return cmd[cmd.index(name) + 1]
+
+
+class TwoPassCommandTest(unittest.TestCase):
+    def commands(self, preset):
+        engine = ConversionEngine(ConversionSettings(preset=preset, video_bitrate='4M,2M'))
+        encoder = TwoPassEncoder(engine, threads=4)
+        plan = StreamPlan(video_index=0, audio_index=1)
+        passlog = Path('stats') / 'x264'
+        first = encoder.first_pass_command('in.mkv', '4M', passlog, plan)
+        second = encoder.second_pass_command('in.mkv', 'out_2M.mov', '2M', passlog, plan)
+        return first, second
+
+    def test_passes_use_the_same_preset(self):
+        for preset in PRESETS:
+            with self.subTest(preset=preset):
+                first, second = self.commands(preset)
+                self.assertEqual(option(first, '-preset'), preset)
+                self.assertEqual(option(second, '-preset'), preset)
+
+    def test_passes_share_the_stats_file(self):
+        first, second = self.commands('medium')
+        self.assertEqual(option(first, '-pass'), '1')
+        self.assertEqual(option(second, '-pass'), '2')
+        self.assertEqual(option(first, '-passlogfile'), option(second, '-passlogfile'))
+        self.assertEqual(first[-3:], ['-f', 'null', '-'])
+        self.assertEqual(option(second, '-b:v'), '2M')
+
+
+if __name__ == '__main__':
+    unittest.main()
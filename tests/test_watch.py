@@ -0,0 +1,78 @@
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from conversor.watch import FolderWatcher, open_for_writing
+
+
+class FolderWatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.dir.name)
+        self.video = self.root / 'a.mkv'
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def watcher(self):
+        return FolderWatcher(self.root, stable_seconds=0.2, use_inotify=False)
+
+    def test_delivered_once_after_being_stable(self):
+        self.video.write_bytes(b'video')
+        (self.root / 'notes.txt').write_bytes(b'texto')
+        watcher = self.watcher()
+        self.assertEqual(watcher.collect_ready(), [])  # primeira medição
+        time.sleep(0.3)
+        self.assertEqual(watcher.collect_ready(), [str(self.video)])
+        watcher.scan()
+        self.assertEqual(watcher.collect_ready(), [])
+
+    def test_empty_file_is_not_ready(self):
+        self.video.write_bytes(b'')
+        watcher = self.watcher()
+        watcher.collect_ready()
+        time.sleep(0.3)
+        self.assertEqual(watcher.collect_ready(), [])
+
+    @unittest.skipUnless(sys.platform.startswith('linux'), "/proc")
+    def test_file_open_for_writing_is_not_ready(self):
+        with open(self.video, 'wb') as f:
+            f.write(b'video')
+            f.flush()
+            self.assertTrue(open_for_writing(self.video))
+            watcher = self.watcher()
+            watcher.collect_ready()
+            time.sleep(0.3)
+            self.assertEqual(watcher.collect_ready(), [])
+        self.assertFalse(open_for_writing(self.video))
+        time.sleep(0.3)
+        self.assertEqual(watcher.collect_ready(), [str(self.video)])
+
+    def test_replaced_file_is_delivered_again(self):
+        self.video.write_bytes(b'video')
+        watcher = self.watcher()
+        watcher.collect_ready()
+        time.sleep(0.3)
+        self.assertEqual(watcher.collect_ready(), [str(self.video)])
+        self.video.write_bytes(b'outro video')
+        watcher.scan()
+        watcher.collect_ready()
+        time.sleep(0.3)
+        self.assertEqual(watcher.collect_ready(), [str(self.video)])
+
+    def test_deferred_file_waits(self):
+        self.video.write_bytes(b'video')
+        watcher = self.watcher()
+        watcher.collect_ready()
+        time.sleep(0.3)
+        watcher.collect_ready()
+        watcher.defer(str(self.video), 0.3)
+        self.assertEqual(watcher.collect_ready(), [])
+        time.sleep(0.6)
+        self.assertEqual(watcher.collect_ready(), [str(self.video)])
+
+
+if __name__ == '__main__':
+    unittest.main()